@@ -2,16 +2,65 @@
 Google Gemini AI integration service
 Provides context-aware counselling guidance
 """
-import google.generativeai as genai
+import logging
+import threading
 from app.config import get_settings
+from app.metrics import gemini_call, gemini_usage
+from app.tracing import start_span
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
 
-# Configure Gemini for Chat (Primary)
-genai.configure(api_key=settings.gemini_api_key_chat)
+CHAT_MODEL = 'models/gemini-flash-latest'
 
-# Initialize model
-model = genai.GenerativeModel('models/gemini-flash-latest')
+_model = None
+_model_lock = threading.Lock()
+
+
+def get_model():
+    """
+    Gemini chat model, configured on first use
+
+    google.generativeai pulls in gRPC and protobuf, so it is imported here
+    rather than when the app starts
+    """
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                import google.generativeai as genai
+
+                # Configure Gemini for Chat (Primary)
+                genai.configure(api_key=settings.gemini_api_key_chat)
+                _model = genai.GenerativeModel(CHAT_MODEL)
+    return _model
+
+
+_http_session = None
+
+
+def get_http_session():
+    """
+    Shared aiohttp session for Gemini REST calls, so connections (and TLS
+    sessions) are pooled instead of set up per call. Must be called from
+    the event loop; closed by close_http_session() at shutdown
+    """
+    global _http_session
+    if _http_session is None or _http_session.closed:
+        import aiohttp  # Deferred: only the REST calls use it
+
+        _http_session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=60),
+            connector=aiohttp.TCPConnector(limit=100, keepalive_timeout=60)
+        )
+    return _http_session
+
+
+async def close_http_session() -> None:
+    global _http_session
+    if _http_session is not None and not _http_session.closed:
+        await _http_session.close()
+    _http_session = None
 
 
 def build_profile_context(profile: dict, stage: str) -> str:
@@ -114,7 +163,10 @@ STUDENT QUESTION:
 COUNSELLOR RESPONSE:"""
         
         # Generate response
-        response = model.generate_content(full_prompt)
+        model = get_model()
+        with gemini_call("chat", model.model_name, full_prompt) as usage:
+            response = model.generate_content(full_prompt)
+            usage.update(gemini_usage(response))
         ai_text = response.text
         
         # Process Actions if DB client provided
@@ -125,7 +177,7 @@ COUNSELLOR RESPONSE:"""
         
     except Exception as e:
         error_str = str(e)
-        print(f"Error generating AI response: {e}")
+        logger.exception("Error generating AI response", extra={"user_id": user_id})
         
         if "429" in error_str:
             return "I'm receiving too many requests right now. Please give me a minute to rest! 😅"
@@ -133,8 +185,9 @@ COUNSELLOR RESPONSE:"""
         return f"DEBUG ERROR: {error_str}"
 
 import re
-import aiohttp
 import json
+from app.catalog import get_catalog
+from app.versioning import bump_shortlist_version
 
 async def _process_actions(text: str, user_id: str, db: any) -> str:
     """Detect and execute actions in AI response"""
@@ -167,21 +220,22 @@ async def _process_actions(text: str, user_id: str, db: any) -> str:
     for action_type, param in matches:
         try:
             param = param.strip()
-            if action_type == "SHORTLIST":
-                uni_name = await _action_shortlist(param, user_id, db)
-                feedback_msgs.append(f"✓ Shortlisted: {uni_name}")
-            elif action_type == "LOCK":
-                uni_name = await _action_lock(param, user_id, db)
-                feedback_msgs.append(f"✓ Locked: {uni_name}")
-            elif action_type == "TASK":
-                parts = param.split('|', 1)
-                title = parts[0].strip()
-                desc = parts[1].strip() if len(parts) > 1 else ""
-                await _action_create_task(title, desc, user_id, db)
-                feedback_msgs.append(f"✓ Task Added: {title}")
+            with start_span(f"ai.action.{action_type.lower()}", {"ai.action.type": action_type, "ai.action.param": param}):
+                if action_type == "SHORTLIST":
+                    uni_name = await _action_shortlist(param, user_id, db)
+                    feedback_msgs.append(f"✓ Shortlisted: {uni_name}")
+                elif action_type == "LOCK":
+                    uni_name = await _action_lock(param, user_id, db)
+                    feedback_msgs.append(f"✓ Locked: {uni_name}")
+                elif action_type == "TASK":
+                    parts = param.split('|', 1)
+                    title = parts[0].strip()
+                    desc = parts[1].strip() if len(parts) > 1 else ""
+                    await _action_create_task(title, desc, user_id, db)
+                    feedback_msgs.append(f"✓ Task Added: {title}")
                 
         except Exception as e:
-            print(f"Action {action_type} failed: {e}")
+            logger.warning("AI action failed", extra={"action": action_type, "user_id": user_id, "error": str(e)})
             feedback_msgs.append(f"⚠️ Action Failed: {str(e)}")
 
     if feedback_msgs:
@@ -190,17 +244,20 @@ async def _process_actions(text: str, user_id: str, db: any) -> str:
 
     return cleaned_text
 
+def _find_university(uni_name: str):
+    """Catalog record by (partial) name from the in-memory name index, or None"""
+    return get_catalog().find_by_name(uni_name)
+
 async def _action_shortlist(uni_name: str, user_id: str, db: any) -> str:
-    print(f"AI Action: Shortlisting {uni_name}")
+    logger.info("AI action: shortlist", extra={"university": uni_name, "user_id": user_id})
     # 1. Search University ID (Fuzzy match)
-    res = db.table("universities").select("id, name").ilike("name", f"%{uni_name}%").limit(1).execute()
+    uni = _find_university(uni_name)
     
-    if not res.data:
+    if uni is None:
         raise ValueError(f"University '{uni_name}' not found in database.")
         
-    uni_data = res.data[0]
-    uni_id = uni_data['id']
-    real_name = uni_data['name']
+    uni_id = uni.id
+    real_name = uni.name
     
     # 2. Add to Shortlist
     try:
@@ -210,6 +267,7 @@ async def _action_shortlist(uni_name: str, user_id: str, db: any) -> str:
             "bucket": "Target",
             "is_locked": False
         }).execute()
+        bump_shortlist_version(user_id)
     except Exception as e:
         if "duplicate" in str(e) or "unique constraint" in str(e).lower():
             return f"{real_name} (Already in list)"
@@ -219,15 +277,14 @@ async def _action_shortlist(uni_name: str, user_id: str, db: any) -> str:
     return real_name
 
 async def _action_lock(uni_name: str, user_id: str, db: any) -> str:
-    print(f"AI Action: Locking {uni_name}")
+    logger.info("AI action: lock", extra={"university": uni_name, "user_id": user_id})
     # 1. Search Uni ID
-    res = db.table("universities").select("id, name").ilike("name", f"%{uni_name}%").limit(1).execute()
-    if not res.data:
+    uni = _find_university(uni_name)
+    if uni is None:
         raise ValueError(f"University '{uni_name}' not found.")
         
-    uni_data = res.data[0]
-    uni_id = uni_data['id']
-    real_name = uni_data['name']
+    uni_id = uni.id
+    real_name = uni.name
     
     # 2. Update Shortlist to locked
     # Check if in shortlist first? "match" does that.
@@ -235,11 +292,12 @@ async def _action_lock(uni_name: str, user_id: str, db: any) -> str:
     
     if not res.data:
         raise ValueError(f"'{real_name}' is not in your shortlist. Please shortlist it first.")
+    bump_shortlist_version(user_id)
         
     return real_name
 
 async def _action_create_task(title: str, desc: str, user_id: str, db: any):
-    print(f"AI Action: Creating Task {title}")
+    logger.info("AI action: create task", extra={"title": title, "user_id": user_id})
     # Use custom_tasks table
     db.table("custom_tasks").insert({
         "user_id": user_id,
@@ -279,7 +337,10 @@ Example:
 
 Generate tasks now:"""
         
-        response = model.generate_content(prompt)
+        model = get_model()
+        with gemini_call("initial_tasks", model.model_name, prompt) as usage:
+            response = model.generate_content(prompt)
+            usage.update(gemini_usage(response))
         
         # Parse response into tasks
         tasks = []
@@ -306,8 +367,8 @@ Generate tasks now:"""
         
         return tasks[:5]  # Limit to 5 tasks
         
-    except Exception as e:
-        print(f"Error generating tasks: {e}")
+    except Exception:
+        logger.exception("Error generating tasks")
         # Return default tasks
         return [
             {
@@ -366,13 +427,15 @@ async def calculate_ai_match_score(profile: dict, university: dict) -> dict:
             }
         }
         
-        async with aiohttp.ClientSession() as session:
+        session = get_http_session()
+        with gemini_call("match_score", "gemini-2.0-flash", prompt) as usage:
             async with session.post(url, json=payload, headers=headers) as resp:
                 if resp.status != 200:
                     error_text = await resp.text()
                     raise Exception(f"Gemini API Error {resp.status}: {error_text}")
                 
                 data = await resp.json()
+            usage.update(gemini_usage(data))
                 
         # Parse Response
         try:
@@ -390,11 +453,11 @@ async def calculate_ai_match_score(profile: dict, university: dict) -> dict:
             return result
             
         except (KeyError, IndexError, json.JSONDecodeError) as e:
-            print(f"Error parsing AI analysis: {e}")
+            logger.warning("Error parsing AI analysis", extra={"error": str(e)})
             raise e
 
     except Exception as e:
-        print(f"Error calculating AI match: {e}")
+        logger.warning("Error calculating AI match", extra={"university_id": university.get("id"), "error": str(e)})
         # Fallback to heuristic (handled by caller)
         return {
             "match_score": 0,
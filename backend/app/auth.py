@@ -1,13 +1,16 @@
 """
 Authentication utilities using Supabase Auth
 """
-from fastapi import Depends, HTTPException, status
+import hmac
+import logging
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.database import supabase
 from app.config import get_settings
 
 settings = get_settings()
 security = HTTPBearer()
+logger = logging.getLogger(__name__)
 
 
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
@@ -56,12 +59,12 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
                 }).execute()
         except Exception as e:
             # Log but don't fail auth if healing fails (let downstream handle or fail)
-            print(f"Auto-heal failed: {e}")
+            logger.warning("Auto-heal failed", extra={"user_id": user.user.id, "error": str(e)})
         
         return user.user
         
     except Exception as e:
-        print(f"AUTH ERROR: {str(e)}") # Debug logging
+        logger.warning("Authentication failed", extra={"error": str(e)})
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Could not validate credentials: {str(e)}",
@@ -86,3 +89,22 @@ def verify_user_id(user_id: str, current_user: dict) -> bool:
             detail="Not authorized to access this resource"
         )
     return True
+
+
+async def require_admin(x_admin_key: str = Header(None)) -> None:
+    """
+    Guard for /admin endpoints: the X-Admin-Key header must match settings.admin_api_key
+    
+    Raises:
+        HTTPException: 404 when admin endpoints are disabled, 403 on a wrong key
+    """
+    if not settings.admin_api_key:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Not found"
+        )
+    if not x_admin_key or not hmac.compare_digest(x_admin_key, settings.admin_api_key):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid admin key"
+        )
@@ -0,0 +1,401 @@
+"""
+Pluggable cache backend shared by all workers
+Holds what must agree across processes: version counters (ETag tokens)
+and invalidation broadcasts. Chosen by settings.cache_backend:
+
+- "memory": in-process LRU; fine for a single worker
+- "shared": SQLite file in shared memory (/dev/shm), visible to every
+  worker on the host; invalidations are polled from an events table
+- "redis": any Redis-compatible server (Redis, Valkey, KeyDB, Dragonfly);
+  invalidations use pub/sub, so workers on several hosts stay consistent
+- "none": caches nothing; every version read is new, so ETags never match
+
+Per-user recommendation results are also stored through get/set on
+shared backends, so a ranking computed by one worker serves them all
+(app.recommendation_store). The other derived caches (catalog snapshot,
+facets, explanations) are cheap to rebuild and read many times per
+request, so they stay in each process, keyed by the shared version tokens
+so a worker never serves data another worker has invalidated.
+"""
+import itertools
+import logging
+import os
+import pickle
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+from app.config import get_settings
+
+try:
+    import redis
+except ImportError:  # Optional: only needed for cache_backend = "redis"
+    redis = None
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Identifies this process in broadcasts so it does not handle its own twice
+ORIGIN = f"{os.getpid()}.{uuid.uuid4().hex[:8]}"
+CHANNEL = "ai-counsellor:invalidate"
+
+_handlers: Dict[str, List[Callable[[Optional[str]], None]]] = {}
+
+
+def on_invalidate(kind: str, handler: Callable[[Optional[str]], None]) -> None:
+    """Run handler(key) in every worker when `kind` is invalidated anywhere"""
+    _handlers.setdefault(kind, []).append(handler)
+
+
+def _dispatch(kind: str, key: Optional[str]) -> None:
+    for handler in _handlers.get(kind, ()):
+        try:
+            handler(key)
+        except Exception as e:
+            logger.warning("Invalidation handler failed", extra={"kind": kind, "error": str(e)})
+
+
+class CacheBackend:
+    """Interface every backend implements"""
+
+    name = "base"
+    # True when other worker processes see the same keys
+    shared = False
+
+    def get(self, key: str) -> Any:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        raise NotImplementedError
+
+    def add(self, key: str, value: Any) -> Any:
+        """Set key only if absent; returns the value now stored"""
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def incr(self, key: str) -> int:
+        """Atomically increment a counter, returning the new value"""
+        raise NotImplementedError
+
+    def counter(self, key: str) -> int:
+        raise NotImplementedError
+
+    def publish(self, kind: str, key: Optional[str]) -> None:
+        """Deliver an invalidation to the other workers"""
+
+    def invalidate(self, kind: str, key: Optional[str] = None) -> None:
+        """Handle an invalidation here and broadcast it to every other worker"""
+        _dispatch(kind, key)
+        self.publish(kind, key)
+
+    @property
+    def epoch(self) -> str:
+        """
+        Prefix for version tokens; changes whenever the counters could have been reset
+
+        Backends that evict entries keep it beside the counters instead, so
+        eviction never changes it
+        """
+        return self.add("cache_epoch", uuid.uuid4().hex[:8])
+
+    def close(self) -> None:
+        pass
+
+
+class MemoryCache(CacheBackend):
+    """Bounded in-process LRU with optional per-key TTL"""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._counters: Dict[str, int] = {}
+        # Counters live and die with the process, and so does the epoch
+        self._epoch = uuid.uuid4().hex[:8]
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires is not None and expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl if ttl else None)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def add(self, key: str, value: Any) -> Any:
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = (value, None)
+            return self._entries[key][0]
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def counter(self, key: str) -> int:
+        return self._counters.get(key, 0)
+
+    @property
+    def epoch(self) -> str:
+        return self._epoch
+
+
+class NullCache(CacheBackend):
+    """Caches nothing: reads miss and every counter read is a new value"""
+
+    name = "none"
+
+    def __init__(self):
+        self._sequence = itertools.count(1)
+        self._epoch = uuid.uuid4().hex[:8]
+
+    def get(self, key: str) -> Any:
+        return None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        pass
+
+    def add(self, key: str, value: Any) -> Any:
+        return value
+
+    def delete(self, key: str) -> None:
+        pass
+
+    def incr(self, key: str) -> int:
+        return next(self._sequence)
+
+    def counter(self, key: str) -> int:
+        return next(self._sequence)
+
+    @property
+    def epoch(self) -> str:
+        return self._epoch
+
+
+class SharedFileCache(CacheBackend):
+    """
+    SQLite database in shared memory, one connection per thread
+
+    Every worker on the host opens the same file; WAL mode lets readers run
+    alongside a writer. Invalidations are rows in an events table that a
+    background thread in each worker polls.
+    """
+
+    name = "shared"
+    shared = True
+    POLL_SECONDS = 0.25
+    EVENT_RETENTION_SECONDS = 300
+
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._writes = 0
+        with self._connection() as db:
+            db.executescript("""
+                CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value BLOB, expires REAL);
+                CREATE TABLE IF NOT EXISTS counters (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+                CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+                CREATE TABLE IF NOT EXISTS events (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT, key TEXT, origin TEXT, created REAL
+                );
+            """)
+            self._last_event = db.execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()[0]
+        self._stop = threading.Event()
+        self._poller = threading.Thread(target=self._poll, name="cache-invalidations", daemon=True)
+        self._poller.start()
+
+    def _connection(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=OFF")  # Shared memory: nothing to make durable
+            self._local.db = db
+        return db
+
+    def get(self, key: str) -> Any:
+        row = self._connection().execute("SELECT value, expires FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        if row[1] is not None and row[1] <= time.time():
+            self.delete(key)
+            return None
+        return pickle.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        db = self._connection()
+        db.execute(
+            "INSERT OR REPLACE INTO entries (key, value, expires) VALUES (?, ?, ?)",
+            (key, pickle.dumps(value), time.time() + ttl if ttl else None)
+        )
+        self._writes += 1
+        if self._writes % 256 == 0:
+            # Trim expired entries, then the oldest beyond max_entries
+            db.execute("DELETE FROM entries WHERE expires IS NOT NULL AND expires <= ?", (time.time(),))
+            db.execute(
+                "DELETE FROM entries WHERE rowid IN (SELECT rowid FROM entries ORDER BY rowid DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def add(self, key: str, value: Any) -> Any:
+        db = self._connection()
+        db.execute("INSERT OR IGNORE INTO entries (key, value, expires) VALUES (?, ?, NULL)", (key, pickle.dumps(value)))
+        return self.get(key)
+
+    def delete(self, key: str) -> None:
+        self._connection().execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def incr(self, key: str) -> int:
+        return self._connection().execute(
+            "INSERT INTO counters (key, value) VALUES (?, 1) "
+            "ON CONFLICT(key) DO UPDATE SET value = value + 1 RETURNING value",
+            (key,)
+        ).fetchone()[0]
+
+    def counter(self, key: str) -> int:
+        row = self._connection().execute("SELECT value FROM counters WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else 0
+
+    @property
+    def epoch(self) -> str:
+        """Kept in the meta table, which the entry trim never touches; new with a new file"""
+        db = self._connection()
+        db.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('epoch', ?)", (uuid.uuid4().hex[:8],))
+        return db.execute("SELECT value FROM meta WHERE key = 'epoch'").fetchone()[0]
+
+    def publish(self, kind: str, key: Optional[str]) -> None:
+        db = self._connection()
+        now = time.time()
+        db.execute("INSERT INTO events (kind, key, origin, created) VALUES (?, ?, ?, ?)", (kind, key, ORIGIN, now))
+        db.execute("DELETE FROM events WHERE created < ?", (now - self.EVENT_RETENTION_SECONDS,))
+
+    def _poll(self) -> None:
+        while not self._stop.wait(self.POLL_SECONDS):
+            try:
+                rows = self._connection().execute(
+                    "SELECT id, kind, key, origin FROM events WHERE id > ? ORDER BY id", (self._last_event,)
+                ).fetchall()
+            except sqlite3.Error as e:
+                logger.warning("Could not read cache invalidations", extra={"error": str(e)})
+                continue
+            for event_id, kind, key, origin in rows:
+                self._last_event = event_id
+                if origin != ORIGIN:
+                    _dispatch(kind, key)
+
+    def close(self) -> None:
+        self._stop.set()
+
+
+class RedisCache(CacheBackend):
+    """Redis-compatible server; invalidations over pub/sub"""
+
+    name = "redis"
+    shared = True
+    PREFIX = "ai-counsellor:"
+
+    def __init__(self, url: str):
+        if redis is None:
+            raise RuntimeError("cache_backend = 'redis' needs the redis package (pip install redis)")
+        self.client = redis.Redis.from_url(url)
+        self._pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.subscribe(**{CHANNEL: self._on_message})
+        self._listener = self._pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+
+    def _key(self, key: str) -> str:
+        return self.PREFIX + key
+
+    def get(self, key: str) -> Any:
+        value = self.client.get(self._key(key))
+        return pickle.loads(value) if value is not None else None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self.client.set(self._key(key), pickle.dumps(value), px=int(ttl * 1000) if ttl else None)
+
+    def add(self, key: str, value: Any) -> Any:
+        self.client.set(self._key(key), pickle.dumps(value), nx=True)
+        return self.get(key)
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self._key(key))
+
+    def incr(self, key: str) -> int:
+        return self.client.incr(self._key("counter:" + key))
+
+    def counter(self, key: str) -> int:
+        value = self.client.get(self._key("counter:" + key))
+        return int(value) if value is not None else 0
+
+    def publish(self, kind: str, key: Optional[str]) -> None:
+        self.client.publish(CHANNEL, f"{ORIGIN}\t{kind}\t{key or ''}")
+
+    def _on_message(self, message) -> None:
+        origin, kind, key = message["data"].decode().split("\t", 2)
+        if origin != ORIGIN:
+            _dispatch(kind, key or None)
+
+    def close(self) -> None:
+        self._listener.stop()
+        self.client.close()
+
+
+def default_shared_path() -> str:
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base, "ai-counsellor-cache.sqlite3")
+
+
+def create_cache(backend: str) -> CacheBackend:
+    if backend == "memory":
+        return MemoryCache(settings.cache_max_entries)
+    if backend == "shared":
+        return SharedFileCache(settings.cache_shared_path or default_shared_path(), settings.cache_max_entries)
+    if backend == "redis":
+        return RedisCache(settings.cache_url)
+    if backend == "none":
+        return NullCache()
+    raise ValueError(f"Unknown cache backend: {backend} (expected memory, shared, redis or none)")
+
+
+_cache: Optional[CacheBackend] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> CacheBackend:
+    """The configured backend, created on first use"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = create_cache(settings.cache_backend)
+    return _cache
+
+
+def close_cache() -> None:
+    """Stop the backend's listener threads and connections (on shutdown)"""
+    global _cache
+    if _cache is not None:
+        _cache.close()
+        _cache = None
@@ -0,0 +1,141 @@
+"""
+In-memory university catalog snapshot
+Loaded once per catalog version and shared by read-heavy endpoints
+"""
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from app.compact import University, as_university
+from app.database import supabase
+from app.search import SearchIndex
+from app.versioning import get_catalog_version
+
+# PostgREST caps rows per request, so the catalog is fetched in pages
+PAGE_SIZE = 1000
+
+
+class CatalogSnapshot:
+    """All universities at one catalog version, as compact University records"""
+
+    def __init__(self, version: str, universities: Iterable[Dict[str, Any]]):
+        self.version = version
+        self.universities: List[University] = [as_university(uni) for uni in universities]
+        self.by_id = {uni.id: uni for uni in self.universities}
+        # Name and search indexes, built on first lookup (or by the startup warm-up)
+        self._names_lower: Optional[List[str]] = None
+        self._by_name: Optional[Dict[str, University]] = None
+        self._search_index: Optional[SearchIndex] = None
+
+    @property
+    def search_index(self) -> SearchIndex:
+        """Ranked full-text index (app.search) over this snapshot"""
+        if self._search_index is None:
+            self._search_index = SearchIndex(self.universities)
+        return self._search_index
+
+    def build_indexes(self) -> None:
+        """Lower-cased name index used by find_by_name, and the search index"""
+        self.search_index
+        if self._by_name is None:
+            names = [(uni.name or "").lower() for uni in self.universities]
+            by_name: Dict[str, University] = {}
+            for name, uni in zip(names, self.universities):
+                by_name.setdefault(name, uni)
+            self._names_lower = names
+            self._by_name = by_name
+
+    def find_by_name(self, name: str) -> Optional[University]:
+        """
+        University by name, ignoring case: an exact match, else the first
+        (lowest id) whose name contains it, like ILIKE '%name%'
+        """
+        self.build_indexes()
+        needle = name.strip().lower()
+        if not needle:
+            return None
+        exact = self._by_name.get(needle)
+        if exact is not None:
+            return exact
+        for position, candidate in enumerate(self._names_lower):
+            if needle in candidate:
+                return self.universities[position]
+        return None
+
+
+_snapshot: Optional[CatalogSnapshot] = None
+_reload_listeners: List[Callable[[CatalogSnapshot], None]] = []
+
+
+def on_catalog_reload(listener: Callable[[CatalogSnapshot], None]) -> None:
+    """Register a callback run after a new catalog version has been loaded"""
+    _reload_listeners.append(listener)
+
+
+def fetch_all_universities() -> List[Dict[str, Any]]:
+    """Read the whole universities table page by page"""
+    rows = []
+    start = 0
+    while True:
+        result = supabase.table("universities").select("*")\
+            .order("id")\
+            .range(start, start + PAGE_SIZE - 1)\
+            .execute()
+        page = result.data or []
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            return rows
+        start += PAGE_SIZE
+
+
+def get_catalog() -> CatalogSnapshot:
+    """Get the catalog snapshot, reloading it when the catalog version changes"""
+    global _snapshot
+    version = get_catalog_version()
+    if _snapshot is None or _snapshot.version != version:
+        is_reload = _snapshot is not None
+        _snapshot = CatalogSnapshot(version, fetch_all_universities())
+        if is_reload:
+            for listener in _reload_listeners:
+                try:
+                    listener(_snapshot)
+                except Exception as e:
+                    print(f"Warning: Catalog reload listener failed: {e}")
+    return _snapshot
+
+
+def total_annual_cost(uni: Dict[str, Any]) -> float:
+    """Tuition (upper bound) plus yearly living cost"""
+    return (uni.get("tuition_max", 0) or 0) + (uni.get("living_cost_yearly", 0) or 0)
+
+
+def failed_filters(
+    uni: Dict[str, Any],
+    country: Optional[str] = None,
+    min_budget: Optional[float] = None,
+    max_budget: Optional[float] = None,
+    field: Optional[str] = None,
+    has_scholarships: Optional[bool] = None,
+    min_gpa: Optional[float] = None
+) -> set:
+    """
+    Names of the search filters a university does not pass
+
+    Mirrors search_universities: the database filters (country, scholarships,
+    min_gpa) and the budget / field post-processing. The text search is
+    ranked through the search index instead (see FacetService.get_facets)
+    """
+    failed = set()
+    if country and uni.get("country") != country:
+        failed.add("country")
+    if has_scholarships is not None and uni.get("has_scholarships") != has_scholarships:
+        failed.add("has_scholarships")
+    if min_gpa is not None and (uni.get("min_gpa") is None or uni["min_gpa"] > min_gpa):
+        failed.add("min_gpa")
+    if min_budget is not None or max_budget is not None:
+        cost = total_annual_cost(uni)
+        if (min_budget and cost < min_budget) or (max_budget and cost > max_budget):
+            failed.add("budget")
+    if field:
+        field_lower = field.lower()
+        programs = uni.get("programs_offered", []) or []
+        if not any(field_lower in program.lower() for program in programs):
+            failed.add("field")
+    return failed
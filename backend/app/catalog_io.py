@@ -0,0 +1,240 @@
+"""
+Streaming catalog export / import
+Moves the universities table between environments as NDJSON or gzip CSV.
+Export pages through the table by id and yields encoded chunks; import
+parses, validates and upserts batch by batch, so memory stays flat
+whatever the catalog size.
+
+Usage:
+    python -m app.catalog_io export --output universities.ndjson
+    python -m app.catalog_io export --format csv --output universities.csv.gz
+    python -m app.catalog_io import --file universities.csv.gz --batch-size 500
+"""
+import argparse
+import csv
+import gzip
+import io
+import sys
+import time
+import zlib
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+import orjson
+from pydantic import ValidationError
+
+from app.database import supabase
+from app.projections import UNIVERSITY_COLUMNS
+from app.schemas import UniversityImport
+from app.seed_universities import (
+    DEFAULT_BATCH_SIZE,
+    SKIPPED_COLUMNS,
+    file_format,
+    iter_rows,
+    read_rows,
+    upsert_universities
+)
+from app.synthetic import csv_value
+from app.versioning import bump_catalog_version
+
+EXPORT_COLUMNS = UNIVERSITY_COLUMNS + ("created_at",)
+EXPORT_PAGE_SIZE = 1000
+# Encoded bytes buffered before a chunk is handed to the response
+CHUNK_BYTES = 64 * 1024
+# Validation errors kept in an import report
+MAX_REPORTED_ERRORS = 50
+
+
+def iter_universities(page_size: int = EXPORT_PAGE_SIZE, client=None) -> Iterator[Dict[str, Any]]:
+    """Every university ordered by id, fetched page by page (keyset, not OFFSET)"""
+    client = client or supabase
+    last_id = 0
+    while True:
+        result = client.table("universities").select(", ".join(EXPORT_COLUMNS))\
+            .gt("id", last_id)\
+            .order("id")\
+            .limit(page_size)\
+            .execute()
+        page = result.data or []
+        yield from page
+        if len(page) < page_size:
+            return
+        last_id = page[-1]["id"]
+
+
+def export_ndjson(rows: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    """One JSON object per line, in chunks of about CHUNK_BYTES"""
+    buffer = bytearray()
+    for row in rows:
+        buffer += orjson.dumps(row)
+        buffer += b"\n"
+        if len(buffer) >= CHUNK_BYTES:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+def export_csv_gzip(rows: Iterable[Dict[str, Any]], level: int = 6) -> Iterator[bytes]:
+    """Gzip-compressed CSV with a header row; arrays as Postgres array literals"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31 = gzip container
+    text = io.StringIO()
+    writer = csv.writer(text)
+    writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        writer.writerow([csv_value(row.get(c)) for c in EXPORT_COLUMNS])
+        if text.tell() >= CHUNK_BYTES:
+            chunk = compressor.compress(text.getvalue().encode())
+            text.seek(0)
+            text.truncate()
+            if chunk:
+                yield chunk
+    chunk = compressor.compress(text.getvalue().encode()) + compressor.flush()
+    if chunk:
+        yield chunk
+
+
+class ImportReport:
+    """Counters for one import run"""
+
+    def __init__(self):
+        self.read = 0
+        self.invalid = 0
+        self.errors: List[Dict[str, Any]] = []
+
+    def reject(self, row_number: int, row: Dict[str, Any], error: ValidationError) -> None:
+        self.invalid += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({
+                "row": row_number,
+                "name": row.get("name"),
+                "error": "; ".join(
+                    f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in error.errors()
+                )
+            })
+
+
+def validate_rows(rows: Iterable[Dict[str, Any]], report: ImportReport, strict: bool = False) -> Iterator[Dict[str, Any]]:
+    """
+    Pass through rows that validate as UniversityImport, without id / created_at
+
+    Ids belong to the source environment (shortlists there reference them),
+    so rows are matched on (name, country) instead. Invalid rows are skipped
+    and recorded, or raise ValueError when strict
+    """
+    for row_number, row in enumerate(rows, 1):
+        report.read += 1
+        try:
+            UniversityImport.model_validate(row)
+        except ValidationError as e:
+            report.reject(row_number, row, e)
+            if strict:
+                raise ValueError(f"Row {row_number} is invalid: {report.errors[-1]['error']}")
+            continue
+        yield {k: v for k, v in row.items() if k not in SKIPPED_COLUMNS}
+
+
+def import_universities(
+    open_rows: Callable[[], Iterable[Dict[str, Any]]],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    strict: bool = False,
+    client=None,
+    progress: Optional[Callable[[int, float], None]] = None
+) -> Dict[str, Any]:
+    """
+    Validate and upsert rows in batches; returns a summary report
+
+    open_rows returns a fresh iterator over the input on each call. In strict
+    mode the input is read twice: every row is validated before anything is
+    upserted, so an invalid row leaves the table untouched.
+    """
+    if strict:
+        for _ in validate_rows(open_rows(), ImportReport(), strict=True):
+            pass
+    report = ImportReport()
+    summary = upsert_universities(
+        validate_rows(open_rows(), report),
+        batch_size=batch_size,
+        client=client or supabase,
+        progress=progress
+    )
+    # The database trigger bumps the shared version; this drops our own caches now
+    bump_catalog_version()
+    return {
+        "read": report.read,
+        "upserted": summary["rows"],
+        "invalid": report.invalid,
+        "batches": summary["batches"],
+        "seconds": round(summary["seconds"], 3),
+        "rows_per_sec": round(summary["rows"] / max(summary["seconds"], 1e-9), 1),
+        "errors": report.errors
+    }
+
+
+def iter_stream_rows(raw: IO[bytes], fmt: str) -> Iterator[Dict[str, Any]]:
+    """Rows from a seekable binary NDJSON or CSV stream, gunzipped when it starts with the gzip magic"""
+    if fmt not in ("ndjson", "csv"):
+        raise ValueError(f"Unsupported format: {fmt} (expected ndjson or csv)")
+    raw.seek(0)
+    head = raw.read(2)
+    raw.seek(0)
+    binary = gzip.GzipFile(fileobj=raw) if head == b"\x1f\x8b" else raw
+    text = io.TextIOWrapper(binary, encoding="utf-8", newline="" if fmt == "csv" else None)
+    try:
+        yield from iter_rows(text, fmt)
+    finally:
+        # Leave raw open so the stream can be read again (strict imports read it twice)
+        text.detach()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="Stream the universities table to a file")
+    export.add_argument("--format", choices=["ndjson", "csv"], default="ndjson", help="csv is always gzip-compressed")
+    export.add_argument("--output", help="File to write (default: stdout)")
+    export.add_argument("--page-size", type=int, default=EXPORT_PAGE_SIZE)
+
+    load = commands.add_parser("import", help="Validate and upsert universities from a file")
+    load.add_argument("--file", required=True, help="JSON, NDJSON or CSV file, optionally .gz")
+    load.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    load.add_argument("--strict", action="store_true", help="Import nothing if any row is invalid")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if args.command == "export":
+        count = 0
+
+        def counted(rows):
+            nonlocal count
+            for row in rows:
+                count += 1
+                yield row
+
+        rows = counted(iter_universities(args.page_size))
+        chunks = export_csv_gzip(rows) if args.format == "csv" else export_ndjson(rows)
+        out = open(args.output, "wb") if args.output else sys.stdout.buffer
+        try:
+            for chunk in chunks:
+                out.write(chunk)
+        finally:
+            if args.output:
+                out.close()
+        elapsed = time.perf_counter() - started
+        print(f"Exported {count} universities in {elapsed:.1f}s ({count / max(elapsed, 1e-9):.0f} rows/sec)", file=sys.stderr)
+    else:
+        file_format(args.file)  # Reject unknown extensions before connecting
+        report = import_universities(
+            lambda: read_rows(args.file),
+            batch_size=args.batch_size,
+            strict=args.strict,
+            progress=lambda n, elapsed: print(f"  {n} rows ({n / max(elapsed, 1e-9):.0f} rows/sec)", file=sys.stderr)
+        )
+        print(f"Imported {report['upserted']} of {report['read']} rows in {report['seconds']}s "
+              f"({report['rows_per_sec']} rows/sec, {report['invalid']} invalid)", file=sys.stderr)
+        for error in report["errors"]:
+            print(f"  row {error['row']} ({error['name']}): {error['error']}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
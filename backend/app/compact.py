@@ -0,0 +1,133 @@
+"""
+Compact in-memory university records
+The catalog snapshot keeps each university as a __slots__ record instead of
+a PostgREST JSON dict: no per-row key table, interned country / city /
+program strings, tuples instead of lists, and the offered programs as an
+integer bitmask over a shared program vocabulary.
+
+Records also answer .get() / [] / keys() like the dicts they replace, so
+response building and filters work on either.
+"""
+import sys
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+UNIVERSITY_FIELDS = (
+    "id", "name", "country", "city", "ranking", "programs_offered",
+    "min_gpa", "min_ielts", "min_toefl", "requires_gre", "requires_gmat",
+    "tuition_min", "tuition_max", "living_cost_yearly",
+    "has_scholarships", "scholarship_types", "scholarship_amount_min",
+    "scholarship_amount_max", "scholarship_deadline",
+    "acceptance_rate", "description", "created_at",
+)
+_FIELD_SET = frozenset(UNIVERSITY_FIELDS)
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _intern_all(values: Optional[Iterable[str]]) -> Tuple[str, ...]:
+    return tuple(sys.intern(v) for v in values) if values else ()
+
+
+class ProgramVocabulary:
+    """Program names seen so far, each assigned one bit for program masks"""
+
+    def __init__(self):
+        self.names: List[str] = []
+        self._bits: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def mask(self, programs: Iterable[str]) -> int:
+        """Bitmask of the given program names, assigning bits to new names"""
+        mask = 0
+        for name in programs:
+            bit = self._bits.get(name)
+            if bit is None:
+                with self._lock:
+                    bit = self._bits.get(name)
+                    if bit is None:
+                        bit = len(self.names)
+                        self.names.append(name)
+                        self._bits[name] = bit
+            mask |= 1 << bit
+        return mask
+
+    def mask_where(self, predicate) -> int:
+        """Bitmask of every known program name for which predicate(name) is true"""
+        mask = 0
+        for bit, name in enumerate(list(self.names)):
+            if predicate(name):
+                mask |= 1 << bit
+        return mask
+
+
+# Shared by every snapshot so masks stay comparable across catalog reloads
+programs = ProgramVocabulary()
+
+
+class University:
+    """One university row in compact form"""
+
+    __slots__ = UNIVERSITY_FIELDS + ("program_mask",)
+
+    def __init__(self, row: Dict[str, Any]):
+        get = row.get
+        self.id = get("id")
+        self.name = get("name")
+        self.country = _intern(get("country"))
+        self.city = _intern(get("city"))
+        self.ranking = get("ranking")
+        self.programs_offered = _intern_all(get("programs_offered"))
+        self.program_mask = programs.mask(self.programs_offered)
+        self.min_gpa = get("min_gpa")
+        self.min_ielts = get("min_ielts")
+        self.min_toefl = get("min_toefl")
+        self.requires_gre = get("requires_gre")
+        self.requires_gmat = get("requires_gmat")
+        self.tuition_min = get("tuition_min")
+        self.tuition_max = get("tuition_max")
+        self.living_cost_yearly = get("living_cost_yearly")
+        self.has_scholarships = get("has_scholarships")
+        self.scholarship_types = _intern_all(get("scholarship_types"))
+        self.scholarship_amount_min = get("scholarship_amount_min")
+        self.scholarship_amount_max = get("scholarship_amount_max")
+        self.scholarship_deadline = _intern(get("scholarship_deadline"))
+        self.acceptance_rate = get("acceptance_rate")
+        self.description = get("description")
+        self.created_at = _intern(get("created_at"))
+
+    # Mapping-style access, mirroring the PostgREST dict
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in _FIELD_SET else default
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in _FIELD_SET:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in _FIELD_SET
+
+    def keys(self) -> Tuple[str, ...]:
+        return UNIVERSITY_FIELDS
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-ready dict in the PostgREST row shape"""
+        row = {field: getattr(self, field) for field in UNIVERSITY_FIELDS}
+        row["programs_offered"] = list(self.programs_offered)
+        row["scholarship_types"] = list(self.scholarship_types)
+        return row
+
+    def __repr__(self) -> str:
+        return f"University(id={self.id!r}, name={self.name!r})"
+
+
+def as_university(university: Any) -> University:
+    """A University record for a row dict (records are returned unchanged)"""
+    return university if isinstance(university, University) else University(university)
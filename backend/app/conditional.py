@@ -0,0 +1,71 @@
+"""
+Conditional GET support (ETag / If-None-Match)
+Route dependencies compute a strong ETag from version tokens before any
+query runs, and answer 304 when the client already has that representation
+"""
+import hashlib
+from fastapi import Depends, Request
+from app.auth import get_current_user
+from app.versioning import get_catalog_version, get_shortlist_version
+
+
+class NotModified(Exception):
+    """Raised by an ETag dependency when the client's copy is current"""
+
+    def __init__(self, etag: str):
+        self.etag = etag
+
+
+def build_etag(request: Request, *tokens: str) -> str:
+    """Strong ETag over the version tokens, the path and the query string"""
+    query = "&".join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items()))
+    key = "|".join([*tokens, request.url.path, query])
+    return f'"{hashlib.sha1(key.encode()).hexdigest()[:20]}"'
+
+
+def _strip_encoding_suffix(tag: str) -> str:
+    for suffix in ('-br"', '-gzip"'):
+        if tag.endswith(suffix):
+            return tag[:-len(suffix)] + '"'
+    return tag
+
+
+def _check(request: Request, etag: str) -> None:
+    """Remember the ETag for the response, or short-circuit with 304"""
+    request.state.etag = etag
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        # Compressed responses carry the encoding as an ETag suffix
+        candidates = {
+            _strip_encoding_suffix(tag.strip())
+            for tag in if_none_match.split(",")
+        }
+        if etag in candidates or "*" in candidates:
+            raise NotModified(etag)
+
+
+async def catalog_etag(request: Request) -> None:
+    """ETag for responses that depend only on the university catalog"""
+    _check(request, build_etag(request, "catalog", get_catalog_version()))
+
+
+async def catalog_user_etag(request: Request, current_user: dict = Depends(get_current_user)) -> None:
+    """ETag for catalog responses enriched with the user's shortlist info"""
+    _check(request, build_etag(
+        request,
+        "catalog-user",
+        get_catalog_version(),
+        current_user.id,
+        get_shortlist_version(current_user.id)
+    ))
+
+
+async def shortlist_etag(request: Request, current_user: dict = Depends(get_current_user)) -> None:
+    """ETag for the user's shortlist (embeds university columns too)"""
+    _check(request, build_etag(
+        request,
+        "shortlist",
+        get_catalog_version(),
+        current_user.id,
+        get_shortlist_version(current_user.id)
+    ))
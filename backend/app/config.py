@@ -27,6 +27,72 @@ class Settings(BaseSettings):
     secret_key: str
     environment: str = "development"
     
+    # Caching
+    catalog_version_ttl_seconds: float = 5.0  # How often the catalog version is re-read
+    cache_backend: str = "memory"  # memory | shared | redis | none (see app.cache)
+    cache_url: str = "redis://localhost:6379/0"  # For cache_backend = "redis"
+    cache_shared_path: str = ""  # For cache_backend = "shared"; defaults to /dev/shm
+    cache_max_entries: int = 10000
+
+    # Data access for the hot routes: "postgrest" (Supabase HTTP API) or
+    # "sql" (direct asyncpg pool, app.sql_queries; needs database_url)
+    data_backend: str = "postgrest"
+    database_url: str = ""  # postgresql+asyncpg://postgres:<password>@db.<project>.supabase.co:5432/postgres
+    db_pool_size: int = 10  # Connections kept open per worker
+    db_max_overflow: int = 5  # Extra connections allowed under bursts
+    db_pool_timeout: float = 5.0  # Seconds to wait for a free connection
+    db_pool_recycle: int = 1800  # Reconnect connections older than this (seconds)
+    db_statement_cache_size: int = 100  # Prepared statements per connection; 0 behind a transaction pooler (port 6543)
+    db_command_timeout: float = 10.0
+
+    # University search: "catalog" (in-memory index, app.search; facets use the
+    # same index) or "database" (search_universities_ranked RPC, see
+    # migrations/add_university_search.sql)
+    search_backend: str = "catalog"
+
+    # Production server (app.serve)
+    web_concurrency: int = 0  # Worker processes; 0 = one per CPU core
+
+    # Recommendations
+    recommendation_top_n: int = 50  # Ranked results kept per user
+    recommendation_memory_users: int = 1000  # Users kept in the in-memory tier
+    
+    # Scoring rules (YAML/JSON, hot-reloaded when the file changes)
+    scoring_rules_path: str = "scoring_rules.yaml"
+    scoring_rules_check_seconds: float = 5.0
+    
+    # Response compression
+    compression_min_size: int = 1024  # Bytes; smaller bodies are sent as-is
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+    
+    # Startup warm-up (app.warmup); /ready is 503 until it finishes
+    warmup_enabled: bool = True
+    warmup_gemini: bool = True  # Open Gemini connections too (one free count_tokens / list call)
+    
+    # Admin endpoints (/admin/*), disabled while empty
+    admin_api_key: str = ""
+    
+    # Profiling (app.profiling), off unless enabled
+    profiling_enabled: bool = False
+    profiling_sample_rate: float = 0.0  # Fraction of requests sampled without being asked
+    profiling_sample_interval_ms: float = 5.0
+    profiling_output_dir: str = "profiles"
+    profiling_max_files: int = 50
+    profiling_redact: bool = True  # Strip host paths and query strings from stored profiles
+    
+    # Tracing and logging (app.tracing)
+    tracing_exporter: str = "none"  # none, console (stderr) or file
+    tracing_file: str = "traces.ndjson"
+    log_format: str = "text"  # text or json
+    log_level: str = "INFO"
+    
+    # Slow-query log and N+1 detection (app.query_debug)
+    query_debug: bool = False  # Opt-in; enable in development and staging only
+    slow_query_ms: float = 200.0
+    n_plus_one_threshold: int = 3  # Same table + filter shape more than this per request
+    request_query_limit: int = 25  # Total queries per request
+    
     # CORS
     allowed_origins: list[str] = ["http://localhost:3000"]
     
@@ -1,179 +1,122 @@
 """
-Supabase database connection and models.
-Using Supabase as PostgreSQL database with SQLAlchemy.
+Supabase database connection
+The client is created on first use rather than at import, so importing the
+app (tests, workers scaling up) does not pay for the SDK import and client
+setup until a request actually needs the database.
+
+With data_backend = "sql" the hot routes read over a direct asyncpg pool
+instead (get_engine, app.sql_queries); SQLAlchemy models live in app.models.
 """
-from sqlalchemy import create_engine, Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey, ARRAY
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
-from datetime import datetime
-from supabase import create_client, Client
+import threading
+from typing import TYPE_CHECKING, AsyncIterator
 from app.config import get_settings
 
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+    from supabase import Client
+
 settings = get_settings()
 
-# Supabase client for authentication (using Service Role to bypass RLS for backend ops)
-# Backend validates user via JWT in dependencies, so DB access should be privileged
-supabase: Client = create_client(settings.supabase_url, settings.supabase_service_key)
-
-# SQLAlchemy setup for direct database access
-# Supabase provides a PostgreSQL connection string in the project settings
-Base = declarative_base()
-
-
-class User(Base):
-    """User account model"""
-    __tablename__ = "users"
-    
-    id = Column(String, primary_key=True)  # Supabase Auth UID
-    email = Column(String, unique=True, nullable=False, index=True)
-    name = Column(String, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    
-    # Relationships
-    profile = relationship("Profile", back_populates="user", uselist=False)
-    stage = relationship("UserStage", back_populates="user", uselist=False)
-    chat_history = relationship("ChatHistory", back_populates="user")
-    tasks = relationship("Task", back_populates="user")
-
-
-class Profile(Base):
-    """User profile with onboarding data"""
-    __tablename__ = "profiles"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(String, ForeignKey("users.id"), unique=True, nullable=False)
-    
-    # Academic Background
-    education_level = Column(String)  # Bachelors, Masters, etc.
-    degree = Column(String)
-    major = Column(String)
-    graduation_year = Column(Integer)
-    gpa = Column(Float)
-    
-    # Study Goal
-    intended_degree = Column(String)  # Masters, PhD, etc.
-    field_of_study = Column(String)
-    target_intake_year = Column(Integer)
-    preferred_countries = Column(ARRAY(String))  # Array of country names
-    
-    # Budget
-    budget_min = Column(Float)
-    budget_max = Column(Float)
-    funding_type = Column(String)  # self, loan, scholarship
-    
-    # Exams & Readiness
-    ielts_toefl_status = Column(String)  # Not Started, Scheduled, Completed
-    ielts_toefl_score = Column(Float, nullable=True)
-    gre_gmat_status = Column(String)
-    gre_gmat_score = Column(Float, nullable=True)
-    sop_status = Column(String)  # Not Started, Draft, Ready
-    
-    # Profile completion
-    is_complete = Column(Boolean, default=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    
-    # Relationships
-    user = relationship("User", back_populates="profile")
-
-
-class UserStage(Base):
-    """User's current stage in the journey"""
-    __tablename__ = "user_stages"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(String, ForeignKey("users.id"), unique=True, nullable=False)
-    current_stage = Column(String, default="ONBOARDING")  # ONBOARDING, PROFILE_READY, DISCOVERY, SHORTLISTING, LOCKED, APPLYING
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    
-    # Relationships
-    user = relationship("User", back_populates="stage")
-
-
-class ChatHistory(Base):
-    """AI chat conversation history"""
-    __tablename__ = "chat_history"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(String, ForeignKey("users.id"), nullable=False)
-    message = Column(Text, nullable=False)
-    response = Column(Text, nullable=False)
-    timestamp = Column(DateTime, default=datetime.utcnow)
-    
-    # Relationships
-    user = relationship("User", back_populates="chat_history")
-
-
-class Task(Base):
-    """AI-generated tasks for users"""
-    __tablename__ = "tasks"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(String, ForeignKey("users.id"), nullable=False)
-    title = Column(String, nullable=False)
-    description = Column(Text)
-    is_complete = Column(Boolean, default=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    completed_at = Column(DateTime, nullable=True)
-    
-    # Relationships
-    user = relationship("User", back_populates="tasks")
-
-
-class University(Base):
-    """University database (seeded data)"""
-    __tablename__ = "universities"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, nullable=False)
-    country = Column(String, nullable=False)
-    city = Column(String)
-    ranking = Column(Integer)
-    
-    # Program information
-    programs_offered = Column(ARRAY(String))
-    
-    # Requirements
-    min_gpa = Column(Float)
-    min_ielts = Column(Float)
-    min_toefl = Column(Float)
-    requires_gre = Column(Boolean, default=False)
-    requires_gmat = Column(Boolean, default=False)
-    
-    # Cost information
-    tuition_min = Column(Float)
-    tuition_max = Column(Float)
-    living_cost_yearly = Column(Float)
-    
-    # Scholarship information
-    has_scholarships = Column(Boolean, default=False)
-    scholarship_types = Column(ARRAY(String))  # Merit, Need-based, Athletic, etc.
-    scholarship_amount_min = Column(Float)  # Min scholarship amount
-    scholarship_amount_max = Column(Float)  # Max scholarship amount
-    scholarship_deadline = Column(String)  # e.g., "January 15"
-    
-    # Additional info
-    acceptance_rate = Column(Float)  # Percentage
-    description = Column(Text)
-
-
-
-class Shortlist(Base):
-    """User's shortlisted universities"""
-    __tablename__ = "shortlists"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(String, ForeignKey("users.id"), nullable=False)
-    university_id = Column(Integer, ForeignKey("universities.id"), nullable=False)
-    bucket = Column(String)  # Dream, Target, Safe
-    is_locked = Column(Boolean, default=False)
-    why_fits = Column(Text)  # AI-generated explanation
-    risks = Column(Text)  # AI-generated risks
-    created_at = Column(DateTime, default=datetime.utcnow)
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_supabase() -> "Client":
+    """
+    Supabase client, created on first call
+
+    Uses the service role to bypass RLS for backend ops; the backend
+    validates users via JWT in dependencies, so DB access is privileged.
+    Queries are counted, timed and traced per request (app.metrics).
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from supabase import create_client
+                from app.metrics import instrument_client
+
+                _client = instrument_client(create_client(settings.supabase_url, settings.supabase_service_key))
+    return _client
+
+
+class _LazySupabase:
+    """Module-level stand-in that forwards to the client, building it on first use"""
+
+    def __getattr__(self, name: str):
+        return getattr(get_supabase(), name)
+
+    def __repr__(self) -> str:
+        return f"<lazy Supabase client ({'connected' if _client is not None else 'not created yet'})>"
+
+
+# Imported everywhere as `from app.database import supabase`
+supabase: "Client" = _LazySupabase()
+
+
+# Direct PostgreSQL access
+
+_engine = None
+_sessionmaker = None
+
+
+def sql_enabled() -> bool:
+    """True when the hot routes should read over the asyncpg pool"""
+    return settings.data_backend == "sql"
+
+
+def get_engine() -> "AsyncEngine":
+    """
+    Async SQLAlchemy engine over asyncpg, created on first call (per worker)
+
+    Pool sizes and timeouts come from the db_* settings. Behind Supabase's
+    transaction pooler (port 6543) set db_statement_cache_size = 0, since
+    prepared statements do not survive a change of server connection.
+    """
+    global _engine, _sessionmaker
+    if _engine is None:
+        with _client_lock:
+            if _engine is None:
+                if not settings.database_url:
+                    raise RuntimeError("data_backend = 'sql' needs database_url (postgresql+asyncpg://...)")
+                import orjson
+                from sqlalchemy.engine import make_url
+                from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+                url = make_url(settings.database_url).set(drivername="postgresql+asyncpg")
+                url = url.update_query_dict({"prepared_statement_cache_size": str(settings.db_statement_cache_size)})
+                _engine = create_async_engine(
+                    url,
+                    pool_size=settings.db_pool_size,
+                    max_overflow=settings.db_max_overflow,
+                    pool_timeout=settings.db_pool_timeout,
+                    pool_recycle=settings.db_pool_recycle,
+                    pool_pre_ping=True,
+                    json_deserializer=orjson.loads,
+                    json_serializer=lambda value: orjson.dumps(value).decode(),
+                    connect_args={
+                        "statement_cache_size": settings.db_statement_cache_size,
+                        "command_timeout": settings.db_command_timeout,
+                        # Small OLTP queries: JIT compilation only adds latency
+                        "server_settings": {"application_name": "ai-counsellor", "jit": "off"},
+                    },
+                )
+                _sessionmaker = async_sessionmaker(_engine, expire_on_commit=False)
+    return _engine
+
+
+async def close_engine() -> None:
+    """Close the pool's connections (on shutdown)"""
+    global _engine, _sessionmaker
+    if _engine is not None:
+        await _engine.dispose()
+        _engine = None
+        _sessionmaker = None
 
 
 # Database session dependency
-def get_db_session():
-    """Create database session - will be used by FastAPI"""
-    # For now, we'll use Supabase client. 
-    # If you need direct SQLAlchemy access, setup engine with Supabase DB URL
-    pass
+async def get_db_session() -> AsyncIterator["AsyncSession"]:
+    """Yield an AsyncSession from the pool - use as Depends(get_db_session)"""
+    get_engine()
+    async with _sessionmaker() as session:
+        yield session
@@ -6,6 +6,7 @@ import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime
+from app.tracing import start_span
 
 
 class EmailService:
@@ -32,6 +33,24 @@ class EmailService:
         """
         Send congratulations email when user gets shortlisted
         """
+        attributes = {
+            "email.template": "shortlist_confirmation",
+            # Domain only; the address itself stays out of exported spans
+            "email.recipient_domain": (recipient_email or "").rsplit("@", 1)[-1],
+        }
+        with start_span("email.send", attributes, "CLIENT") as span:
+            sent = self._send_shortlist_confirmation(recipient_email, recipient_name, university_name, university_country)
+            if not sent:
+                span.status = "ERROR"
+            return sent
+
+    def _send_shortlist_confirmation(
+        self,
+        recipient_email: str,
+        recipient_name: str,
+        university_name: str,
+        university_country: str
+    ) -> bool:
         try:
             # Create message
             message = MIMEMultipart("alternative")
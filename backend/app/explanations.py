@@ -0,0 +1,79 @@
+"""
+Memoized why-fits / risks explanations
+Reason codes depend only on a few profile fields and the university row, so
+each explanation is computed once per (profile hash, catalog version,
+university) and served from a bounded LRU afterwards.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from app.recommendation_engine import (
+    EXPLANATION_FIELDS,
+    fit_reasons,
+    render_reason,
+    render_reasons,
+    risk_reasons
+)
+
+MAX_EXPLANATIONS = 20000
+
+
+def explanation_hash(profile: Dict[str, Any]) -> str:
+    """Stable hash of the profile fields the reason codes read"""
+    inputs = {field: profile.get(field) for field in EXPLANATION_FIELDS}
+    return hashlib.sha1(json.dumps(inputs, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _structured(reasons: list) -> Dict[str, Any]:
+    return {
+        "reasons": [
+            {"code": code, "params": params, "text": render_reason(code, params)}
+            for code, params in reasons
+        ],
+        "text": render_reasons(reasons)
+    }
+
+
+class ExplanationCache:
+    """Bounded LRU of explanations keyed by (profile hash, catalog version, university id)"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str, int], Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        profile: Dict[str, Any],
+        university: Dict[str, Any],
+        catalog_version: str,
+        profile_key: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Structured explanation for one university
+
+        Returns {"why_fits": {"reasons": [...], "text": str}, "risks": {...}}
+        where each reason is {"code", "params", "text"}. Pass profile_key
+        (from explanation_hash) when explaining many universities at once.
+        """
+        key = (profile_key or explanation_hash(profile), catalog_version, university["id"])
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                return cached
+
+        explanation = {
+            "why_fits": _structured(fit_reasons(profile, university)),
+            "risks": _structured(risk_reasons(profile, university))
+        }
+        with self._lock:
+            self._entries[key] = explanation
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return explanation
+
+
+explanation_cache = ExplanationCache(MAX_EXPLANATIONS)
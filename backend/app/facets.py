@@ -0,0 +1,159 @@
+"""
+Facet counts for university filter sidebars
+Precomputed once per catalog version and served from memory
+"""
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, Optional
+from app.catalog import CatalogSnapshot, get_catalog, total_annual_cost, failed_filters
+
+# (label, lower bound inclusive, upper bound exclusive) in USD per year
+COST_BANDS = [
+    ("Under $30K", 0, 30000),
+    ("$30K - $50K", 30000, 50000),
+    ("$50K - $70K", 50000, 70000),
+    ("$70K+", 70000, None),
+]
+
+# Cut-offs match categorize_university
+ACCEPTANCE_BANDS = [
+    ("Highly selective (<15%)", 0, 15),
+    ("Selective (15-30%)", 15, 30),
+    ("Moderate (30-50%)", 30, 50),
+    ("Accessible (50%+)", 50, None),
+]
+
+FACETS = ("country", "program", "scholarship_type", "cost_band", "acceptance_band")
+
+# A facet ignores its own filter so the sidebar still shows the alternatives
+FACET_FILTER = {
+    "country": "country",
+    "program": "field",
+    "scholarship_type": "has_scholarships",
+    "cost_band": "budget",
+}
+
+# Filtered results kept per catalog version
+MAX_CACHED_QUERIES = 256
+
+
+def _band(value: Optional[float], bands: list) -> Optional[str]:
+    if value is None:
+        return None
+    for label, low, high in bands:
+        if value >= low and (high is None or value < high):
+            return label
+    return None
+
+
+def facet_keys(uni: Dict[str, Any]) -> Dict[str, List[str]]:
+    """The facet values one university contributes to"""
+    band = _band(total_annual_cost(uni), COST_BANDS)
+    acceptance = _band(uni.get("acceptance_rate"), ACCEPTANCE_BANDS)
+    return {
+        "country": [uni["country"]] if uni.get("country") else [],
+        "program": list(dict.fromkeys(uni.get("programs_offered") or [])),
+        "scholarship_type": list(dict.fromkeys(uni.get("scholarship_types") or [])) if uni.get("has_scholarships") else [],
+        "cost_band": [band] if band else [],
+        "acceptance_band": [acceptance] if acceptance else [],
+    }
+
+
+class FacetService:
+    """Facet counts for one catalog snapshot"""
+
+    def __init__(self, snapshot: CatalogSnapshot):
+        self.version = snapshot.version
+        self.universities = snapshot.universities
+        self.search_index = snapshot.search_index
+        self.keys = [facet_keys(uni) for uni in self.universities]
+        self.totals = self._count(range(len(self.universities)), {})
+        self._filtered: OrderedDict = OrderedDict()
+
+    def _count(self, indexes, failures: Dict[int, set]) -> Dict[str, Counter]:
+        counts = {facet: Counter() for facet in FACETS}
+        for i in indexes:
+            failed = failures.get(i, ())
+            for facet in FACETS:
+                # Skip if the university fails any filter other than this facet's own
+                if failed and not (len(failed) == 1 and FACET_FILTER.get(facet) in failed):
+                    continue
+                counts[facet].update(self.keys[i][facet])
+        return counts
+
+    def get_facets(self, **filters) -> Dict[str, Any]:
+        """
+        Facet counts for the current filters
+
+        Args:
+            filters: Same filters as search_universities
+
+        Returns:
+            Total matching universities and sorted counts per facet
+        """
+        active = {name: value for name, value in filters.items() if value is not None}
+        if not active:
+            counts, total = self.totals, len(self.universities)
+        else:
+            cache_key = tuple(sorted(active.items()))
+            if cache_key in self._filtered:
+                self._filtered.move_to_end(cache_key)
+                counts, total = self._filtered[cache_key]
+            else:
+                search = active.pop("search", None)
+                matches = None
+                if search and search.strip():
+                    ranked = self.search_index.search(search, limit=len(self.universities))
+                    matches = {position for position, _ in ranked}
+                failures = {}
+                for i, uni in enumerate(self.universities):
+                    failed = failed_filters(uni, **active)
+                    if matches is not None and i not in matches:
+                        failed.add("search")
+                    if failed:
+                        failures[i] = failed
+                counts = self._count(range(len(self.universities)), failures)
+                total = len(self.universities) - len(failures)
+                self._filtered[cache_key] = (counts, total)
+                if len(self._filtered) > MAX_CACHED_QUERIES:
+                    self._filtered.popitem(last=False)
+
+        return {
+            "total": total,
+            "facets": {
+                "country": _sorted_by_value(counts["country"]),
+                "program": _sorted_by_count(counts["program"]),
+                "scholarship_type": _sorted_by_count(counts["scholarship_type"]),
+                "cost_band": _in_band_order(counts["cost_band"], COST_BANDS),
+                "acceptance_band": _in_band_order(counts["acceptance_band"], ACCEPTANCE_BANDS),
+            },
+        }
+
+
+def _sorted_by_value(counter: Counter) -> List[Dict[str, Any]]:
+    return [{"value": value, "count": count} for value, count in sorted(counter.items())]
+
+
+def _sorted_by_count(counter: Counter) -> List[Dict[str, Any]]:
+    return [
+        {"value": value, "count": count}
+        for value, count in sorted(counter.items(), key=lambda item: (-item[1], item[0]))
+    ]
+
+
+def _in_band_order(counter: Counter, bands: list) -> List[Dict[str, Any]]:
+    return [
+        {"value": label, "min": low, "max": high, "count": counter.get(label, 0)}
+        for label, low, high in bands
+    ]
+
+
+_service: Optional[FacetService] = None
+
+
+def get_facet_service() -> FacetService:
+    """Get the facet service for the current catalog version"""
+    global _service
+    snapshot = get_catalog()
+    if _service is None or _service.version != snapshot.version:
+        _service = FacetService(snapshot)
+    return _service
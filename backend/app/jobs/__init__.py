@@ -0,0 +1 @@
+"""Offline batch jobs (run with python -m app.jobs.<name>)"""
@@ -0,0 +1,189 @@
+"""
+Batch recommendation job
+Pre-warms user_recommendations for every active user, e.g. nightly and
+after each catalog update.
+
+Usage:
+    python -m app.jobs.recompute_recommendations [--workers N] [--page-size 500]
+    python -m app.jobs.recompute_recommendations --scaling   # 1..N core throughput
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from app.catalog import fetch_all_universities
+from app.config import get_settings
+from app.database import supabase
+from app.recommendation_store import profile_hash
+from app.score_matrix import CATEGORY_LABELS, _CatalogArrays, _score_chunk
+from app.scoring_rules import get_rules
+from app.versioning import get_catalog_version
+
+settings = get_settings()
+
+# Set in each worker by _init_worker: the catalog version and numpy views
+# over the shared block (the block stays mapped for the worker's lifetime)
+_worker_version: Optional[str] = None
+_worker_block: Optional[shared_memory.SharedMemory] = None
+_worker_catalog: Optional[_CatalogArrays] = None
+
+
+def stream_profiles(page_size: int, include_incomplete: bool = False) -> Iterator[List[Dict[str, Any]]]:
+    """Yield pages of profiles ordered by id"""
+    start = 0
+    while True:
+        query = supabase.table("profiles").select("*").order("id")
+        if not include_incomplete:
+            query = query.eq("is_complete", True)
+        result = query.range(start, start + page_size - 1).execute()
+        page = result.data or []
+        if page:
+            yield page
+        if len(page) < page_size:
+            return
+        start += page_size
+
+
+def share_catalog(universities: List[Dict[str, Any]]) -> Tuple[shared_memory.SharedMemory, Dict[str, Any]]:
+    """
+    Put the catalog's scoring columns in one shared block that every worker maps
+
+    Only fixed-width numeric arrays are shared (see _CatalogArrays.to_shared),
+    so workers read them in place and memory does not grow with the worker
+    count. The country / program vocabularies travel in the small layout.
+    """
+    return _CatalogArrays(universities).to_shared()
+
+
+def _init_worker(version: str, block_name: str, layout: Dict[str, Any]) -> None:
+    """Attach to the shared catalog columns once per worker process"""
+    global _worker_version, _worker_block, _worker_catalog
+    _worker_version = version
+    _worker_block = shared_memory.SharedMemory(name=block_name)
+    _worker_catalog = _CatalogArrays.attach(_worker_block, layout)
+
+
+def score_profiles(profiles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Worker: rank the catalog for each profile and return rows to upsert
+
+    Same results as compute_recommendations: scores and categories come from
+    score_matrix, ties keep catalog order
+    """
+    if not profiles:
+        return []
+    computed_at = datetime.utcnow().isoformat()
+    cat = _worker_catalog
+    scores, categories = _score_chunk(profiles, cat, get_rules())
+    top_n = settings.recommendation_top_n
+    rows = []
+    for row, profile in enumerate(profiles):
+        order = np.argsort(-scores[row].astype(np.int16), kind="stable")[:top_n]
+        rows.append({
+            "user_id": profile["user_id"],
+            "profile_hash": profile_hash(profile),
+            "catalog_version": _worker_version,
+            "total": cat.size,
+            "results": [
+                [int(cat.ids[i]), int(scores[row, i]), CATEGORY_LABELS[categories[row, i]]]
+                for i in order
+            ],
+            "computed_at": computed_at
+        })
+    return rows
+
+
+def upsert_rows(rows: List[Dict[str, Any]], batch_size: int) -> None:
+    for start in range(0, len(rows), batch_size):
+        supabase.table("user_recommendations")\
+            .upsert(rows[start:start + batch_size], on_conflict="user_id")\
+            .execute()
+
+
+def _chunks(items: list, size: int) -> Iterator[list]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def run(workers: int, page_size: int, chunk_size: int, batch_size: int, include_incomplete: bool) -> None:
+    version = get_catalog_version()
+    universities = fetch_all_universities()
+    block, layout = share_catalog(universities)
+    print(f"Catalog version {version}: {len(universities)} universities ({block.size / 1e6:.1f} MB shared)")
+
+    processed = 0
+    started = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(version, block.name, layout)
+        ) as pool:
+            for page in stream_profiles(page_size, include_incomplete):
+                for rows in pool.map(score_profiles, _chunks(page, chunk_size)):
+                    upsert_rows(rows, batch_size)
+                    processed += len(rows)
+                elapsed = time.perf_counter() - started
+                print(f"  {processed} profiles ({processed / elapsed:.1f} profiles/sec)")
+    finally:
+        block.close()
+        block.unlink()
+
+    elapsed = time.perf_counter() - started
+    print(f"\nDone: {processed} profiles in {elapsed:.1f}s ({processed / max(elapsed, 1e-9):.1f} profiles/sec, {workers} workers)")
+
+
+def run_scaling(max_workers: int, page_size: int, chunk_size: int, include_incomplete: bool) -> None:
+    """Score the first page with 1, 2, 4 ... N workers (no writes)"""
+    version = get_catalog_version()
+    universities = fetch_all_universities()
+    profiles = next(stream_profiles(page_size, include_incomplete), [])
+    if not profiles:
+        print("No profiles to score")
+        return
+
+    block, layout = share_catalog(universities)
+    counts = sorted({1, *[2 ** i for i in range(1, max_workers.bit_length()) if 2 ** i < max_workers], max_workers})
+    print(f"Scoring {len(profiles)} profiles x {len(universities)} universities")
+    print(f"{'workers':>8}{'profiles/sec':>15}{'speedup':>10}")
+    baseline = None
+    try:
+        for workers in counts:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(version, block.name, layout)) as pool:
+                # Warm the workers so attach time is not measured
+                list(pool.map(score_profiles, [[]] * workers))
+                started = time.perf_counter()
+                for _ in pool.map(score_profiles, _chunks(profiles, chunk_size)):
+                    pass
+                rate = len(profiles) / (time.perf_counter() - started)
+            baseline = baseline or rate
+            print(f"{workers:>8}{rate:>15.1f}{rate / baseline:>9.2f}x")
+    finally:
+        block.close()
+        block.unlink()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--page-size", type=int, default=500, help="Profiles fetched per request")
+    parser.add_argument("--chunk-size", type=int, default=25, help="Profiles per worker task")
+    parser.add_argument("--batch-size", type=int, default=200, help="Rows per upsert")
+    parser.add_argument("--include-incomplete", action="store_true", help="Also score draft profiles")
+    parser.add_argument("--scaling", action="store_true", help="Report throughput from 1 to --workers cores")
+    args = parser.parse_args()
+
+    if args.scaling:
+        run_scaling(args.workers, args.page_size, args.chunk_size, args.include_incomplete)
+    else:
+        run(args.workers, args.page_size, args.chunk_size, args.batch_size, args.include_incomplete)
+
+
+if __name__ == "__main__":
+    main()
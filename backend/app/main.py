@@ -2,18 +2,44 @@
 FastAPI application entry point
 AI Counsellor Backend API
 """
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
+from app.ai_service import close_http_session
+from app.cache import close_cache
 from app.config import get_settings
-from app.routers import auth, profile, dashboard, ai, universities, shortlist, tasks, shortlist_lock
+from app.database import close_engine
+from app.middleware import register_middleware
+from app.metrics import render_metrics
+from app.tracing import close_exporter, configure_logging
+from app.warmup import readiness, start_warmup
+from app.routers import auth, profile, dashboard, ai, universities, shortlist, tasks, shortlist_lock, admin
 
 settings = get_settings()
+configure_logging()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm caches and connections in the background; /ready reports when done"""
+    warmup = start_warmup()
+    yield
+    if warmup is not None and not warmup.done():
+        warmup.cancel()
+    await close_http_session()
+    await close_engine()
+    close_cache()
+    close_exporter()
+
 
 # Initialize FastAPI app
 app = FastAPI(
+    lifespan=lifespan,
     title="AI Counsellor API",
     description="Backend API for AI-powered study abroad counselling platform",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS
@@ -23,8 +49,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
+# ETags / conditional GET and response compression
+register_middleware(app)
+
 # Register routers
 app.include_router(auth.router)
 app.include_router(profile.router)
@@ -34,6 +64,7 @@ app.include_router(universities.router)
 app.include_router(shortlist.router)
 app.include_router(tasks.router)
 app.include_router(shortlist_lock.router)
+app.include_router(admin.router)
 
 
 @app.get("/")
@@ -55,6 +86,21 @@ async def health_check():
     }
 
 
+@app.get("/ready")
+async def ready_check():
+    """Readiness for load balancers: 503 until the startup warm-up has finished"""
+    report = readiness.report()
+    return ORJSONResponse(report, status_code=200 if readiness.ready else 503)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
 if __name__ == "__main__":
+    # Development server; use `python -m app.serve` for multi-worker production
     import uvicorn
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,336 @@
+"""
+Prometheus metrics for requests, Supabase queries and Gemini calls
+Scraped from GET /metrics. Every request gets a RequestStats in a context
+variable; the instrumented Supabase client adds each .execute() to it, so
+the number of queries a route makes per request (and per table) is
+recorded alongside its latency, and N+1 patterns show up as a count
+histogram that grows with the data instead of staying flat.
+
+Set PROMETHEUS_MULTIPROC_DIR when running several worker processes so
+/metrics aggregates all of them.
+"""
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+from app.config import get_settings
+from app import query_debug
+from app.tracing import start_span
+
+settings = get_settings()
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+# Paths that are not worth a latency series of their own
+SKIPPED_PATHS = {"/metrics"}
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests handled",
+    ["method", "route", "status"]
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "Time from request start to the last response byte",
+    ["method", "route"], buckets=LATENCY_BUCKETS
+)
+HTTP_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "Requests currently being handled",
+    ["method"], multiprocess_mode="livesum"
+)
+
+SUPABASE_QUERIES = Counter(
+    "supabase_queries_total", "Supabase .execute() calls",
+    ["table", "operation", "outcome"]
+)
+SUPABASE_LATENCY = Histogram(
+    "supabase_query_duration_seconds", "Duration of one Supabase .execute() call",
+    ["table", "operation"], buckets=LATENCY_BUCKETS
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_supabase_queries", "Supabase queries made while handling one request",
+    ["route"], buckets=QUERY_COUNT_BUCKETS
+)
+REQUEST_QUERY_SECONDS = Histogram(
+    "http_request_supabase_seconds", "Time spent in Supabase queries while handling one request",
+    ["route"], buckets=LATENCY_BUCKETS
+)
+REQUEST_TABLE_QUERIES = Histogram(
+    "http_request_table_queries", "Queries against one table while handling one request",
+    ["route", "table"], buckets=QUERY_COUNT_BUCKETS
+)
+
+GEMINI_CALLS = Counter(
+    "gemini_calls_total", "Gemini generate_content calls",
+    ["call", "outcome"]
+)
+GEMINI_LATENCY = Histogram(
+    "gemini_call_duration_seconds", "Duration of one Gemini call",
+    ["call"], buckets=LATENCY_BUCKETS
+)
+GEMINI_TOKENS = Counter(
+    "gemini_tokens_total", "Tokens reported by Gemini usage metadata",
+    ["call", "kind"]
+)
+
+
+class RequestStats:
+    """Supabase work done on behalf of one request"""
+
+    __slots__ = ("queries", "seconds", "tables", "shapes", "callers")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+        self.tables: Dict[str, int] = {}
+        # (table, operation, filters) -> count, and where each shape was first issued
+        self.shapes: Dict[tuple, int] = {}
+        self.callers: Dict[tuple, str] = {}
+
+    def add(self, shape: tuple, seconds: float, caller: Optional[str] = None) -> None:
+        self.queries += 1
+        self.seconds += seconds
+        table = shape[0]
+        self.tables[table] = self.tables.get(table, 0) + 1
+        self.shapes[shape] = self.shapes.get(shape, 0) + 1
+        if caller and shape not in self.callers:
+            self.callers[shape] = caller
+
+
+# Mutated in place, so queries run in a threadpool still count towards the request
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    """Stats for the request being handled, or None outside a request"""
+    return _request_stats.get()
+
+
+# Supabase client instrumentation
+
+OPERATIONS = ("select", "insert", "upsert", "update", "delete")
+FILTER_METHODS = {
+    "eq", "neq", "gt", "gte", "lt", "lte", "like", "ilike", "is_", "in_", "contains",
+    "contained_by", "ov", "fts", "plfts", "phfts", "wfts", "text_search", "or_", "match", "filter",
+}
+
+
+class InstrumentedQuery:
+    """
+    Wraps a PostgREST request builder and times its .execute()
+
+    Every chained call is forwarded, and builders it returns are wrapped
+    again, so the usual supabase.table(...).select(...).eq(...).execute()
+    chain works unchanged
+    """
+
+    __slots__ = ("_builder", "_table", "_operation", "_filters")
+
+    def __init__(self, builder, table: str, operation: str, filters: Optional[List[str]] = None):
+        self._builder = builder
+        self._table = table
+        self._operation = operation
+        # Filter operators and columns, never values, for the query span
+        self._filters = filters if filters is not None else []
+
+    def execute(self, *args, **kwargs):
+        attributes = {
+            "db.system": "postgresql",
+            "db.sql.table": self._table,
+            "db.operation": self._operation,
+            "db.postgrest.filters": ", ".join(self._filters),
+        }
+        with start_span(f"supabase.{self._operation} {self._table}", attributes, "CLIENT") as span:
+            started = time.perf_counter()
+            outcome = "error"
+            try:
+                result = self._builder.execute(*args, **kwargs)
+                outcome = "ok"
+                data = getattr(result, "data", None)
+                if isinstance(data, list):
+                    span.set_attribute("db.response.rows", len(data))
+                return result
+            finally:
+                record_query(self._table, self._operation, time.perf_counter() - started, outcome, self._filters)
+
+    def _wrap(self, value, operation: str):
+        if hasattr(value, "execute") and not isinstance(value, InstrumentedQuery):
+            return InstrumentedQuery(value, self._table, operation, self._filters)
+        return value
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._builder, name)
+        operation = name if self._operation == "query" and name in OPERATIONS else self._operation
+        if not callable(attr):
+            # Properties such as .not_ return a builder too
+            if name == "not_":
+                self._filters.append("not")
+            return self._wrap(attr, operation)
+
+        def call(*args, **kwargs):
+            if name in FILTER_METHODS:
+                column = args[0] if args and name not in ("or_", "match") else ""
+                self._filters.append(f"{name.rstrip('_')}({column})")
+            return self._wrap(attr(*args, **kwargs), operation)
+
+        return call
+
+
+class InstrumentedClient:
+    """Supabase client whose table() / rpc() queries are counted, timed and traced"""
+
+    def __init__(self, client):
+        self._client = client
+
+    def table(self, table_name: str) -> InstrumentedQuery:
+        return InstrumentedQuery(self._client.table(table_name), table_name, "query")
+
+    from_ = table
+
+    def rpc(self, fn: str, params: Optional[Dict[str, Any]] = None, *args, **kwargs) -> InstrumentedQuery:
+        return InstrumentedQuery(self._client.rpc(fn, params or {}, *args, **kwargs), f"rpc:{fn}", "rpc")
+
+    def __getattr__(self, name: str):
+        # auth, storage, ... are passed straight through
+        return getattr(self._client, name)
+
+
+def instrument_client(client) -> InstrumentedClient:
+    """Wrap a Supabase client so every query is recorded"""
+    return client if isinstance(client, InstrumentedClient) else InstrumentedClient(client)
+
+
+def record_query(table: str, operation: str, seconds: float, outcome: str = "ok", filters: Optional[List[str]] = None) -> None:
+    SUPABASE_QUERIES.labels(table, operation, outcome).inc()
+    SUPABASE_LATENCY.labels(table, operation).observe(seconds)
+    shape = query_debug.shape_of(table, operation, filters)
+    caller = None
+    if query_debug.query_debug_enabled():
+        caller = query_debug.find_caller()
+        if seconds * 1000 >= settings.slow_query_ms:
+            query_debug.log_slow_query(shape, seconds, caller)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.add(shape, seconds, caller)
+
+
+# Gemini
+
+@contextmanager
+def gemini_call(call: str, model: str = "", prompt: str = ""):
+    """
+    Time and trace one Gemini call; the body may report token usage on the yielded dict
+
+        with gemini_call("chat", model.model_name, prompt) as usage:
+            response = model.generate_content(prompt)
+            usage.update(gemini_usage(response))
+    """
+    usage: Dict[str, int] = {}
+    attributes = {
+        "gen_ai.system": "gemini",
+        "gen_ai.operation.name": call,
+        "gen_ai.request.model": model,
+        "gen_ai.prompt.chars": len(prompt),
+    }
+    with start_span(f"gemini.{call}", attributes, "CLIENT") as span:
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            yield usage
+            outcome = "ok"
+        finally:
+            GEMINI_LATENCY.labels(call).observe(time.perf_counter() - started)
+            GEMINI_CALLS.labels(call, outcome).inc()
+            for kind, count in usage.items():
+                if count:
+                    GEMINI_TOKENS.labels(call, kind).inc(count)
+            span.set_attribute("gen_ai.usage.input_tokens", usage.get("prompt"))
+            span.set_attribute("gen_ai.usage.output_tokens", usage.get("output"))
+
+
+def gemini_usage(response: Any) -> Dict[str, int]:
+    """Token counts from an SDK response or a REST generateContent JSON body"""
+    if isinstance(response, dict):
+        meta = response.get("usageMetadata") or {}
+        return {
+            "prompt": meta.get("promptTokenCount") or 0,
+            "output": meta.get("candidatesTokenCount") or 0,
+        }
+    meta = getattr(response, "usage_metadata", None)
+    return {
+        "prompt": getattr(meta, "prompt_token_count", 0) or 0,
+        "output": getattr(meta, "candidates_token_count", 0) or 0,
+    }
+
+
+# HTTP
+
+def _route_label(scope) -> str:
+    """Route template (/universities/{university_id}), not the raw path, to bound cardinality"""
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    return path if path else "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Record latency, status and Supabase usage for every HTTP request
+
+    Pure ASGI; the duration runs until the last body message is sent, so
+    streamed responses are measured in full
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in SKIPPED_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        in_progress = HTTP_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            in_progress.dec()
+            _request_stats.reset(token)
+            route = _route_label(scope)
+            HTTP_REQUESTS.labels(method, route, str(status)).inc()
+            HTTP_LATENCY.labels(method, route).observe(elapsed)
+            REQUEST_QUERIES.labels(route).observe(stats.queries)
+            REQUEST_QUERY_SECONDS.labels(route).observe(stats.seconds)
+            for table, count in stats.tables.items():
+                REQUEST_TABLE_QUERIES.labels(route, table).observe(count)
+            query_debug.finish_request(method, route, stats)
+
+
+def render_metrics() -> tuple:
+    """(body, content type) in the Prometheus text format"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
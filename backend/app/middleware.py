@@ -0,0 +1,194 @@
+"""
+HTTP middleware and exception handlers shared by all routers
+"""
+import gzip
+from fastapi import FastAPI, Request, Response
+from app.conditional import NotModified
+from app.config import get_settings
+from app.metrics import MetricsMiddleware
+from app.profiling import ProfilingMiddleware
+from app.tracing import TracingMiddleware
+
+try:
+    import brotli
+except ImportError:  # Optional: fall back to gzip only
+    brotli = None
+
+settings = get_settings()
+
+COMPRESSIBLE_TYPES = (b"application/json", b"text/", b"application/x-ndjson")
+
+
+class ETagMiddleware:
+    """
+    Attach the ETag computed by a conditional-GET dependency to 200 responses
+
+    Pure ASGI so streamed bodies pass through untouched
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_etag(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                etag = scope.get("state", {}).get("etag")
+                if etag:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"etag", etag.encode()))
+                    # Clients may cache but must revalidate every time
+                    headers.append((b"cache-control", b"private, no-cache"))
+                    message["headers"] = headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_etag)
+
+
+def _accepted_encodings(accept: str) -> dict:
+    """Accept-Encoding as {coding: q}; "br;q=0" means brotli is refused"""
+    weights = {}
+    for item in accept.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[coding] = q
+    return weights
+
+
+class CompressionMiddleware:
+    """
+    Compress buffered responses above a size threshold with brotli or gzip
+
+    Streamed responses (more than one body message) are passed through as-is
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def _pick_encoding(self, scope) -> str | None:
+        accept = ""
+        for name, value in scope.get("headers", []):
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1").lower()
+                break
+        weights = _accepted_encodings(accept)
+        supported = ("br", "gzip") if brotli is not None else ("gzip",)
+        # Highest q-value wins; on a tie, the first supported (brotli)
+        best, best_q = None, 0.0
+        for encoding in supported:
+            q = weights.get(encoding, weights.get("*", 0.0))
+            if q > best_q:
+                best, best_q = encoding, q
+        return best
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self._pick_encoding(scope)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, passthrough
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            headers = dict(start_message.get("headers", []))
+            content_type = headers.get(b"content-type", b"")
+            compressible = (
+                not message.get("more_body", False)
+                and len(body) >= self.minimum_size
+                and b"content-encoding" not in headers
+                and content_type.startswith(COMPRESSIBLE_TYPES)
+            )
+
+            if not compressible:
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            if encoding == "br":
+                body = brotli.compress(body, quality=self.brotli_quality)
+            else:
+                body = gzip.compress(body, compresslevel=self.gzip_level)
+
+            new_headers = []
+            vary = []
+            for k, v in start_message.get("headers", []):
+                if k == b"vary":
+                    # Keep what inner layers vary on (CORS adds Origin)
+                    vary += [value.strip() for value in v.split(b",") if value.strip()]
+                    continue
+                if k == b"content-length":
+                    continue
+                if k == b"etag" and v.endswith(b'"'):
+                    # Encoded bytes differ, so the strong validator must too
+                    v = v[:-1] + b"-" + encoding.encode() + b'"'
+                new_headers.append((k, v))
+            new_headers += [
+                (b"content-encoding", encoding.encode()),
+                (b"content-length", str(len(body)).encode()),
+            ]
+            if not any(value.lower() in (b"accept-encoding", b"*") for value in vary):
+                vary.append(b"Accept-Encoding")
+            new_headers.append((b"vary", b", ".join(vary)))
+            start_message["headers"] = new_headers
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
+
+
+async def not_modified_handler(request: Request, exc: NotModified) -> Response:
+    """Answer 304 without running the route or serializing a body"""
+    return Response(
+        status_code=304,
+        headers={"ETag": exc.etag, "Cache-Control": "private, no-cache"}
+    )
+
+
+def register_middleware(app: FastAPI) -> None:
+    """Install shared middleware and exception handlers"""
+    app.add_middleware(ETagMiddleware)
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_min_size,
+        gzip_level=settings.compression_gzip_level,
+        brotli_quality=settings.compression_brotli_quality
+    )
+    app.add_middleware(ProfilingMiddleware)
+    # Outermost, so timings include compression and every other middleware
+    app.add_middleware(MetricsMiddleware)
+    # Around everything, so logs written anywhere in a request carry its trace id
+    app.add_middleware(TracingMiddleware)
+    app.add_exception_handler(NotModified, not_modified_handler)
@@ -0,0 +1,408 @@
+"""
+Opt-in profiling for diagnosing slow requests in production
+Three ways in, all off unless settings.profiling_enabled is set:
+
+- Per request: send "X-Profile: cprofile" or "X-Profile: sample" together
+  with X-Admin-Key; the profile is stored and its id returned in the
+  X-Profile-Id response header.
+- Armed by an admin: POST /admin/profiling/arm profiles the next request
+  to a given path, for clients that cannot add headers.
+- Background window: POST /admin/profiling/sampler samples every thread's
+  stack for N seconds and writes collapsed stacks.
+
+Arming and sampler windows are broadcast to every worker through the cache
+backend (app.cache invalidations), so with several workers each one samples
+its own process and the first worker to see an armed path takes it. Every
+worker writes to the same output directory; profile ids carry the pid.
+
+cProfile output is a .prof file (pstats, snakeviz); sampled output is a
+.folded file of collapsed stacks, one "frame;frame;frame count" per line,
+as read by flamegraph.pl and speedscope. Both are served back through
+GET /admin/profiling/profiles/{profile_id}.
+"""
+import cProfile
+import hmac
+import logging
+import os
+import random
+import re
+import sys
+import sysconfig
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+from fastapi.concurrency import run_in_threadpool
+from app.cache import get_cache, on_invalidate
+from app.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ("cprofile", "sample")
+PROFILE_SUFFIXES = {"cprofile": ".prof", "sample": ".folded"}
+# Leaf frames of threads that are waiting rather than working
+IDLE_FRAMES = {
+    ("selectors.py", "select"), ("threading.py", "wait"), ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"), ("base_events.py", "_run_once"), ("thread.py", "_worker"),
+    ("_thread.py", "run"), ("socket.py", "accept"), ("ssl.py", "read"),
+}
+PROFILE_ID_PATTERN = re.compile(r"^[\w.-]+$")
+
+# Path prefixes hidden from stored profiles when redaction is on
+_ROOT_PREFIXES = sorted({
+    str(Path(__file__).resolve().parent.parent) + os.sep,
+    *(p + os.sep for p in {sysconfig.get_paths()["purelib"], sysconfig.get_paths()["platlib"], sysconfig.get_paths()["stdlib"]}),
+}, key=len, reverse=True)
+
+
+def redact_filename(filename: str) -> str:
+    """Drop install and project prefixes so stored profiles carry no host paths"""
+    if not settings.profiling_redact:
+        return filename
+    for prefix in _ROOT_PREFIXES:
+        if filename.startswith(prefix):
+            return filename[len(prefix):]
+    return os.path.basename(filename)
+
+
+def redact_path(path: str, query_string: bytes = b"") -> str:
+    """Request target as stored in profile metadata; query strings can carry personal data"""
+    if settings.profiling_redact or not query_string:
+        return path
+    return f"{path}?{query_string.decode('latin-1')}"
+
+
+def profile_dir() -> Path:
+    path = Path(settings.profiling_output_dir)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def new_profile_id(mode: str, label: str) -> str:
+    slug = re.sub(r"[^\w]+", "-", label).strip("-")[:60] or "root"
+    return f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}-{random.randrange(16 ** 4):04x}-{slug}{PROFILE_SUFFIXES[mode]}"
+
+
+def prune_profiles() -> None:
+    """Keep only the newest settings.profiling_max_files profiles"""
+    files = sorted(
+        (p for p in profile_dir().iterdir() if p.suffix in PROFILE_SUFFIXES.values()),
+        key=lambda p: p.stat().st_mtime,
+        reverse=True
+    )
+    for stale in files[settings.profiling_max_files:]:
+        stale.unlink(missing_ok=True)
+
+
+def list_profiles() -> List[Dict]:
+    return [
+        {"id": p.name, "bytes": p.stat().st_size, "created": p.stat().st_mtime}
+        for p in sorted(profile_dir().iterdir(), key=lambda p: p.stat().st_mtime, reverse=True)
+        if p.suffix in PROFILE_SUFFIXES.values()
+    ]
+
+
+def profile_path(profile_id: str) -> Optional[Path]:
+    """Stored profile by id, or None (ids never resolve outside the output directory)"""
+    if not PROFILE_ID_PATTERN.match(profile_id):
+        return None
+    path = profile_dir() / profile_id
+    return path if path.is_file() else None
+
+
+# cProfile
+
+def write_cprofile(profiler: cProfile.Profile, path: Path) -> None:
+    """Dump pstats with filenames redacted"""
+    import marshal
+
+    profiler.create_stats()
+
+    def key(func):
+        filename, line, name = func
+        return (redact_filename(filename), line, name)
+
+    stats = {}
+    for func, (cc, nc, tt, ct, callers) in profiler.stats.items():
+        stats[key(func)] = (cc, nc, tt, ct, {key(caller): timing for caller, timing in callers.items()})
+    with open(path, "wb") as f:
+        marshal.dump(stats, f)
+
+
+# Stack sampling
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{redact_filename(code.co_filename)}:{code.co_name}"
+
+
+def _is_idle(frame) -> bool:
+    code = frame.f_code
+    return (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES
+
+
+class StackSampler:
+    """
+    Samples the Python stack of every thread at a fixed interval
+
+    Stacks are aggregated as collapsed lines ("a;b;c" -> count). Threads
+    parked in a wait are skipped so the output shows work, not idling.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.counts: Dict[str, int] = {}
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self) -> None:
+        own = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own or _is_idle(frame):
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            stack.append(names.get(ident, "thread"))
+            line = ";".join(reversed(stack))
+            self.counts[line] = self.counts.get(line, 0) + 1
+        self.samples += 1
+
+    def _run(self, until: Optional[float]) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+            if until is not None and time.monotonic() >= until:
+                break
+
+    def start(self, seconds: Optional[float] = None) -> "StackSampler":
+        until = time.monotonic() + seconds if seconds else None
+        self._thread = threading.Thread(target=self._run, args=(until,), name="stack-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def join(self) -> None:
+        if self._thread is not None:
+            self._thread.join()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def write(self, path: Path) -> None:
+        with open(path, "w") as f:
+            for line, count in sorted(self.counts.items()):
+                f.write(f"{line} {count}\n")
+
+
+def sampler_interval() -> float:
+    return settings.profiling_sample_interval_ms / 1000
+
+
+class BackgroundSampler:
+    """One process-wide sampling window at a time, written when it ends"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._current: Optional[Dict] = None
+
+    def start(self, seconds: float) -> Dict:
+        with self._lock:
+            if self._current and self._current["sampler"].running:
+                raise RuntimeError("A sampling window is already running")
+            profile_id = new_profile_id("sample", "window")
+            sampler = StackSampler(sampler_interval()).start(seconds)
+            self._current = {"id": profile_id, "sampler": sampler, "seconds": seconds, "started": time.time()}
+            threading.Thread(target=self._finish, args=(self._current,), name="stack-sampler-writer", daemon=True).start()
+            return self.status()
+
+    def _finish(self, window: Dict) -> None:
+        window["sampler"].join()
+        window["sampler"].write(profile_dir() / window["id"])
+        prune_profiles()
+
+    def stop(self) -> Dict:
+        with self._lock:
+            if self._current:
+                self._current["sampler"].stop()
+            return self.status()
+
+    def status(self) -> Dict:
+        if not self._current:
+            return {"running": False, "pid": os.getpid()}
+        sampler = self._current["sampler"]
+        return {
+            "running": sampler.running,
+            "pid": os.getpid(),
+            "id": self._current["id"],
+            "seconds": self._current["seconds"],
+            "started": self._current["started"],
+            "samples": sampler.samples
+        }
+
+
+background_sampler = BackgroundSampler()
+
+SAMPLER_EVENT = "profiling.sampler"
+
+
+def _broadcast(kind: str, key: Optional[str]) -> None:
+    """Pass an admin command on to the other workers; this one has already run it"""
+    try:
+        get_cache().publish(kind, key)
+    except Exception as e:
+        logger.warning("Could not broadcast profiling command", extra={"kind": kind, "error": str(e)})
+
+
+def start_sampler(seconds: float) -> Dict:
+    """Start a sampling window here and in every other worker"""
+    window = background_sampler.start(seconds)
+    _broadcast(SAMPLER_EVENT, str(seconds))
+    return window
+
+
+def stop_sampler() -> Dict:
+    """End the sampling window here and in every other worker"""
+    window = background_sampler.stop()
+    _broadcast(SAMPLER_EVENT, None)
+    return window
+
+
+def _on_sampler_event(seconds: Optional[str]) -> None:
+    if seconds is None:
+        background_sampler.stop()
+        return
+    try:
+        background_sampler.start(float(seconds))
+    except RuntimeError:
+        logger.info("Sampling window already running", extra={"pid": os.getpid()})
+
+
+on_invalidate(SAMPLER_EVENT, _on_sampler_event)
+
+
+# Per-request profiling
+
+# Paths armed by an admin: path -> mode, each consumed by the next matching request
+_armed: Dict[str, str] = {}
+# cProfile can only be active once per process
+_cprofile_lock = threading.Lock()
+
+
+ARM_EVENT = "profiling.arm"
+DISARM_EVENT = "profiling.disarm"
+
+
+def arm(path: str, mode: str) -> None:
+    """Arm a path in every worker"""
+    _armed[path] = mode
+    _broadcast(ARM_EVENT, f"{mode}:{path}")
+
+
+def armed() -> Dict[str, str]:
+    return dict(_armed)
+
+
+def _on_arm(key: Optional[str]) -> None:
+    mode, _, path = (key or "").partition(":")
+    if mode in PROFILE_MODES and path:
+        _armed[path] = mode
+
+
+def _on_disarm(path: Optional[str]) -> None:
+    _armed.pop(path, None)
+
+
+def _take_armed(path: str) -> Optional[str]:
+    """Mode armed for path, disarming it in the other workers"""
+    mode = _armed.pop(path, None)
+    if mode:
+        _broadcast(DISARM_EVENT, path)
+    return mode
+
+
+on_invalidate(ARM_EVENT, _on_arm)
+on_invalidate(DISARM_EVENT, _on_disarm)
+
+
+def _requested_mode(scope) -> Optional[str]:
+    """Profile mode asked for by this request, if it may ask"""
+    headers = dict(scope.get("headers", []))
+    mode = headers.get(b"x-profile", b"").decode("latin-1").strip().lower()
+    if mode in PROFILE_MODES:
+        key = headers.get(b"x-admin-key", b"").decode("latin-1")
+        if settings.admin_api_key and key and hmac.compare_digest(key, settings.admin_api_key):
+            return mode
+    mode = _take_armed(scope["path"]) if _armed else None
+    if mode:
+        return mode
+    if settings.profiling_sample_rate and random.random() < settings.profiling_sample_rate:
+        return "sample"
+    return None
+
+
+class ProfilingMiddleware:
+    """
+    Profile single requests on demand and store the result
+
+    With asyncio, cProfile sees everything the event loop runs while the
+    request is in flight, and none of the threadpool; sampling sees all threads
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.profiling_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        mode = _requested_mode(scope)
+        if mode is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = new_profile_id(mode, f"{scope['method']} {scope['path']}")
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        if mode == "cprofile":
+            if not _cprofile_lock.acquire(blocking=False):
+                # Another request is being profiled; serve this one normally
+                await self.app(scope, receive, send)
+                return
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+                try:
+                    await self.app(scope, receive, send_with_id)
+                finally:
+                    profiler.disable()
+                # File I/O off the event loop
+                await run_in_threadpool(lambda: write_cprofile(profiler, profile_dir() / profile_id))
+            finally:
+                _cprofile_lock.release()
+        else:
+            sampler = StackSampler(sampler_interval()).start()
+            try:
+                await self.app(scope, receive, send_with_id)
+            finally:
+                sampler.stop()
+                await run_in_threadpool(lambda: sampler.write(profile_dir() / profile_id))
+
+        await run_in_threadpool(prune_profiles)
+        logger.info(
+            "Profiled %s %s -> %s",
+            scope["method"], redact_path(scope["path"], scope.get("query_string", b"")), profile_id
+        )
@@ -0,0 +1,66 @@
+"""
+Named column projections for university data
+Keeps PostgREST embeddings small by selecting only what each view renders
+"""
+from typing import Optional
+from fastapi import HTTPException, status
+
+
+# All columns a caller may request through the fields= query parameter
+UNIVERSITY_COLUMNS = (
+    "id", "name", "country", "city", "ranking",
+    "programs_offered",
+    "min_gpa", "min_ielts", "min_toefl", "requires_gre", "requires_gmat",
+    "tuition_min", "tuition_max", "living_cost_yearly",
+    "has_scholarships", "scholarship_types", "scholarship_amount_min",
+    "scholarship_amount_max", "scholarship_deadline",
+    "acceptance_rate", "description",
+)
+
+UNIVERSITY_PROJECTIONS = {
+    # Shortlist and dashboard cards: name, location, cost and first program
+    "card": (
+        "id", "name", "country", "city", "ranking", "programs_offered",
+        "tuition_max", "living_cost_yearly", "acceptance_rate", "has_scholarships",
+    ),
+    # Everything except the long description text
+    "detail": tuple(c for c in UNIVERSITY_COLUMNS if c != "description"),
+    "full": UNIVERSITY_COLUMNS,
+}
+
+
+def university_columns(projection: str = "card", fields: Optional[str] = None) -> tuple:
+    """
+    Resolve the university columns to select
+
+    Args:
+        projection: Named projection (card, detail, full)
+        fields: Optional comma-separated column list that overrides the projection
+
+    Returns:
+        Tuple of column names (always includes id)
+
+    Raises:
+        HTTPException: If the projection or a requested field is unknown
+    """
+    if fields:
+        requested = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = [f for f in requested if f not in UNIVERSITY_COLUMNS]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown university fields: {', '.join(unknown)}"
+            )
+        return tuple(dict.fromkeys(["id", *requested]))
+
+    if projection not in UNIVERSITY_PROJECTIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Projection must be one of: {', '.join(UNIVERSITY_PROJECTIONS)}"
+        )
+    return UNIVERSITY_PROJECTIONS[projection]
+
+
+def university_embed(projection: str = "card", fields: Optional[str] = None) -> str:
+    """Build a PostgREST embedding such as universities(id, name, country)"""
+    return f"universities({', '.join(university_columns(projection, fields))})"
@@ -0,0 +1,114 @@
+"""
+pytest plugin: per-route Supabase query budgets
+Every request made through the app during a test (e.g. with FastAPI's
+TestClient) is checked against a query budget for its route, and the test
+fails when a request goes over, listing the most repeated query shapes.
+
+Enable it in a conftest.py or on the command line:
+
+    pytest_plugins = ["app.pytest_query_budget"]
+    pytest -p app.pytest_query_budget
+
+Budgets come from the query_budgets ini option, one "METHOD route = max"
+per line (routes as declared, e.g. /universities/{university_id}):
+
+    [pytest]
+    query_budgets =
+        GET /dashboard/ = 8
+        POST /shortlist/ = 6
+
+A test can override them with @pytest.mark.query_budget(4) (every
+request) or @pytest.mark.query_budget(4, route="GET /dashboard/").
+The query_log fixture holds the requests seen so far for direct asserts.
+"""
+from typing import Dict, List, Optional
+
+import pytest
+
+from app import query_debug
+
+
+class QueryLog:
+    """Requests handled during one test: (method route, stats)"""
+
+    def __init__(self):
+        self.requests: List[tuple] = []
+
+    def __call__(self, method: str, route: str, stats) -> None:
+        self.requests.append((f"{method} {route}", stats))
+
+    def for_route(self, route: str) -> List:
+        return [stats for key, stats in self.requests if key == route]
+
+
+def parse_budgets(lines: List[str]) -> Dict[str, int]:
+    budgets = {}
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        route, _, limit = line.rpartition("=")
+        if not route:
+            raise pytest.UsageError(f"query_budgets: expected 'METHOD route = max', got {line!r}")
+        budgets[" ".join(route.split())] = int(limit)
+    return budgets
+
+
+def pytest_addoption(parser):
+    parser.addini("query_budgets", "Per-route query budgets, one 'METHOD route = max' per line", type="linelist", default=[])
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "query_budget(max_queries, route=None): fail if a request (or the given route) runs more Supabase queries"
+    )
+    config._query_budgets = parse_budgets(config.getini("query_budgets"))
+
+
+def _budget_for(route: str, budgets: Dict[str, int], markers: List) -> Optional[int]:
+    for marker in markers:
+        target = marker.kwargs.get("route")
+        if target is None or " ".join(target.split()) == route:
+            return marker.args[0]
+    return budgets.get(route)
+
+
+@pytest.fixture
+def query_log():
+    """Requests handled so far in this test, with their query stats"""
+    log = QueryLog()
+    query_debug.add_request_listener(log)
+    yield log
+    query_debug.remove_request_listener(log)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    """Check the requests made by the test body itself (fixture setup is not counted)"""
+    budgets = item.config._query_budgets
+    markers = list(item.iter_markers("query_budget"))
+    if not budgets and not markers:
+        yield
+        return
+    log = QueryLog()
+    query_debug.add_request_listener(log)
+    try:
+        outcome = yield
+    finally:
+        query_debug.remove_request_listener(log)
+    if outcome.excinfo is not None:
+        return
+
+    failures = []
+    for route, stats in log.requests:
+        budget = _budget_for(route, budgets, markers)
+        if budget is not None and stats.queries > budget:
+            summary = query_debug.summarize(stats)
+            shapes = "; ".join(
+                f"{s['count']}x {s['operation']} {s['table']}" + (f" [{s['filters']}]" if s["filters"] else "")
+                for s in summary["top_shapes"]
+            )
+            failures.append(f"{route}: {stats.queries} queries (budget {budget}) - {shapes}")
+    if failures:
+        outcome.force_exception(pytest.fail.Exception("Query budget exceeded:\n  " + "\n  ".join(failures), pytrace=False))
@@ -0,0 +1,111 @@
+"""
+Slow-query log and N+1 detection for the instrumented Supabase client
+Meant for development and staging, and off unless settings.query_debug
+is set (QUERY_DEBUG=true): each query slower than settings.slow_query_ms is
+logged with its table, filters and the app line that issued it, and a
+request is flagged when it repeats one table + filter shape more than
+settings.n_plus_one_threshold times or runs more than
+settings.request_query_limit queries in total.
+
+Request listeners receive every finished request's stats; the
+app.pytest_query_budget plugin uses them to enforce per-route budgets.
+"""
+import logging
+import os
+import sys
+from typing import Callable, Dict, List, Optional, Tuple
+from app.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# (table, operation, filters) - what makes two queries "the same query"
+QueryShape = Tuple[str, str, str]
+
+_APP_DIR = os.path.dirname(os.path.abspath(__file__)) + os.sep
+# Frames in these files are the wrapper itself, not the code that issued the query
+_INTERNAL_FILES = {
+    os.path.join(_APP_DIR, "metrics.py"),
+    os.path.join(_APP_DIR, "query_debug.py"),
+    os.path.join(_APP_DIR, "tracing.py"),
+}
+
+_request_listeners: List[Callable] = []
+
+
+def query_debug_enabled() -> bool:
+    """settings.query_debug; opt-in, since it walks the stack on every query"""
+    return settings.query_debug
+
+
+def find_caller() -> str:
+    """file:line in function of the innermost app frame outside the data-access wrapper"""
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_APP_DIR) and filename not in _INTERNAL_FILES:
+            return f"app/{filename[len(_APP_DIR):]}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return "unknown"
+
+
+def log_slow_query(shape: QueryShape, seconds: float, caller: str) -> None:
+    table, operation, filters = shape
+    logger.warning("Slow query", extra={
+        "table": table,
+        "operation": operation,
+        "filters": filters,
+        "duration_ms": round(seconds * 1000, 1),
+        "caller": caller
+    })
+
+
+def check_request(method: str, route: str, stats) -> None:
+    """Flag repeated query shapes and query counts over the limit for a finished request"""
+    for shape, count in stats.shapes.items():
+        if count > settings.n_plus_one_threshold:
+            table, operation, filters = shape
+            logger.warning("Repeated query shape (possible N+1)", extra={
+                "route": f"{method} {route}",
+                "table": table,
+                "operation": operation,
+                "filters": filters,
+                "count": count,
+                "caller": stats.callers.get(shape, "unknown")
+            })
+    if stats.queries > settings.request_query_limit:
+        logger.warning("Too many queries in one request", extra={
+            "route": f"{method} {route}",
+            "queries": stats.queries,
+            "limit": settings.request_query_limit,
+            "tables": dict(stats.tables)
+        })
+
+
+def add_request_listener(listener: Callable) -> None:
+    """Call listener(method, route, stats) after every instrumented request"""
+    _request_listeners.append(listener)
+
+
+def remove_request_listener(listener: Callable) -> None:
+    if listener in _request_listeners:
+        _request_listeners.remove(listener)
+
+
+def finish_request(method: str, route: str, stats) -> None:
+    if query_debug_enabled():
+        check_request(method, route, stats)
+    for listener in list(_request_listeners):
+        listener(method, route, stats)
+
+
+def summarize(stats, limit: int = 5) -> Dict:
+    """Query count, time and the most repeated shapes of one request, for reports"""
+    top: List[Dict] = []
+    for (table, operation, filters), count in sorted(stats.shapes.items(), key=lambda item: -item[1])[:limit]:
+        top.append({"table": table, "operation": operation, "filters": filters, "count": count})
+    return {"queries": stats.queries, "seconds": round(stats.seconds, 4), "top_shapes": top}
+
+
+def shape_of(table: str, operation: str, filters: Optional[List[str]]) -> QueryShape:
+    return (table, operation, ", ".join(filters or ()))
@@ -2,99 +2,145 @@
 University Recommendation Engine
 Calculates match scores and categorizes universities based on user profile
 """
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple, Union
+from app.compact import University, as_university, programs as program_vocabulary
+from app.scoring_rules import CompiledRules, get_rules
 
 
-def calculate_match_score(user_profile: Dict[str, Any], university: Dict[str, Any]) -> int:
-    """
-    Calculate compatibility score (0-100) between user and university
-    
-    Factors:
-    - GPA match (20%)
-    - Budget match (25%)
-    - Country preference (15%)
-    - Field alignment (20%)
-    - Exam scores (15%)
-    - Scholarship availability (5%)
-    """
+# Sub-scores take a University record (see app.compact.as_university)
+
+def score_gpa(user_profile: Dict[str, Any], university: University, rules: Optional[CompiledRules] = None) -> int:
+    """GPA matching (default 20 points, partial credit for small gaps)"""
+    if university.min_gpa and user_profile.get("gpa"):
+        gap = university.min_gpa - user_profile["gpa"]
+        for max_gap, points in (rules or get_rules()).gpa_tiers:
+            if gap <= max_gap:
+                return points
+    return 0
+
+
+def score_budget(user_profile: Dict[str, Any], university: University, rules: Optional[CompiledRules] = None) -> int:
+    """Budget matching (default 25 points, plus 5 for scholarships when budget is tight)"""
+    rules = rules or get_rules()
     score = 0
-    
-    # 1. GPA matching (20 points)
-    if university.get("min_gpa") and user_profile.get("gpa"):
-        if user_profile["gpa"] >= university["min_gpa"]:
-            score += 20
-        elif university["min_gpa"] - user_profile["gpa"] <= 0.3:
-            # Close match, give partial credit
-            score += 10
-        elif university["min_gpa"] - user_profile["gpa"] <= 0.5:
-            score += 5
-    
-    # 2. Budget matching (25 points)
-    if university.get("tuition_max") and university.get("living_cost_yearly"):
-        total_cost = university["tuition_max"] + university["living_cost_yearly"]
+    if university.tuition_max and university.living_cost_yearly:
+        total_cost = university.tuition_max + university.living_cost_yearly
         user_budget = user_profile.get("budget_max", 0)
         
-        if user_budget >= total_cost:
-            score += 25  # Perfect fit
-        elif user_budget >= total_cost * 0.8:
-            score += 20  # Slightly over budget but manageable
-        elif user_budget >= total_cost * 0.6:
-            score += 10  # Stretching the budget
+        # Perfect fit, slightly over budget, stretching the budget
+        for min_ratio, points in rules.budget_tiers:
+            if user_budget >= total_cost * min_ratio:
+                score += points
+                break
         
         # Bonus for scholarships if budget is tight
-        if university.get("has_scholarships") and user_budget < total_cost:
-            score += 5
-    
-    # 3. Country preference (15 points)
+        if university.has_scholarships and user_budget < total_cost:
+            score += rules.scholarship_bonus
+    return score
+
+
+def score_country(user_profile: Dict[str, Any], university: University, rules: Optional[CompiledRules] = None) -> int:
+    """Country preference (default 15 points)"""
     preferred_countries = user_profile.get("preferred_countries", [])
-    if university.get("country") in preferred_countries:
-        score += 15
+    if university.country in preferred_countries:
+        return (rules or get_rules()).country_points
+    return 0
+
+
+# Distinct fields of study whose program masks are kept
+_FIELD_CACHE_LIMIT = 512
+_field_masks: Dict[tuple, Tuple[int, int]] = {}
+
+
+def field_masks(user_field: str) -> Tuple[int, int]:
+    """
+    Program masks (direct, related) for a lower-cased field of study
     
-    # 4. Field/Program alignment (20 points)
-    user_field = user_profile.get("field_of_study", "").lower()
-    programs_offered = university.get("programs_offered", [])
+    A program matches directly when either name contains the other, and is
+    related when it contains one of the field's keywords
+    """
+    key = (user_field, len(program_vocabulary))
+    masks = _field_masks.get(key)
+    if masks is None:
+        keywords = extract_keywords(user_field)
+        direct = program_vocabulary.mask_where(
+            lambda name: user_field in name.lower() or name.lower() in user_field
+        )
+        related = program_vocabulary.mask_where(
+            lambda name: any(keyword in name.lower() for keyword in keywords)
+        )
+        if len(_field_masks) >= _FIELD_CACHE_LIMIT:
+            _field_masks.clear()
+        masks = _field_masks[key] = (direct, related)
+    return masks
+
+
+def score_field(user_profile: Dict[str, Any], university: University, rules: Optional[CompiledRules] = None) -> int:
+    """Field/Program alignment (default 20 points, 10 for related fields)"""
+    rules = rules or get_rules()
+    direct, related = field_masks((user_profile.get("field_of_study") or "").lower())
     
     # Check if user's field matches any offered program
-    for program in programs_offered:
-        if user_field in program.lower() or program.lower() in user_field:
-            score += 20
-            break
-    else:
-        # Partial match for related fields
-        related_keywords = extract_keywords(user_field)
-        for program in programs_offered:
-            program_lower = program.lower()
-            if any(keyword in program_lower for keyword in related_keywords):
-                score += 10
-                break
+    if university.program_mask & direct:
+        return rules.field_direct
     
-    # 5. English proficiency exam scores (15 points)
+    # Partial match for related fields
+    if university.program_mask & related:
+        return rules.field_related
+    return 0
+
+
+def score_english(user_profile: Dict[str, Any], university: University, rules: Optional[CompiledRules] = None) -> int:
+    """English proficiency exam scores (default 15 points)"""
     if user_profile.get("ielts_toefl_status") == "Completed":
         ielts_score = user_profile.get("ielts_toefl_score")
-        if ielts_score and university.get("min_ielts"):
-            if ielts_score >= university["min_ielts"]:
-                score += 15
-            elif ielts_score >= university["min_ielts"] - 0.5:
-                score += 10
-            elif ielts_score >= university["min_ielts"] - 1.0:
-                score += 5
-    
-    # 6. GRE/GMAT requirement check (no points, but awareness)
-    # This doesn't add points but is important for eligibility
-    if university.get("requires_gre") or university.get("requires_gmat"):
-        gre_status = user_profile.get("gre_gmat_status")
-        if gre_status == "Completed":
-            # User has taken the exam, good!
-            pass
-        elif gre_status == "Scheduled":
-            # Planned, okay
-            pass
-        else:
-            # Not started - this might be an issue but don't penalize score
-            # Just note it for the user
-            pass
+        if ielts_score and university.min_ielts:
+            for max_shortfall, points in (rules or get_rules()).english_tiers:
+                if ielts_score >= university.min_ielts - max_shortfall:
+                    return points
+    return 0
+
+
+# Sub-scores in a fixed order, with the profile fields each one reads.
+# GRE/GMAT requirements add no points (see identify_risks).
+SCORE_COMPONENTS = (
+    ("gpa", score_gpa, ("gpa",)),
+    ("budget", score_budget, ("budget_max",)),
+    ("country", score_country, ("preferred_countries",)),
+    ("field", score_field, ("field_of_study",)),
+    ("english", score_english, ("ielts_toefl_status", "ielts_toefl_score")),
+)
+
+# Every profile field that can change a match score
+SCORING_FIELDS = tuple(field for _, _, fields in SCORE_COMPONENTS for field in fields)
+
+
+def calculate_score_components(
+    user_profile: Dict[str, Any],
+    university: Union[University, Dict[str, Any]],
+    rules: Optional[CompiledRules] = None
+) -> tuple:
+    """Sub-scores in SCORE_COMPONENTS order"""
+    rules = rules or get_rules()
+    university = as_university(university)
+    return tuple(scorer(user_profile, university, rules) for _, scorer, _ in SCORE_COMPONENTS)
+
+
+def calculate_match_score(user_profile: Dict[str, Any], university: Union[University, Dict[str, Any]]) -> int:
+    """
+    Calculate compatibility score (0-100) between user and university
     
-    return min(score, 100)
+    Weights and thresholds come from the scoring rules (app.scoring_rules);
+    the defaults are:
+    - GPA match (20%)
+    - Budget match (25%)
+    - Country preference (15%)
+    - Field alignment (20%)
+    - Exam scores (15%)
+    - Scholarship availability (5%)
+    """
+    rules = get_rules()
+    return min(sum(calculate_score_components(user_profile, university, rules)), rules.max_score)
 
 
 def categorize_university(match_score: int, acceptance_rate: float, ranking: int = None) -> str:
@@ -105,113 +151,167 @@ def categorize_university(match_score: int, acceptance_rate: float, ranking: int
     - Target: Good fit schools (moderate acceptance, good match)
     - Safe: Safety schools (high acceptance rate and high match score)
     """
+    rules = get_rules()
     # Consider acceptance rate as primary factor
-    if acceptance_rate < 15:
+    if acceptance_rate < rules.dream_below:
         # Very selective - likely a Dream school
         return "Dream"
-    elif acceptance_rate < 30:
+    elif acceptance_rate < rules.selective_below:
         # Selective - Dream or Target based on match score
-        if match_score >= 75:
+        if match_score >= rules.selective_target_score:
             return "Target"
         else:
             return "Dream"
-    elif acceptance_rate < 50:
+    elif acceptance_rate < rules.moderate_below:
         # Moderately selective - Target or Safe based on match
-        if match_score >= 80:
+        if match_score >= rules.moderate_safe_score:
             return "Safe"
         else:
             return "Target"
     else:
         # Less selective - likely Safe
-        if match_score >= 70:
+        if match_score >= rules.accessible_safe_score:
             return "Safe"
         else:
             return "Target"
 
 
-def generate_why_fits(user_profile: Dict[str, Any], university: Dict[str, Any], match_score: int) -> str:
+# ========== Explanations ==========
+
+# Reason code -> renderer for its parameters
+REASON_TEXT = {
+    # Why it fits
+    "gpa_exceeds_minimum": lambda p: f"Your GPA of {p['gpa']} exceeds the minimum requirement of {p['min_gpa']}",
+    "preferred_country": lambda p: f"Located in {p['country']}, which is one of your preferred countries",
+    "offers_field": lambda p: f"Offers your desired field of study: {p['program']}",
+    "within_budget": lambda p: f"Annual cost (${p['total_cost']:,.0f}) fits within your budget",
+    "offers_scholarships": lambda p: f"Offers scholarships: {', '.join(p['scholarship_types'])}",
+    "highly_ranked": lambda p: f"Highly ranked institution (#{p['ranking']} globally)",
+    "general_fit": lambda p: "General good fit based on your profile",
+    # Risks
+    "gpa_below_minimum": lambda p: f"Your GPA is {p['gap']:.1f} points below the minimum requirement",
+    "over_budget": lambda p: f"Annual cost exceeds your budget by ${p['overage']:,.0f}",
+    "scholarships_offset_costs": lambda p: "Consider applying for available scholarships to offset costs",
+    "exam_not_started": lambda p: f"{p['exam']} is required but you haven't started preparation",
+    "english_test_pending": lambda p: "IELTS/TOEFL score required - ensure you complete this before applying",
+    "very_competitive": lambda p: f"Very competitive with only {p['acceptance_rate']}% acceptance rate",
+    "no_major_risks": lambda p: "No major risks identified. Good fit overall",
+}
+
+# Profile fields read by fit_reasons / risk_reasons
+EXPLANATION_FIELDS = (
+    "gpa", "preferred_countries", "field_of_study", "budget_max",
+    "gre_gmat_status", "ielts_toefl_status",
+)
+
+
+def render_reason(code: str, params: Dict[str, Any]) -> str:
+    """Render one reason code as a sentence (without the trailing period)"""
+    return REASON_TEXT[code](params)
+
+
+def fit_reasons(user_profile: Dict[str, Any], university: Union[University, Dict[str, Any]]) -> List[Tuple[str, Dict[str, Any]]]:
     """
-    Generate AI explanation for why this university fits the user
+    Reasons this university fits the user, as (code, params) pairs
     """
+    university = as_university(university)
     reasons = []
     
     # GPA match
-    if university.get("min_gpa") and user_profile.get("gpa"):
-        if user_profile["gpa"] >= university["min_gpa"]:
-            reasons.append(f"Your GPA of {user_profile['gpa']} exceeds the minimum requirement of {university['min_gpa']}")
+    if university.min_gpa and user_profile.get("gpa"):
+        if user_profile["gpa"] >= university.min_gpa:
+            reasons.append(("gpa_exceeds_minimum", {"gpa": user_profile["gpa"], "min_gpa": university.min_gpa}))
     
     # Country preference
-    if university.get("country") in user_profile.get("preferred_countries", []):
-        reasons.append(f"Located in {university['country']}, which is one of your preferred countries")
+    if university.country in user_profile.get("preferred_countries", []):
+        reasons.append(("preferred_country", {"country": university.country}))
     
     # Program alignment
     user_field = user_profile.get("field_of_study", "")
-    programs = university.get("programs_offered", [])
-    for program in programs:
+    for program in university.programs_offered:
         if user_field.lower() in program.lower():
-            reasons.append(f"Offers your desired field of study: {program}")
+            reasons.append(("offers_field", {"program": program}))
             break
     
     # Budget
-    if university.get("tuition_max") and user_profile.get("budget_max"):
-        total_cost = university["tuition_max"] + university.get("living_cost_yearly", 0)
+    if university.tuition_max and user_profile.get("budget_max"):
+        total_cost = university.tuition_max + (university.living_cost_yearly or 0)
         if user_profile["budget_max"] >= total_cost:
-            reasons.append(f"Annual cost (${total_cost:,.0f}) fits within your budget")
+            reasons.append(("within_budget", {"total_cost": total_cost}))
     
     # Scholarships
-    if university.get("has_scholarships"):
-        scholarship_types = ", ".join(university.get("scholarship_types", []))
-        reasons.append(f"Offers scholarships: {scholarship_types}")
+    if university.has_scholarships:
+        reasons.append(("offers_scholarships", {"scholarship_types": list(university.scholarship_types)}))
     
     # Ranking
-    if university.get("ranking") and university["ranking"] <= 50:
-        reasons.append(f"Highly ranked institution (#{university['ranking']} globally)")
+    if university.ranking and university.ranking <= 50:
+        reasons.append(("highly_ranked", {"ranking": university.ranking}))
     
     if not reasons:
-        reasons.append("General good fit based on your profile")
+        reasons.append(("general_fit", {}))
     
-    return ". ".join(reasons) + "."
+    return reasons
 
 
-def identify_risks(user_profile: Dict[str, Any], university: Dict[str, Any]) -> str:
+def risk_reasons(user_profile: Dict[str, Any], university: Union[University, Dict[str, Any]]) -> List[Tuple[str, Dict[str, Any]]]:
     """
-    Identify potential risks or challenges for this university
+    Potential risks or challenges for this university, as (code, params) pairs
     """
+    university = as_university(university)
     risks = []
     
     # GPA risk
-    if university.get("min_gpa") and user_profile.get("gpa"):
-        if user_profile["gpa"] < university["min_gpa"]:
-            gap = university["min_gpa"] - user_profile["gpa"]
-            risks.append(f"Your GPA is {gap:.1f} points below the minimum requirement")
+    if university.min_gpa and user_profile.get("gpa"):
+        if user_profile["gpa"] < university.min_gpa:
+            gap = university.min_gpa - user_profile["gpa"]
+            risks.append(("gpa_below_minimum", {"gap": gap}))
     
     # Budget risk
-    if university.get("tuition_max") and user_profile.get("budget_max"):
-        total_cost = university["tuition_max"] + university.get("living_cost_yearly", 0)
+    if university.tuition_max and user_profile.get("budget_max"):
+        total_cost = university.tuition_max + (university.living_cost_yearly or 0)
         if total_cost > user_profile["budget_max"]:
             overage = total_cost - user_profile["budget_max"]
-            risks.append(f"Annual cost exceeds your budget by ${overage:,.0f}")
-            if university.get("has_scholarships"):
-                risks.append("Consider applying for available scholarships to offset costs")
+            risks.append(("over_budget", {"overage": overage}))
+            if university.has_scholarships:
+                risks.append(("scholarships_offset_costs", {}))
     
     # Exam requirements
-    if university.get("requires_gre") or university.get("requires_gmat"):
+    if university.requires_gre or university.requires_gmat:
         if user_profile.get("gre_gmat_status") == "Not Started":
-            exam_type = "GRE" if university.get("requires_gre") else "GMAT"
-            risks.append(f"{exam_type} is required but you haven't started preparation")
+            exam_type = "GRE" if university.requires_gre else "GMAT"
+            risks.append(("exam_not_started", {"exam": exam_type}))
     
     # English proficiency
     if user_profile.get("ielts_toefl_status") != "Completed":
-        risks.append("IELTS/TOEFL score required - ensure you complete this before applying")
+        risks.append(("english_test_pending", {}))
     
     # Low acceptance rate
-    if university.get("acceptance_rate") and university["acceptance_rate"] < 10:
-        risks.append(f"Very competitive with only {university['acceptance_rate']}% acceptance rate")
+    if university.acceptance_rate and university.acceptance_rate < 10:
+        risks.append(("very_competitive", {"acceptance_rate": university.acceptance_rate}))
     
     if not risks:
-        return "No major risks identified. Good fit overall."
+        risks.append(("no_major_risks", {}))
     
-    return ". ".join(risks) + "."
+    return risks
+
+
+def render_reasons(reasons: List[Tuple[str, Dict[str, Any]]]) -> str:
+    """Join rendered reasons into the prose shown on cards"""
+    return ". ".join(render_reason(code, params) for code, params in reasons) + "."
+
+
+def generate_why_fits(user_profile: Dict[str, Any], university: Union[University, Dict[str, Any]], match_score: int) -> str:
+    """
+    Generate AI explanation for why this university fits the user
+    """
+    return render_reasons(fit_reasons(user_profile, university))
+
+
+def identify_risks(user_profile: Dict[str, Any], university: Union[University, Dict[str, Any]]) -> str:
+    """
+    Identify potential risks or challenges for this university
+    """
+    return render_reasons(risk_reasons(user_profile, university))
 
 
 def extract_keywords(field: str) -> List[str]:
@@ -236,3 +336,15 @@ def extract_keywords(field: str) -> List[str]:
             keywords.extend(related)
     
     return keywords
+
+
+# Batch scoring lives in app.score_matrix so request handling never imports
+# numpy; its public names stay importable from here and load it on first use
+_SCORE_MATRIX_NAMES = ("CATEGORY_LABELS", "iter_score_matrix", "score_matrix")
+
+
+def __getattr__(name: str) -> Any:
+    if name in _SCORE_MATRIX_NAMES:
+        from app import score_matrix as batch_scoring
+        return getattr(batch_scoring, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,283 @@
+"""
+Materialized per-user recommendation results
+In-memory tier backed by the user_recommendations table. With a shared
+cache backend (app.cache: "shared" or "redis") the ranked results are also
+kept there, so one worker's computation serves every other worker. Each
+entry is stamped with (profile hash, catalog version) and recomputed in
+the background when either changes.
+"""
+import hashlib
+import json
+import logging
+import threading
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from app.cache import get_cache
+from app.config import get_settings
+from app.database import supabase
+from app.catalog import CatalogSnapshot, get_catalog, on_catalog_reload
+from app.recommendation_engine import (
+    SCORE_COMPONENTS,
+    SCORING_FIELDS,
+    calculate_score_components,
+    categorize_university
+)
+from app.scoring_rules import get_rules
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+def scoring_profile(profile: Dict[str, Any]) -> Dict[str, Any]:
+    """The profile fields that can change a match score"""
+    return {field: profile[field] for field in SCORING_FIELDS if field in profile}
+
+
+def profile_hash(profile: Dict[str, Any]) -> str:
+    """Stable hash of the scoring inputs of a profile and the active scoring rules"""
+    inputs = {"profile": scoring_profile(profile), "rules": get_rules().fingerprint}
+    payload = json.dumps(inputs, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def _compact(values: List[int]) -> array:
+    """Sub-scores as the smallest integer array that holds them (1 byte each with the default rules)"""
+    for typecode in ("b", "h"):
+        try:
+            return array(typecode, values)
+        except OverflowError:
+            continue
+    return array("q", values)
+
+
+class RecommendationEntry:
+    """A user's ranked results and the inputs they were computed from"""
+
+    def __init__(
+        self,
+        profile_hash: str,
+        catalog_version: str,
+        results: List[list],
+        total: int,
+        scoring_profile: Optional[Dict[str, Any]] = None,
+        components: Optional[tuple] = None,
+        rules_fingerprint: Optional[str] = None
+    ):
+        self.profile_hash = profile_hash
+        self.catalog_version = catalog_version
+        self.results = results  # [[university_id, match_score, category], ...]
+        self.total = total
+        # Kept in memory only, for incremental recomputation: one array of
+        # sub-scores per SCORE_COMPONENTS entry, in catalog snapshot order
+        self.scoring_profile = scoring_profile
+        self.components = components
+        self.rules_fingerprint = rules_fingerprint
+
+    def is_fresh(self, profile_hash: str, catalog_version: str) -> bool:
+        return self.profile_hash == profile_hash and self.catalog_version == catalog_version
+
+
+def compute_recommendations(
+    profile: Dict[str, Any],
+    snapshot: CatalogSnapshot,
+    previous: Optional[RecommendationEntry] = None,
+    top_n: Optional[int] = None
+) -> RecommendationEntry:
+    """
+    Score the catalog for one profile and keep the ranked top-N
+
+    When the previous entry was computed against the same catalog version
+    and scoring rules, only the sub-scores whose profile fields changed are
+    recomputed.
+    """
+    rules = get_rules()
+    current = scoring_profile(profile)
+    stale = None
+    if (
+        previous is not None
+        and previous.components is not None
+        and previous.catalog_version == snapshot.version
+        and previous.rules_fingerprint == rules.fingerprint
+    ):
+        changed = {
+            field for field in SCORING_FIELDS
+            if previous.scoring_profile.get(field, _MISSING) != current.get(field, _MISSING)
+        }
+        stale = [i for i, (_, _, fields) in enumerate(SCORE_COMPONENTS) if changed.intersection(fields)]
+
+    columns = [[] for _ in SCORE_COMPONENTS]
+    scored = []
+    for position, uni in enumerate(snapshot.universities):
+        if stale is None:
+            parts = calculate_score_components(profile, uni, rules)
+        else:
+            # Same catalog version, so the same university order
+            parts = [column[position] for column in previous.components]
+            for i in stale:
+                parts[i] = SCORE_COMPONENTS[i][1](profile, uni, rules)
+        for column, part in zip(columns, parts):
+            column.append(part)
+        scored.append((uni, min(sum(parts), rules.max_score)))
+
+    # Stable sort keeps catalog order among equal scores
+    scored.sort(key=lambda item: item[1], reverse=True)
+
+    results = []
+    for uni, match_score in scored[:top_n or settings.recommendation_top_n]:
+        category = categorize_university(
+            match_score,
+            uni.get("acceptance_rate", 50),
+            uni.ranking
+        )
+        results.append([uni.id, match_score, category])
+
+    return RecommendationEntry(
+        profile_hash=profile_hash(profile),
+        catalog_version=snapshot.version,
+        results=results,
+        total=len(scored),
+        scoring_profile=current,
+        components=tuple(_compact(column) for column in columns),
+        rules_fingerprint=rules.fingerprint
+    )
+
+
+class RecommendationStore:
+    """Two-tier store: bounded in-memory LRU over the user_recommendations table"""
+
+    def __init__(self, max_users: int):
+        self.max_users = max_users
+        self._memory: "OrderedDict[str, RecommendationEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="recommendations")
+
+    def _remember(self, user_id: str, entry: RecommendationEntry) -> None:
+        with self._lock:
+            self._memory[user_id] = entry
+            self._memory.move_to_end(user_id)
+            while len(self._memory) > self.max_users:
+                self._memory.popitem(last=False)
+
+    def _peek(self, user_id: str) -> Optional[RecommendationEntry]:
+        with self._lock:
+            entry = self._memory.get(user_id)
+            if entry is not None:
+                self._memory.move_to_end(user_id)
+            return entry
+
+    def _load_shared(self, user_id: str) -> Optional[RecommendationEntry]:
+        """Entry another worker computed, when the cache backend is shared"""
+        cache = get_cache()
+        if not cache.shared:
+            return None
+        try:
+            row = cache.get(f"recommendations:{user_id}")
+        except Exception as e:
+            logger.warning("Could not read shared recommendations", extra={"user_id": user_id, "error": str(e)})
+            return None
+        if row is None:
+            return None
+        return RecommendationEntry(row["profile_hash"], row["catalog_version"], row["results"], row["total"])
+
+    def _share(self, user_id: str, entry: RecommendationEntry) -> None:
+        """Publish ranked results to the other workers (components stay local)"""
+        cache = get_cache()
+        if not cache.shared:
+            return
+        try:
+            cache.set(f"recommendations:{user_id}", {
+                "profile_hash": entry.profile_hash,
+                "catalog_version": entry.catalog_version,
+                "total": entry.total,
+                "results": entry.results
+            })
+        except Exception as e:
+            logger.warning("Could not share recommendations", extra={"user_id": user_id, "error": str(e)})
+
+    def _load_row(self, user_id: str) -> Optional[RecommendationEntry]:
+        try:
+            result = supabase.table("user_recommendations")\
+                .select("profile_hash, catalog_version, total, results")\
+                .eq("user_id", user_id)\
+                .execute()
+        except Exception as e:
+            logger.warning("Could not read user_recommendations", extra={"user_id": user_id, "error": str(e)})
+            return None
+        if not result.data:
+            return None
+        row = result.data[0]
+        return RecommendationEntry(row["profile_hash"], row["catalog_version"], row["results"], row["total"])
+
+    def _save_row(self, user_id: str, entry: RecommendationEntry) -> None:
+        try:
+            supabase.table("user_recommendations").upsert({
+                "user_id": user_id,
+                "profile_hash": entry.profile_hash,
+                "catalog_version": entry.catalog_version,
+                "total": entry.total,
+                "results": entry.results,
+                "computed_at": datetime.utcnow().isoformat()
+            }, on_conflict="user_id").execute()
+        except Exception as e:
+            logger.warning("Could not save user_recommendations", extra={"user_id": user_id, "error": str(e)})
+
+    def get(self, user_id: str, profile: Dict[str, Any]) -> RecommendationEntry:
+        """
+        Get up-to-date recommendations for a user
+
+        Serves the in-memory entry, then the shared cache entry, then the
+        stored row, and computes only when all are stale for this profile
+        and catalog version
+        """
+        snapshot = get_catalog()
+        current_hash = profile_hash(profile)
+
+        entry = self._peek(user_id)
+        if entry is not None and entry.is_fresh(current_hash, snapshot.version):
+            return entry
+
+        shared = self._load_shared(user_id)
+        if shared is not None and shared.is_fresh(current_hash, snapshot.version):
+            self._remember(user_id, shared)
+            return shared
+
+        stored = self._load_row(user_id)
+        if stored is not None and stored.is_fresh(current_hash, snapshot.version):
+            self._remember(user_id, stored)
+            self._share(user_id, stored)
+            return stored
+
+        return self.recompute(user_id, profile, snapshot)
+
+    def recompute(self, user_id: str, profile: Dict[str, Any], snapshot: Optional[CatalogSnapshot] = None) -> RecommendationEntry:
+        """Compute (incrementally when possible), remember and persist"""
+        entry = compute_recommendations(profile, snapshot or get_catalog(), previous=self._peek(user_id))
+        self._remember(user_id, entry)
+        self._share(user_id, entry)
+        self._save_row(user_id, entry)
+        return entry
+
+    def refresh(self, user_id: str) -> None:
+        """Background task: recompute after a profile update"""
+        try:
+            result = supabase.table("profiles").select("*").eq("user_id", user_id).execute()
+            if result.data:
+                self.recompute(user_id, result.data[0])
+        except Exception as e:
+            logger.warning("Recommendation refresh failed", extra={"user_id": user_id, "error": str(e)})
+
+    def refresh_in_memory_users(self, snapshot: CatalogSnapshot) -> None:
+        """Catalog reload listener: recompute the users we are holding in memory"""
+        with self._lock:
+            user_ids = list(self._memory)
+        for user_id in user_ids:
+            self._executor.submit(self.refresh, user_id)
+
+
+recommendation_store = RecommendationStore(settings.recommendation_memory_users)
+on_catalog_reload(recommendation_store.refresh_in_memory_users)
@@ -0,0 +1,160 @@
+"""
+Admin endpoints - Catalog export / import between environments and profiling
+Requires the X-Admin-Key header (settings.admin_api_key)
+"""
+import os
+import tempfile
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, StreamingResponse
+from app import profiling
+from app.auth import require_admin
+from app.catalog_io import (
+    export_csv_gzip,
+    export_ndjson,
+    import_universities,
+    iter_stream_rows,
+    iter_universities
+)
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+# Uploads larger than this are spooled to a temporary file instead of memory
+UPLOAD_SPOOL_BYTES = 8 * 1024 * 1024
+
+
+@router.get("/catalog/export")
+async def export_catalog(format: str = Query("ndjson", pattern="^(ndjson|csv)$")):
+    """
+    Stream the universities table as NDJSON or gzip CSV
+    """
+    rows = iter_universities()
+    if format == "csv":
+        return StreamingResponse(
+            export_csv_gzip(rows),
+            media_type="application/gzip",
+            headers={"Content-Disposition": 'attachment; filename="universities.csv.gz"'}
+        )
+    return StreamingResponse(
+        export_ndjson(rows),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="universities.ndjson"'}
+    )
+
+
+def _import_upload(upload, format: str, batch_size: int, strict: bool) -> dict:
+    try:
+        return import_universities(lambda: iter_stream_rows(upload, format), batch_size=batch_size, strict=strict)
+    finally:
+        upload.close()
+
+
+@router.post("/catalog/import")
+async def import_catalog(
+    request: Request,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    batch_size: int = Query(500, ge=1, le=5000),
+    strict: bool = False
+):
+    """
+    Validate and upsert universities from an NDJSON or CSV body (optionally gzipped)
+    
+    Rows are upserted on (name, country). Invalid rows are skipped and
+    listed in the report; with strict=true any invalid row aborts the import
+    before anything is written.
+    """
+    try:
+        upload = tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_BYTES)
+        async for chunk in request.stream():
+            upload.write(chunk)
+        
+        report = await run_in_threadpool(_import_upload, upload, format, batch_size, strict)
+        print(f"Catalog import: {report['upserted']} upserted, {report['invalid']} invalid in {report['seconds']}s")
+        return report
+        
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to import catalog: {str(e)}"
+        )
+
+
+def _require_profiling() -> None:
+    if not profiling.settings.profiling_enabled:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Profiling is disabled (set PROFILING_ENABLED=true)"
+        )
+
+
+@router.post("/profiling/arm")
+async def arm_profiling(
+    path: str = Query(..., description="Exact request path, e.g. /universities/recommendations"),
+    mode: str = Query("cprofile", pattern="^(cprofile|sample)$")
+):
+    """
+    Profile the next request to a path; its profile id is sent in X-Profile-Id
+
+    Armed in every worker; whichever one serves the next request profiles it
+    """
+    _require_profiling()
+    profiling.arm(path, mode)
+    return {"armed": profiling.armed(), "pid": os.getpid()}
+
+
+@router.post("/profiling/sampler")
+async def start_sampler(seconds: float = Query(30, gt=0, le=600)):
+    """
+    Sample every thread's stack for a time window and store collapsed stacks
+
+    Every worker samples its own process and stores its own profile; the
+    status returned is this worker's (see pid)
+    """
+    _require_profiling()
+    try:
+        return profiling.start_sampler(seconds)
+    except RuntimeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+
+
+@router.get("/profiling/sampler")
+async def get_sampler_status():
+    """Current or last sampling window of the worker that answers (see pid)"""
+    return profiling.background_sampler.status()
+
+
+@router.delete("/profiling/sampler")
+async def stop_sampler():
+    """End the running sampling window early in every worker; what was sampled so far is written"""
+    return profiling.stop_sampler()
+
+
+@router.get("/profiling/profiles")
+async def list_profiles():
+    """Stored profiles, newest first"""
+    return {"profiles": profiling.list_profiles()}
+
+
+@router.get("/profiling/profiles/{profile_id}")
+async def download_profile(profile_id: str):
+    """
+    Download one profile (.prof for pstats / snakeviz, .folded for flamegraphs)
+    """
+    path = profiling.profile_path(profile_id)
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    media_type = "text/plain" if path.suffix == ".folded" else "application/octet-stream"
+    return FileResponse(path, media_type=media_type, filename=path.name)
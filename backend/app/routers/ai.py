@@ -3,6 +3,7 @@ AI Counsellor chat endpoint
 Provides context-aware guidance using Gemini AI
 """
 from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi.responses import ORJSONResponse
 from app.schemas import ChatRequest, ChatResponse
 from app.database import supabase
 from app.auth import get_current_user
@@ -99,7 +100,7 @@ async def get_chat_history(
             
         result = query.execute()
         
-        return {"history": result.data or []}
+        return ORJSONResponse({"history": result.data or []})
         
     except Exception as e:
         raise HTTPException(
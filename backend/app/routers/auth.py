@@ -2,12 +2,14 @@
 Authentication endpoints - Signup and Login
 Uses Supabase Auth for user management
 """
+import logging
 from fastapi import APIRouter, HTTPException, status, Depends
 from app.schemas import UserSignup, UserLogin, AuthResponse
 from app.database import supabase
 from app.auth import get_current_user
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
+logger = logging.getLogger(__name__)
 
 
 @router.post("/signup", response_model=AuthResponse, status_code=status.HTTP_201_CREATED)
@@ -117,7 +119,7 @@ async def login(credentials: UserLogin):
             else:
                 user_name_response = user_data.data[0].get("name", "")
         except Exception as sync_error:
-            print(f"User sync error: {sync_error}")
+            logger.warning("User sync failed", extra={"user_id": auth_response.user.id, "error": str(sync_error)})
             user_name_response = auth_response.user.email.split("@")[0]
         
         return AuthResponse(
@@ -129,7 +131,7 @@ async def login(credentials: UserLogin):
             }
         )
         
-    except Exception as e:
+    except Exception:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
@@ -2,14 +2,49 @@
 Dashboard data endpoint
 Returns profile summary, stage, strength, and tasks
 """
+import logging
 from fastapi import APIRouter, HTTPException, status, Depends
 from app.schemas import DashboardResponse, ProfileStrength, TaskResponse
-from app.database import supabase
+from app.database import supabase, sql_enabled
 from app.auth import get_current_user
 from app.profile_calculator import calculate_profile_strength
 from app.ai_service import generate_initial_tasks
+from app.projections import university_embed
 
 router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+logger = logging.getLogger(__name__)
+
+
+def _load_dashboard(user_id: str) -> dict:
+    """PostgREST version of sql_queries.dashboard_data (same keys, several round trips)"""
+    profile_result = supabase.table("profiles").select("*").eq("user_id", user_id).execute()
+    if not profile_result.data:
+        return {"profile": None}
+    
+    stage_result = supabase.table("user_stages").select("current_stage").eq("user_id", user_id).single().execute()
+    shortlisted = locked = 0
+    shortlist_res = supabase.table("shortlists").select("id").eq("user_id", user_id).execute()
+    if shortlist_res.data:
+        shortlisted = len(shortlist_res.data)
+        # Check Locked (Only if we have a shortlist)
+        locked_res = supabase.table("shortlists").select("id").eq("user_id", user_id).eq("is_locked", True).execute()
+        locked = len(locked_res.data or [])
+    
+    tasks_result = supabase.table("tasks").select("*").eq("user_id", user_id).order("created_at", desc=True).execute()
+    locked_result = supabase.table("shortlists")\
+        .select(f"id, bucket, {university_embed('card')}")\
+        .eq("user_id", user_id)\
+        .eq("is_locked", True)\
+        .execute()
+    
+    return {
+        "profile": profile_result.data[0],
+        "stage": stage_result.data.get("current_stage") if stage_result.data else None,
+        "shortlisted": shortlisted,
+        "locked": locked,
+        "tasks": tasks_result.data,
+        "locked_universities": locked_result.data
+    }
 
 
 @router.get("/", response_model=DashboardResponse)
@@ -24,38 +59,32 @@ async def get_dashboard_data(current_user: dict = Depends(get_current_user)):
     - AI-generated tasks
     """
     try:
-        # Get profile
-        profile_result = supabase.table("profiles").select("*").eq("user_id", current_user.id).execute()
+        if sql_enabled():
+            from app import sql_queries  # Keeps SQLAlchemy off the PostgREST-only startup path
+            data = await sql_queries.dashboard_data(current_user.id)
+        else:
+            data = _load_dashboard(current_user.id)
         
-        if not profile_result.data:
+        if not data["profile"]:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Profile not found. Please complete onboarding first."
             )
         
-        profile = profile_result.data[0]
+        profile = data["profile"]
         
-        # Get current stage from DB (for reference)
-        stage_result = supabase.table("user_stages").select("current_stage").eq("user_id", current_user.id).single().execute()
-        db_stage = stage_result.data.get("current_stage", "PROFILE_READY") if stage_result.data else "PROFILE_READY"
+        # Current stage from DB (for reference)
+        db_stage = data["stage"] or "PROFILE_READY"
         
         # --- Robust Stateless Calculation ---
         # Determine strict stage based on actual data existence
         calculated_stage = "DISCOVERY" # Default since profile exists (checked above)
-        
-        # Check Shortlist
-        shortlist_res = supabase.table("shortlists").select("id").eq("user_id", current_user.id).execute()
-        if shortlist_res.data and len(shortlist_res.data) > 0:
-            calculated_stage = "SHORTLISTING"
-            
-            # Check Locked (Only if we have a shortlist)
-            locked_res = supabase.table("shortlists").select("id").eq("user_id", current_user.id).eq("is_locked", True).execute()
-            if locked_res.data and len(locked_res.data) > 0:
-                calculated_stage = "LOCKED"
+        if data["shortlisted"]:
+            calculated_stage = "LOCKED" if data["locked"] else "SHORTLISTING"
         
         # Update DB if mismatched
         if calculated_stage != db_stage:
-            print(f"DEBUG: Auto-correcting stage from {db_stage} to {calculated_stage}")
+            logger.info("Auto-correcting stage", extra={"user_id": current_user.id, "from_stage": db_stage, "to_stage": calculated_stage})
             try:
                 supabase.table("user_stages").upsert({
                     "user_id": current_user.id,
@@ -63,17 +92,14 @@ async def get_dashboard_data(current_user: dict = Depends(get_current_user)):
                     "updated_at": "now()"
                 }).execute()
             except Exception as e:
-                print(f"DEBUG: Failed to update user_stages: {e}")
+                logger.warning("Failed to update user_stages", extra={"user_id": current_user.id, "error": str(e)})
         
         current_stage = calculated_stage
         
         # Calculate profile strength
         strength = calculate_profile_strength(profile)
         
-        # Get tasks
-        tasks_result = supabase.table("tasks").select("*").eq("user_id", current_user.id).order("created_at", desc=True).execute()
-        
-        tasks = tasks_result.data if tasks_result.data else []
+        tasks = data["tasks"] or []
         
         # If no tasks exist, insert default tasks immediately for performance
         if not tasks:
@@ -108,11 +134,10 @@ async def get_dashboard_data(current_user: dict = Depends(get_current_user)):
             "gpa": profile.get("gpa", 0.0)
         }
         
-        # Get locked universities
-        locked_result = supabase.table("shortlists").select("*, universities(*)").eq("user_id", current_user.id).eq("is_locked", True).execute()
+        # Locked universities
         locked_universities = []
-        if locked_result.data:
-            for item in locked_result.data:
+        if data["locked_universities"]:
+            for item in data["locked_universities"]:
                  uni = item.get("universities", {})
                  locked_universities.append({
                      "id": item["id"],
@@ -2,11 +2,12 @@
 Profile management endpoints
 Handles onboarding data, profile updates, and strength calculation
 """
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, BackgroundTasks
 from app.schemas import ProfileData, ProfileResponse, MessageResponse
 from app.database import supabase
 from app.auth import get_current_user
 from app.profile_calculator import calculate_profile_strength
+from app.recommendation_store import recommendation_store
 from datetime import datetime
 
 router = APIRouter(prefix="/profile", tags=["profile"])
@@ -15,6 +16,7 @@ router = APIRouter(prefix="/profile", tags=["profile"])
 @router.post("/", response_model=MessageResponse, status_code=status.HTTP_201_CREATED)
 async def create_or_update_profile(
     profile_data: ProfileData,
+    background_tasks: BackgroundTasks,
     current_user: dict = Depends(get_current_user)
 ):
     """
@@ -65,6 +67,9 @@ async def create_or_update_profile(
             "updated_at": datetime.utcnow().isoformat()
         }, on_conflict="user_id").execute()
         
+        # Recompute recommendations off the request path
+        background_tasks.add_task(recommendation_store.refresh, current_user.id)
+        
         return MessageResponse(
             message="Profile saved successfully",
             success=True
@@ -136,6 +141,7 @@ async def get_profile_strength(current_user: dict = Depends(get_current_user)):
 @router.put("/")
 async def update_profile(
     profile_data: ProfileData,
+    background_tasks: BackgroundTasks,
     current_user: dict = Depends(get_current_user)
 ):
     """
@@ -150,7 +156,10 @@ async def update_profile(
         
         supabase.table("profiles").update(profile_dict).eq("user_id", current_user.id).execute()
         
-        # TODO: Trigger recommendation recalculation
+        # Recompute recommendations off the request path (incremental when
+        # only some scoring fields changed)
+        background_tasks.add_task(recommendation_store.refresh, current_user.id)
+        
         # TODO: Regenerate tasks if needed
         
         return MessageResponse(
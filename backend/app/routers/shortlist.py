@@ -1,15 +1,22 @@
 """
 Shortlist endpoints - Add, remove, and manage university shortlist
 """
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Query
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import List, Optional
-from app.database import supabase
+from app.database import supabase, sql_enabled
 from app.auth import get_current_user
+from app.projections import university_columns, university_embed
+from app.conditional import shortlist_etag
+from app.versioning import bump_shortlist_version
 from datetime import datetime
 
 router = APIRouter(prefix="/shortlist", tags=["shortlist"])
 
+# Maximum number of locked universities per user (enforced in toggle_shortlist_lock)
+MAX_LOCKED_UNIVERSITIES = 4
+
 
 class AddToShortlistRequest(BaseModel):
     university_id: int
@@ -22,16 +29,31 @@ class UpdateBucketRequest(BaseModel):
     bucket: str
 
 
-@router.get("/")
-async def get_user_shortlist(current_user: dict = Depends(get_current_user)):
+@router.get("/", dependencies=[Depends(shortlist_etag)])
+async def get_user_shortlist(
+    current_user: dict = Depends(get_current_user),
+    projection: str = Query("card", description="University projection: card, detail or full"),
+    fields: Optional[str] = Query(None, description="Comma-separated university columns (overrides projection)")
+):
     """
     Get user's shortlisted universities grouped by bucket
     """
     try:
-        # Get shortlist
-        result = supabase.table("shortlists").select("*, universities(*)").eq("user_id", current_user.id).execute()
-        
-        shortlisted_items = result.data or []
+        # Get shortlist (only the university columns the view needs)
+        stage = None
+        if sql_enabled():
+            from app import sql_queries
+            # Shortlist, universities and stage in one round trip
+            data = await sql_queries.shortlist_data(current_user.id, university_columns(projection, fields))
+            shortlisted_items = data["items"]
+            stage = data["stage"]
+        else:
+            embed = university_embed(projection, fields)
+            result = supabase.table("shortlists")\
+                .select(f"id, university_id, bucket, is_locked, why_fits, risks, created_at, {embed}")\
+                .eq("user_id", current_user.id)\
+                .execute()
+            shortlisted_items = result.data or []
         
         # Group by bucket
         dream = []
@@ -61,15 +83,18 @@ async def get_user_shortlist(current_user: dict = Depends(get_current_user)):
         
         # Check if shortlist is locked (safely)
         is_locked = False
-        try:
-            stage_result = supabase.table("user_stages").select("current_stage").eq("user_id", current_user.id).execute()
-            if stage_result.data and len(stage_result.data) > 0:
-                is_locked = stage_result.data[0].get("current_stage") == "LOCKED"
-        except Exception as stage_err:
-            print(f"Warning: Could not fetch user_stages: {stage_err}")
-            is_locked = False
-        
-        return {
+        if sql_enabled():
+            is_locked = stage == "LOCKED"
+        else:
+            try:
+                stage_result = supabase.table("user_stages").select("current_stage").eq("user_id", current_user.id).execute()
+                if stage_result.data and len(stage_result.data) > 0:
+                    is_locked = stage_result.data[0].get("current_stage") == "LOCKED"
+            except Exception as stage_err:
+                print(f"Warning: Could not fetch user_stages: {stage_err}")
+                is_locked = False
+        
+        return ORJSONResponse({
             "shortlist": {
                 "dream": dream,
                 "target": target,
@@ -82,8 +107,10 @@ async def get_user_shortlist(current_user: dict = Depends(get_current_user)):
                 "total": len(shortlisted_items)
             },
             "is_locked": is_locked
-        }
+        })
         
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -141,6 +168,7 @@ async def add_to_shortlist(
         }
         
         result = supabase.table("shortlists").insert(shortlist_data).execute()
+        bump_shortlist_version(current_user.id)
         
         # Update user stage if first shortlist item
         count_result = supabase.table("shortlists").select("id").eq("user_id", current_user.id).execute()
@@ -193,6 +221,7 @@ async def remove_from_shortlist(
                 detail="Shortlist item not found"
             )
         
+        bump_shortlist_version(current_user.id)
         return {"message": "University removed from shortlist"}
         
     except HTTPException:
@@ -241,6 +270,7 @@ async def update_bucket(
                 detail="Shortlist item not found"
             )
         
+        bump_shortlist_version(current_user.id)
         return {"message": f"University moved to {request.bucket} bucket"}
         
     except HTTPException:
@@ -278,6 +308,7 @@ async def lock_shortlist(current_user: dict = Depends(get_current_user)):
             "current_stage": "LOCKED",
             "updated_at": datetime.utcnow().isoformat()
         }).eq("user_id", current_user.id).execute()
+        bump_shortlist_version(current_user.id)
         
         return {
             "message": "Shortlist locked successfully",
@@ -300,66 +331,30 @@ async def toggle_shortlist_lock(
 ):
     """
     Toggle lock status of a specific shortlist item
-    Enforces limit: 2 Locked items per bucket (Dream, Target, Safe)
+    Enforces limit: Max 4 locked items in total
+
+    The limit check, the update and the guidance tasks run inside the
+    toggle_shortlist_lock Postgres function (one round trip, one transaction)
     """
     try:
-        # Get item
-        result = supabase.table("shortlists").select("*").eq("id", shortlist_id).eq("user_id", current_user.id).single().execute()
-        if not result.data:
+        result = supabase.rpc("toggle_shortlist_lock", {
+            "p_shortlist_id": shortlist_id,
+            "p_user_id": current_user.id,
+            "p_max_locked": MAX_LOCKED_UNIVERSITIES
+        }).execute()
+        
+        outcome = result.data or {}
+        if outcome.get("status") == "not_found":
             raise HTTPException(status_code=404, detail="Item not found")
         
-        item = result.data
-        new_status = not item.get("is_locked", False)
+        if outcome.get("status") == "limit_reached":
+            raise HTTPException(
+                status_code=400, 
+                detail=f"You can only lock a maximum of {MAX_LOCKED_UNIVERSITIES} universities in total."
+            )
         
-        if new_status: # Locking
-            # Check global limit (Max 4 total)
-            locked_count = supabase.table("shortlists").select("id", count="exact")\
-                .eq("user_id", current_user.id)\
-                .eq("is_locked", True)\
-                .execute()
-            
-            count = locked_count.count or 0
-            if count >= 4:
-                raise HTTPException(
-                    status_code=400, 
-                    detail="You can only lock a maximum of 4 universities in total."
-                )
-        
-        # Update
-        supabase.table("shortlists").update({"is_locked": new_status}).eq("id", shortlist_id).execute()
-        
-        # Generate guidance tasks if Locking
-        if new_status:
-            uni_name = item.get("universities", {}).get("name", "University")
-            
-            # Application Tasks
-            tasks = [
-                {
-                    "user_id": current_user.id,
-                    "title": f"Submit Application to {uni_name}",
-                    "description": f"Complete and submit the online application form for {uni_name}. Check deadline!",
-                    "category": "application",
-                    "is_complete": False
-                },
-                {
-                    "user_id": current_user.id,
-                    "title": f"Customize SOP for {uni_name}",
-                    "description": f"Tailor your Statement of Purpose to highlight why you fit {uni_name} specifically.",
-                    "category": "document",
-                    "is_complete": False
-                },
-                {
-                    "user_id": current_user.id,
-                    "title": f"Check Scholarship Deadlines ({uni_name})",
-                    "description": "Research and note down external funding or scholarship deadlines.",
-                    "category": "financial",
-                    "is_complete": False
-                }
-            ]
-            
-            supabase.table("custom_tasks").insert(tasks).execute()
-            
-        return {"message": "Lock status updated", "is_locked": new_status}
+        bump_shortlist_version(current_user.id)
+        return {"message": "Lock status updated", "is_locked": outcome.get("is_locked", False)}
 
     except HTTPException:
         raise
@@ -383,6 +378,7 @@ async def unlock_shortlist(current_user: dict = Depends(get_current_user)):
             "current_stage": "SHORTLISTING",
             "updated_at": datetime.utcnow().isoformat()
         }).eq("user_id", current_user.id).execute()
+        bump_shortlist_version(current_user.id)
         
         return {"message": "Shortlist unlocked successfully"}
         
@@ -9,6 +9,8 @@ import asyncio
 from app.database import supabase
 from app.auth import get_current_user
 from app.email_service import email_service
+from app.projections import university_embed
+from app.versioning import bump_shortlist_version
 
 router = APIRouter(prefix="/shortlist", tags=["shortlist"])
 
@@ -48,7 +50,7 @@ async def lock_shortlist(
     try:
         # Get shortlist item with university details
         shortlist_result = supabase.table("shortlists")\
-            .select("*, universities(*)")\
+            .select(f"*, {university_embed('card')}")\
             .eq("id", request.shortlist_id)\
             .eq("user_id", current_user.id)\
             .execute()
@@ -66,6 +68,7 @@ async def lock_shortlist(
             .update({"is_locked": True})\
             .eq("id", request.shortlist_id)\
             .execute()
+        bump_shortlist_version(current_user.id)
         
         # Get user details for email
         user_email = current_user.email
@@ -123,6 +126,7 @@ async def unlock_shortlist(
             .update({"is_locked": False})\
             .eq("id", shortlist_id)\
             .execute()
+        bump_shortlist_version(current_user.id)
         
         return {"message": "Application unlocked successfully"}
         
@@ -1,9 +1,13 @@
 """
 University endpoints - Discovery, Search, Recommendations
 """
+import logging
+import time
 from fastapi import APIRouter, HTTPException, status, Depends, Query
-from typing import List, Optional
-from app.database import supabase
+from fastapi.responses import ORJSONResponse
+from typing import Optional
+from app.config import get_settings
+from app.database import supabase, sql_enabled
 from app.auth import get_current_user
 from app.recommendation_engine import (
     calculate_match_score,
@@ -12,11 +16,70 @@ from app.recommendation_engine import (
     identify_risks
 )
 from app.ai_service import calculate_ai_match_score
+from app.conditional import catalog_etag, catalog_user_etag
+from app.facets import get_facet_service
+from app.catalog import get_catalog, total_annual_cost, failed_filters
+from app.recommendation_store import recommendation_store
+from app.explanations import explanation_cache, explanation_hash
 
 router = APIRouter(prefix="/universities", tags=["universities"])
+settings = get_settings()
+logger = logging.getLogger(__name__)
 
+# After the search RPC fails, use the catalog index for this long before trying it again
+SEARCH_RPC_RETRY_SECONDS = 300.0
+_search_rpc_retry_at = 0.0
 
-@router.get("/")
+
+def _search_rpc(search: str, filters: dict, offset: int, limit: int) -> Optional[tuple]:
+    """
+    One page of ranked matches and the total from the search_universities_ranked
+    RPC (migrations/add_university_search.sql), which applies every filter
+    and paginates in the database
+
+    None when search_backend is not "database", or for a while after the
+    RPC fails (e.g. before the migration): the catalog index is used instead.
+    """
+    global _search_rpc_retry_at
+    if settings.search_backend != "database" or time.monotonic() < _search_rpc_retry_at:
+        return None
+    try:
+        result = supabase.rpc("search_universities_ranked", {
+            "p_query": search,
+            "p_country": filters["country"],
+            "p_has_scholarships": filters["has_scholarships"],
+            "p_min_gpa": filters["min_gpa"],
+            "p_min_budget": filters["min_budget"],
+            "p_max_budget": filters["max_budget"],
+            "p_field": filters["field"],
+            "p_limit": limit,
+            "p_offset": offset
+        }).execute()
+        found = result.data or {}
+        return found.get("universities") or [], found.get("total") or 0
+    except Exception as e:
+        _search_rpc_retry_at = time.monotonic() + SEARCH_RPC_RETRY_SECONDS
+        logger.warning(
+            "Ranked search RPC failed, using the catalog index for %.0fs: %s", SEARCH_RPC_RETRY_SECONDS, e
+        )
+        return None
+
+
+def _ranked_search(search: str) -> list:
+    """
+    Catalog records matching the search text, most relevant first
+
+    Every match, unfiltered, from the in-memory index of the cached catalog
+    (/universities/facets counts with the same index)
+    """
+    snapshot = get_catalog()
+    return [
+        snapshot.universities[position]
+        for position, _ in snapshot.search_index.search(search, limit=len(snapshot.universities))
+    ]
+
+
+@router.get("/", dependencies=[Depends(catalog_user_etag)])
 async def search_universities(
     country: Optional[str] = None,
     min_budget: Optional[float] = None,
@@ -31,54 +94,37 @@ async def search_universities(
 ):
     """
     Search and filter universities
+
+    With `search`, results are ordered by relevance; otherwise by id
     """
     try:
-        # Start with base query
-        query = supabase.table("universities").select("*")
-        
-        # Apply filters
-        if country:
-            query = query.eq("country", country)
-        
-        if has_scholarships is not None:
-            query = query.eq("has_scholarships", has_scholarships)
-        
-        if min_gpa is not None:
-            query = query.lte("min_gpa", min_gpa)
-        
-        if search:
-            query = query.ilike("name", f"%{search}%")
-        
-        # Execute query
-        result = query.execute()
-        universities = result.data
-        
-        # Apply additional filters (budget and field require post-processing)
-        if min_budget is not None or max_budget is not None:
-            filtered = []
-            for uni in universities:
-                total_cost = (uni.get("tuition_max", 0) or 0) + (uni.get("living_cost_yearly", 0) or 0)
-                if min_budget and total_cost < min_budget:
-                    continue
-                if max_budget and total_cost > max_budget:
-                    continue
-                filtered.append(uni)
-            universities = filtered
-        
-        if field:
-            filtered = []
-            field_lower = field.lower()
-            for uni in universities:
-                programs = uni.get("programs_offered", []) or []
-                if any(field_lower in program.lower() for program in programs):
-                    filtered.append(uni)
-            universities = filtered
-        
-        # Pagination
-        total = len(universities)
+        filters = {
+            "country": country,
+            "min_budget": min_budget,
+            "max_budget": max_budget,
+            "field": field,
+            "has_scholarships": has_scholarships,
+            "min_gpa": min_gpa
+        }
         start = (page - 1) * limit
-        end = start + limit
-        universities = universities[start:end]
+        searching = bool(search and search.strip())
+
+        found = _search_rpc(search, filters, start, limit) if searching else None
+        if found is not None:
+            universities, total = found
+        else:
+            if searching:
+                # Ranked full-text search (name, city, country, programs, description)
+                candidates = _ranked_search(search)
+            else:
+                # The cached catalog in table order: every university, where a
+                # select("*") is cut off at PostgREST's max-rows
+                candidates = get_catalog().universities
+            matches = [uni for uni in candidates if not failed_filters(uni, **filters)]
+
+            # Pagination: only the page is turned into response dicts
+            total = len(matches)
+            universities = [uni.to_dict() for uni in matches[start:start + limit]]
         
         # Enrich with shortlist info
         shortlist_result = supabase.table("shortlists").select("university_id, bucket, is_locked").eq("user_id", current_user.id).execute()
@@ -94,13 +140,13 @@ async def search_universities(
             else:
                 uni["shortlist_info"] = None
         
-        return {
+        return ORJSONResponse({
             "universities": universities,
             "total": total,
             "page": page,
             "limit": limit,
             "total_pages": (total + limit - 1) // limit
-        }
+        })
         
     except Exception as e:
         raise HTTPException(
@@ -109,10 +155,46 @@ async def search_universities(
         )
 
 
+@router.get("/facets", dependencies=[Depends(catalog_etag)])
+async def get_university_facets(
+    country: Optional[str] = None,
+    min_budget: Optional[float] = None,
+    max_budget: Optional[float] = None,
+    field: Optional[str] = None,
+    has_scholarships: Optional[bool] = None,
+    min_gpa: Optional[float] = None,
+    search: Optional[str] = None
+):
+    """
+    Get facet counts for the filter sidebar
+    
+    Counts per country, program, scholarship type, cost band and acceptance
+    band. Each facet respects every active filter except its own.
+    """
+    try:
+        facets = get_facet_service().get_facets(
+            country=country,
+            min_budget=min_budget,
+            max_budget=max_budget,
+            field=field,
+            has_scholarships=has_scholarships,
+            min_gpa=min_gpa,
+            search=search
+        )
+        return ORJSONResponse(facets)
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch facets: {str(e)}"
+        )
+
+
 @router.get("/recommendations")
 async def get_recommendations(
     current_user: dict = Depends(get_current_user),
-    limit: int = Query(20, ge=1, le=50)
+    limit: int = Query(20, ge=1, le=50),
+    lean: bool = False
 ):
     """
     Get AI-powered university recommendations based on user profile
@@ -122,74 +204,74 @@ async def get_recommendations(
     - Category (Dream/Target/Safe)
     - Why it fits
     - Potential risks
+    
+    With lean=true the why_fits / risks prose is omitted; fetch it per card
+    from /universities/{id}/explain.
     """
     try:
-        # Get user profile
-        profile_result = supabase.table("profiles").select("*").eq("user_id", current_user.id).execute()
+        # Get user profile (and, over SQL, the shortlist in the same round trip)
+        if sql_enabled():
+            from app import sql_queries
+            data = await sql_queries.recommendation_data(current_user.id)
+            user_profile = data["profile"]
+            shortlist_rows = data["shortlist"]
+        else:
+            profile_result = supabase.table("profiles").select("*").eq("user_id", current_user.id).execute()
+            user_profile = profile_result.data[0] if profile_result.data else None
+            shortlist_rows = None
         
-        if not profile_result.data:
+        if not user_profile:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Profile not found. Please complete onboarding first."
             )
         
-        user_profile = profile_result.data[0]
+        # Ranked results materialized per (profile, catalog version)
+        snapshot = get_catalog()
+        entry = recommendation_store.get(current_user.id, user_profile)
         
-        # Get all universities
-        universities_result = supabase.table("universities").select("*").execute()
-        universities = universities_result.data
+        # Enrich with shortlist info
+        if shortlist_rows is None:
+            shortlist_result = supabase.table("shortlists").select("university_id, bucket, is_locked").eq("user_id", current_user.id).execute()
+            shortlist_rows = shortlist_result.data or []
+        shortlist_map = {item["university_id"]: item for item in shortlist_rows}
         
-        # Calculate match scores for each university
-        recommendations = []
-        for uni in universities:
-            match_score = calculate_match_score(user_profile, uni)
-            category = categorize_university(
-                match_score, 
-                uni.get("acceptance_rate", 50),
-                uni.get("ranking")
-            )
-            why_fits = generate_why_fits(user_profile, uni, match_score)
-            risks = identify_risks(user_profile, uni)
+        profile_key = None if lean else explanation_hash(user_profile)
+        
+        final_recs = []
+        for university_id, match_score, category in entry.results[:limit]:
+            uni = snapshot.by_id.get(university_id)
+            if uni is None:
+                continue
             
-            recommendations.append({
-                **uni,
+            s_info = shortlist_map.get(university_id)
+            rec = {
+                **uni.to_dict(),
                 "match_score": match_score,
                 "category": category,
-                "why_fits": why_fits,
-                "risks": risks,
-                "total_annual_cost": (uni.get("tuition_max", 0) or 0) + (uni.get("living_cost_yearly", 0) or 0)
-            })
-        
-        # Sort by match score (highest first)
-        recommendations.sort(key=lambda x: x["match_score"], reverse=True)
-        
-        # Enrich with shortlist info
-        shortlist_result = supabase.table("shortlists").select("university_id, bucket, is_locked").eq("user_id", current_user.id).execute()
-        shortlist_map = {item["university_id"]: item for item in (shortlist_result.data or [])}
-        
-        final_recs = []
-        for uni in recommendations[:limit]:
-             s_info = shortlist_map.get(uni["id"])
-             if s_info:
-                 uni["shortlist_info"] = {
-                     "bucket": s_info["bucket"],
-                     "is_locked": s_info["is_locked"]
-                 }
-             else:
-                 uni["shortlist_info"] = None
-             final_recs.append(uni)
+                "total_annual_cost": total_annual_cost(uni),
+                "shortlist_info": {
+                    "bucket": s_info["bucket"],
+                    "is_locked": s_info["is_locked"]
+                } if s_info else None
+            }
+            if not lean:
+                explanation = explanation_cache.get(user_profile, uni, snapshot.version, profile_key)
+                rec["why_fits"] = explanation["why_fits"]["text"]
+                rec["risks"] = explanation["risks"]["text"]
+            final_recs.append(rec)
 
-        # Return top matches
-        return {
+        # Return top matches (plain JSON-native dicts, so skip jsonable_encoder)
+        return ORJSONResponse({
             "recommendations": final_recs,
-            "total": len(recommendations),
+            "total": entry.total,
             "user_profile_summary": {
                 "gpa": user_profile.get("gpa"),
                 "budget_max": user_profile.get("budget_max"),
                 "preferred_countries": user_profile.get("preferred_countries"),
                 "field_of_study": user_profile.get("field_of_study")
             }
-        }
+        })
         
     except HTTPException:
         raise
@@ -200,7 +282,7 @@ async def get_recommendations(
         )
 
 
-@router.get("/{university_id}")
+@router.get("/{university_id}", dependencies=[Depends(catalog_etag)])
 async def get_university_details(university_id: int):
     """
     Get detailed information about a specific university
@@ -231,6 +313,61 @@ async def get_university_details(university_id: int):
         )
 
 
+@router.get("/{university_id}/explain")
+async def explain_university(
+    university_id: int,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Explain why a university fits the user and what the risks are
+    
+    Returns reason codes with their parameters alongside the rendered
+    sentences, memoized per profile and catalog version.
+    """
+    try:
+        profile_result = supabase.table("profiles").select("*").eq("user_id", current_user.id).execute()
+        
+        if not profile_result.data:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Profile not found"
+            )
+        
+        user_profile = profile_result.data[0]
+        
+        snapshot = get_catalog()
+        university = snapshot.by_id.get(university_id)
+        if university is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="University not found"
+            )
+        
+        match_score = calculate_match_score(user_profile, university)
+        category = categorize_university(
+            match_score,
+            university.get("acceptance_rate", 50),
+            university.get("ranking")
+        )
+        explanation = explanation_cache.get(user_profile, university, snapshot.version)
+        
+        return ORJSONResponse({
+            "university_id": university_id,
+            "match_score": match_score,
+            "category": category,
+            "why_fits": explanation["why_fits"],
+            "risks": explanation["risks"]
+        })
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to explain university: {str(e)}"
+        )
+
+
 @router.get("/{university_id}/match")
 async def get_match_analysis(
     university_id: int,
@@ -315,27 +452,17 @@ async def get_match_analysis(
         )
 
 
-@router.get("/countries/list")
+@router.get("/countries/list", dependencies=[Depends(catalog_etag)])
 async def get_available_countries():
     """
     Get list of all countries with universities in database
     """
     try:
-        result = supabase.table("universities").select("country").execute()
-        
-        countries = list(set(uni["country"] for uni in result.data if uni.get("country")))
-        countries.sort()
-        
-        # Count universities per country
-        country_counts = {}
-        for uni in result.data:
-            country = uni.get("country")
-            if country:
-                country_counts[country] = country_counts.get(country, 0) + 1
-        
+        # Served from the precomputed country facet
+        facets = get_facet_service().get_facets()
         country_list = [
-            {"country": country, "university_count": country_counts[country]}
-            for country in countries
+            {"country": item["value"], "university_count": item["count"]}
+            for item in facets["facets"]["country"]
         ]
         
         return {"countries": country_list}
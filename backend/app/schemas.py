@@ -162,9 +162,14 @@ class UniversityResponse(BaseModel):
     living_cost_yearly: float
     acceptance_rate: Optional[float]
     description: Optional[str]
-    why_fits: Optional[str]  # AI-generated
-    risks: Optional[str]  # AI-generated
-    bucket: Optional[str]  # Dream, Target, Safe
+    why_fits: Optional[str] = None  # AI-generated
+    risks: Optional[str] = None  # AI-generated
+    bucket: Optional[str] = None  # Dream, Target, Safe
+
+
+class UniversityImport(UniversityResponse):
+    """University row accepted by the catalog import (ids are assigned by the target database)"""
+    id: Optional[int] = None
 
 
 class ShortlistRequest(BaseModel):
@@ -0,0 +1,232 @@
+"""
+Batch scoring with numpy
+score_matrix scores many profiles against the whole catalog at once, for
+bulk jobs and benchmarks. Kept apart from recommendation_engine
+so request handling never imports numpy.
+"""
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterator, Sequence, Tuple
+import numpy as np
+from app.recommendation_engine import _FIELD_CACHE_LIMIT, extract_keywords
+from app.scoring_rules import CompiledRules, get_rules
+
+# Category codes used in score_matrix results
+CATEGORY_LABELS = ("Dream", "Target", "Safe")
+
+# Fixed-width columns copied into shared memory by _CatalogArrays.to_shared
+SHARED_COLUMNS = (
+    "ids", "min_gpa", "has_cost", "total_cost", "has_scholarships",
+    "min_ielts", "acceptance_rate", "country_ids", "program_ids"
+)
+
+
+def _float_column(rows: Sequence[Dict[str, Any]], key: str, default: float = np.nan) -> np.ndarray:
+    """Column as float64; missing, None and other falsy values become default"""
+    return np.array([row.get(key) or default for row in rows], dtype=np.float64)
+
+
+class _CatalogArrays:
+    """Struct-of-arrays view of the catalog used by score_matrix"""
+
+    def __init__(self, catalog: Sequence[Dict[str, Any]]):
+        self.size = len(catalog)
+        self.ids = np.array([-1 if u.get("id") is None else u["id"] for u in catalog], dtype=np.int64)
+        self.min_gpa = _float_column(catalog, "min_gpa")
+        tuition = _float_column(catalog, "tuition_max")
+        living = _float_column(catalog, "living_cost_yearly")
+        self.has_cost = ~np.isnan(tuition) & ~np.isnan(living)
+        self.total_cost = tuition + living
+        self.has_scholarships = np.array([bool(u.get("has_scholarships")) for u in catalog])
+        self.min_ielts = _float_column(catalog, "min_ielts")
+
+        # categorize_university gets acceptance_rate with a default of 50
+        self.acceptance_rate = np.array(
+            [50.0 if u.get("acceptance_rate") is None else u["acceptance_rate"] for u in catalog],
+            dtype=np.float64
+        )
+
+        self.countries = {}
+        self.country_ids = np.array(
+            [self.countries.setdefault(u.get("country"), len(self.countries)) for u in catalog],
+            dtype=np.int32
+        )
+
+        # Padded program-id matrix; id 0 is padding and never matches
+        self.programs = {}
+        program_lists = [u.get("programs_offered") or [] for u in catalog]
+        width = max((len(p) for p in program_lists), default=0) or 1
+        self.program_ids = np.zeros((self.size, width), dtype=np.int32)
+        for row, programs in enumerate(program_lists):
+            for col, program in enumerate(programs):
+                self.program_ids[row, col] = self.programs.setdefault(program.lower(), len(self.programs) + 1)
+        self._set_program_names()
+
+    def _set_program_names(self) -> None:
+        self.program_names = [""] * (len(self.programs) + 1)
+        for name, pid in self.programs.items():
+            self.program_names[pid] = name
+        self._field_scores: Dict[tuple, np.ndarray] = {}
+
+    def to_shared(self) -> Tuple[shared_memory.SharedMemory, Dict[str, Any]]:
+        """
+        Copy the numeric columns into one shared memory block
+
+        Returns the block (the caller closes and unlinks it) and the small,
+        picklable layout that attach() needs to map the columns in another
+        process without copying them.
+        """
+        columns = []
+        offset = 0
+        for name in SHARED_COLUMNS:
+            array = getattr(self, name)
+            columns.append((name, array.dtype.str, array.shape, offset))
+            offset += -(-array.nbytes // 8) * 8  # Keep every column 8-byte aligned
+        block = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for name, dtype, shape, start in columns:
+            np.ndarray(shape, dtype=dtype, buffer=block.buf, offset=start)[...] = getattr(self, name)
+        layout = {"size": self.size, "countries": self.countries, "programs": self.programs, "columns": columns}
+        return block, layout
+
+    @classmethod
+    def attach(cls, block: shared_memory.SharedMemory, layout: Dict[str, Any]) -> "_CatalogArrays":
+        """Read-only arrays over a block made by to_shared; keep the block open while they are used"""
+        cat = cls.__new__(cls)
+        cat.size = layout["size"]
+        cat.countries = layout["countries"]
+        cat.programs = layout["programs"]
+        for name, dtype, shape, start in layout["columns"]:
+            array = np.ndarray(shape, dtype=dtype, buffer=block.buf, offset=start)
+            array.flags.writeable = False
+            setattr(cat, name, array)
+        cat._set_program_names()
+        return cat
+
+    def field_scores(self, user_field: str, rules: CompiledRules) -> np.ndarray:
+        """score_field for one field of study against every university"""
+        key = (user_field, rules.fingerprint)
+        cached = self._field_scores.get(key)
+        if cached is not None:
+            return cached
+
+        keywords = extract_keywords(user_field)
+        is_direct = np.zeros(len(self.program_names), dtype=bool)
+        is_related = np.zeros(len(self.program_names), dtype=bool)
+        for pid in range(1, len(self.program_names)):
+            program = self.program_names[pid]
+            if user_field in program or program in user_field:
+                is_direct[pid] = True
+            elif any(keyword in program for keyword in keywords):
+                is_related[pid] = True
+        # A direct match anywhere beats any related match
+        scores = np.where(is_direct[self.program_ids].any(axis=1), rules.field_direct,
+                 np.where(is_related[self.program_ids].any(axis=1), rules.field_related, 0)).astype(np.int16)
+
+        if len(self._field_scores) >= _FIELD_CACHE_LIMIT:
+            self._field_scores.clear()
+        self._field_scores[key] = scores
+        return scores
+
+
+def _tiered(passes, tiers) -> np.ndarray:
+    """Points of the first passing tier; passes(threshold) returns a boolean array"""
+    result = 0
+    for threshold, points in reversed(tiers):
+        result = np.where(passes(threshold), points, result)
+    return np.asarray(result, dtype=np.int16)
+
+
+def _score_chunk(
+    profiles: Sequence[Dict[str, Any]],
+    cat: _CatalogArrays,
+    rules: CompiledRules
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Scores and category codes for a block of profiles (rows) x catalog (columns)"""
+    m = len(profiles)
+
+    # 1. GPA
+    gpa = _float_column(profiles, "gpa")[:, None]
+    gap = cat.min_gpa[None, :] - gpa
+    has_gpa = ~np.isnan(gap)
+    score = np.where(has_gpa, _tiered(lambda max_gap: gap <= max_gap, rules.gpa_tiers), 0).astype(np.int16)
+
+    # 2. Budget, with the scholarship bonus when over budget
+    budget = _float_column(profiles, "budget_max", 0.0)[:, None]
+    total = cat.total_cost[None, :]
+    budget_points = _tiered(lambda min_ratio: budget >= total * min_ratio, rules.budget_tiers)
+    budget_points = budget_points + np.where(cat.has_scholarships[None, :] & (budget < total), rules.scholarship_bonus, 0)
+    score += np.where(cat.has_cost[None, :], budget_points, 0).astype(np.int16)
+
+    # 3. Country preference
+    preferred = np.zeros((m, len(cat.countries)), dtype=bool)
+    for row, profile in enumerate(profiles):
+        for country in profile.get("preferred_countries") or []:
+            cid = cat.countries.get(country)
+            if cid is not None:
+                preferred[row, cid] = True
+    score += preferred[:, cat.country_ids].astype(np.int16) * rules.country_points
+
+    # 4. Field alignment
+    for row, profile in enumerate(profiles):
+        score[row] += cat.field_scores((profile.get("field_of_study") or "").lower(), rules)
+
+    # 5. English proficiency
+    ielts = np.array([
+        (p.get("ielts_toefl_score") or np.nan) if p.get("ielts_toefl_status") == "Completed" else np.nan
+        for p in profiles
+    ], dtype=np.float64)[:, None]
+    required = cat.min_ielts[None, :]
+    has_ielts = ~np.isnan(ielts) & ~np.isnan(required)
+    english = _tiered(lambda max_shortfall: ielts >= required - max_shortfall, rules.english_tiers)
+    score += np.where(has_ielts, english, 0).astype(np.int16)
+
+    score = np.minimum(score, rules.max_score).astype(np.int8)
+
+    # Categories (codes index CATEGORY_LABELS), same rules as categorize_university
+    rate = cat.acceptance_rate[None, :]
+    dream, target, safe = 0, 1, 2
+    category = np.where(rate < rules.dream_below, dream,
+               np.where(rate < rules.selective_below, np.where(score >= rules.selective_target_score, target, dream),
+               np.where(rate < rules.moderate_below, np.where(score >= rules.moderate_safe_score, safe, target),
+               np.where(score >= rules.accessible_safe_score, safe, target)))).astype(np.int8)
+
+    return score, category
+
+
+def iter_score_matrix(
+    profiles: Sequence[Dict[str, Any]],
+    catalog: Sequence[Dict[str, Any]],
+    chunk_size: int = 256
+) -> Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+    """
+    Score profiles against the catalog chunk by chunk
+
+    Yields (first row index, scores, category codes) per chunk of at most
+    chunk_size profiles, so callers can stream results with bounded memory
+    """
+    cat = _CatalogArrays(catalog)
+    rules = get_rules()
+    for start in range(0, len(profiles), chunk_size):
+        scores, categories = _score_chunk(profiles[start:start + chunk_size], cat, rules)
+        yield start, scores, categories
+
+
+def score_matrix(
+    profiles: Sequence[Dict[str, Any]],
+    catalog: Sequence[Dict[str, Any]],
+    chunk_size: int = 256
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Score M profiles against N universities at once
+    
+    Same results as calculate_match_score / categorize_university for every
+    pair (missing or null acceptance rates count as 50).
+    
+    Returns:
+        (M x N int8 match scores, M x N int8 category codes into CATEGORY_LABELS)
+    """
+    scores = np.zeros((len(profiles), len(catalog)), dtype=np.int8)
+    categories = np.zeros((len(profiles), len(catalog)), dtype=np.int8)
+    for start, chunk_scores, chunk_categories in iter_score_matrix(profiles, catalog, chunk_size):
+        scores[start:start + len(chunk_scores)] = chunk_scores
+        categories[start:start + len(chunk_categories)] = chunk_categories
+    return scores, categories
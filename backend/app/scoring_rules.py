@@ -0,0 +1,157 @@
+"""
+Declarative scoring rules for the recommendation engine
+Rules are a pydantic model (optionally loaded from YAML/JSON) compiled into
+plain tuples at load time, and hot-reloaded when the rules file changes
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional
+from pydantic import BaseModel, Field, model_validator
+import yaml
+from app.config import get_settings
+
+settings = get_settings()
+
+
+class TieredRule(BaseModel):
+    """Points awarded by the first tier whose threshold passes"""
+    points: List[int]
+    thresholds: List[float]
+
+    @model_validator(mode="after")
+    def check_lengths(self):
+        if len(self.points) != len(self.thresholds):
+            raise ValueError("points and thresholds must have the same length")
+        return self
+
+
+class BudgetRule(TieredRule):
+    # thresholds: minimum budget / total cost ratio per tier
+    scholarship_bonus: int = 5
+
+
+class FieldRule(BaseModel):
+    direct_points: int = 20
+    related_points: int = 10
+
+
+class CategoryRule(BaseModel):
+    """Acceptance-rate cut-offs and the match scores that move a university up a bucket"""
+    dream_below: float = 15  # Always Dream under this acceptance rate
+    selective_below: float = 30  # Dream, or Target at selective_target_score
+    moderate_below: float = 50  # Target, or Safe at moderate_safe_score
+    selective_target_score: int = 75
+    moderate_safe_score: int = 80
+    accessible_safe_score: int = 70
+
+
+class ScoringRules(BaseModel):
+    """Default values reproduce the original hard-coded engine exactly"""
+    # thresholds: maximum GPA gap below the minimum (0 means at or above it)
+    gpa: TieredRule = Field(default_factory=lambda: TieredRule(points=[20, 10, 5], thresholds=[0.0, 0.3, 0.5]))
+    budget: BudgetRule = Field(default_factory=lambda: BudgetRule(points=[25, 20, 10], thresholds=[1.0, 0.8, 0.6]))
+    country_points: int = 15
+    field: FieldRule = Field(default_factory=FieldRule)
+    # thresholds: how far below the university minimum the score may be
+    english: TieredRule = Field(default_factory=lambda: TieredRule(points=[15, 10, 5], thresholds=[0.0, 0.5, 1.0]))
+    max_score: int = 100
+    category: CategoryRule = Field(default_factory=CategoryRule)
+
+
+class CompiledRules:
+    """Flattened thresholds read by the scoring functions"""
+
+    def __init__(self, rules: ScoringRules):
+        self.rules = rules
+        self.gpa_tiers = tuple(zip(rules.gpa.thresholds, rules.gpa.points))
+        self.budget_tiers = tuple(zip(rules.budget.thresholds, rules.budget.points))
+        self.scholarship_bonus = rules.budget.scholarship_bonus
+        self.country_points = rules.country_points
+        self.field_direct = rules.field.direct_points
+        self.field_related = rules.field.related_points
+        self.english_tiers = tuple(zip(rules.english.thresholds, rules.english.points))
+        self.max_score = rules.max_score
+        c = rules.category
+        self.dream_below = c.dream_below
+        self.selective_below = c.selective_below
+        self.moderate_below = c.moderate_below
+        self.selective_target_score = c.selective_target_score
+        self.moderate_safe_score = c.moderate_safe_score
+        self.accessible_safe_score = c.accessible_safe_score
+        self.fingerprint = hashlib.sha1(
+            json.dumps(rules.model_dump(), sort_keys=True).encode()
+        ).hexdigest()[:12]
+
+
+def load_rules(path: Optional[str]) -> ScoringRules:
+    """Read rules from a YAML or JSON file; built-in defaults if there is none"""
+    if not path or not os.path.exists(path):
+        return ScoringRules()
+    text = Path(path).read_text()
+    data = json.loads(text) if path.endswith(".json") else yaml.safe_load(text)
+    return ScoringRules(**(data or {}))
+
+
+class _RulesHolder:
+    """Current compiled rules, re-checked against the rules file periodically"""
+
+    def __init__(self, path: Optional[str], check_seconds: float):
+        self.path = path
+        self.check_seconds = check_seconds
+        self._lock = threading.Lock()
+        self._mtime = self._file_mtime()
+        self.compiled = CompiledRules(load_rules(path))
+        self._checked_at = time.monotonic()
+
+    def _file_mtime(self) -> Optional[float]:
+        try:
+            return os.path.getmtime(self.path) if self.path else None
+        except OSError:
+            return None
+
+    def get(self) -> CompiledRules:
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_seconds:
+            self._checked_at = now
+            if self._file_mtime() != self._mtime:
+                self.reload()
+        return self.compiled
+
+    def reload(self) -> CompiledRules:
+        """Recompile from the rules file; keeps the old rules if the file is invalid"""
+        with self._lock:
+            self._mtime = self._file_mtime()
+            try:
+                self.compiled = CompiledRules(load_rules(self.path))
+                print(f"Scoring rules loaded (fingerprint {self.compiled.fingerprint})")
+            except Exception as e:
+                print(f"Warning: Invalid scoring rules in {self.path}, keeping previous rules: {e}")
+            return self.compiled
+
+    def set(self, rules: ScoringRules) -> CompiledRules:
+        """Install rules directly (e.g. from an admin tool or a benchmark)"""
+        with self._lock:
+            self.compiled = CompiledRules(rules)
+            return self.compiled
+
+
+_holder = _RulesHolder(settings.scoring_rules_path, settings.scoring_rules_check_seconds)
+
+
+def get_rules() -> CompiledRules:
+    """Current compiled scoring rules (hot-reloaded from the rules file)"""
+    return _holder.get()
+
+
+def reload_rules() -> CompiledRules:
+    """Force a reload of the rules file"""
+    return _holder.reload()
+
+
+def set_rules(rules: ScoringRules) -> CompiledRules:
+    """Replace the active rules in this process"""
+    return _holder.set(rules)
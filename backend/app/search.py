@@ -0,0 +1,181 @@
+"""
+In-memory ranked university search
+Used by search_universities when search_backend = "catalog" (the default),
+and as the fallback when the search_universities_ranked RPC is unavailable. Built once
+per catalog snapshot (CatalogSnapshot.search_index).
+
+Mirrors the database search (migrations/add_university_search.sql):
+- name, city / country / programs and description are weighted like the
+  tsvector's A / B / D weights
+- every query word must match; a word also matches as a prefix ("stanf")
+  and, failing that, by trigram similarity ("stanfrod")
+- results are ordered by relevance, then ranking, then id
+
+Lookups go through an inverted index and a trigram index over the
+vocabulary, so query time depends on the number of matches rather than
+the catalog size.
+"""
+import heapq
+import math
+import re
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Postgres ts_rank default weights for A, B and D
+NAME_WEIGHT = 1.0
+FIELD_WEIGHT = 0.4
+DESCRIPTION_WEIGHT = 0.1
+
+PREFIX_FACTOR = 0.8  # A prefix match counts a little less than the whole word
+MAX_PREFIX_TERMS = 50
+SIMILARITY_THRESHOLD = 0.3  # Trigram similarity for typo matches, as pg_trgm's default
+MAX_FUZZY_TERMS = 5
+NAME_MATCH_BONUS = 0.5  # Whole query found in the name
+MAX_RESULTS = 1000
+
+STOP_WORDS = frozenset({"a", "an", "and", "at", "de", "for", "in", "of", "on", "the", "to"})
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def normalize(text: Optional[str]) -> str:
+    """Lower-case and strip accents ("Zürich" -> "zurich")"""
+    if not text:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def stem(word: str) -> str:
+    """Light English plural stripping, enough for program and place names"""
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return [stem(word) for word in _WORD.findall(normalize(text)) if word not in STOP_WORDS]
+
+
+def trigrams(word: str) -> Set[str]:
+    """pg_trgm-style trigrams: the word padded with two spaces in front and one behind"""
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    """Inverted index over a list of universities (compact records or dicts)"""
+
+    def __init__(self, universities: Iterable):
+        self.universities = list(universities)
+        postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        self.names: List[str] = []
+
+        for position, uni in enumerate(self.universities):
+            fields = [
+                (uni.get("name"), NAME_WEIGHT),
+                (uni.get("city"), FIELD_WEIGHT),
+                (uni.get("country"), FIELD_WEIGHT),
+                (" ".join(uni.get("programs_offered") or ()), FIELD_WEIGHT),
+                (uni.get("description"), DESCRIPTION_WEIGHT),
+            ]
+            for text, weight in fields:
+                for term in tokenize(text):
+                    # A term scores by its best field, like a weighted tsvector position
+                    if postings[term].get(position, 0.0) < weight:
+                        postings[term][position] = weight
+            self.names.append(normalize(uni.get("name")))
+
+        self.postings = dict(postings)
+        self.terms = sorted(self.postings)
+        count = len(self.universities)
+        self.idf = {term: math.log(1 + count / len(docs)) for term, docs in self.postings.items()}
+        self._trigrams: Dict[str, List[str]] = defaultdict(list)
+        for term in self.terms:
+            for gram in trigrams(term):
+                self._trigrams[gram].append(term)
+        # Tie-break order (ranking, then id) as one integer per position
+        by_ranking = sorted(
+            range(count),
+            key=lambda i: (self.universities[i].get("ranking") is None, self.universities[i].get("ranking") or 0,
+                           self.universities[i].get("id"))
+        )
+        self._tie_break = [0] * count
+        for order, position in enumerate(by_ranking):
+            self._tie_break[position] = order
+
+    def _expand(self, word: str) -> List[Tuple[str, float]]:
+        """(index term, match factor) pairs a query word matches"""
+        matches = []
+        if word in self.postings:
+            matches.append((word, 1.0))
+        # Prefix matches: type-ahead and unstemmed forms ("engineer" -> "engineering")
+        start = bisect_left(self.terms, word)
+        for term in self.terms[start:start + MAX_PREFIX_TERMS]:
+            if not term.startswith(word):
+                break
+            if term != word:
+                matches.append((term, PREFIX_FACTOR))
+        if matches or len(word) < 3:
+            return matches
+
+        # Typos: vocabulary terms sharing enough trigrams
+        grams = trigrams(word)
+        shared: Dict[str, int] = defaultdict(int)
+        for gram in grams:
+            for term in self._trigrams.get(gram, ()):
+                shared[term] += 1
+        similar = []
+        for term, common in shared.items():
+            similarity = common / (len(grams) + len(trigrams(term)) - common)
+            if similarity >= SIMILARITY_THRESHOLD:
+                similar.append((similarity, term))
+        similar.sort(reverse=True)
+        return [(term, similarity) for similarity, term in similar[:MAX_FUZZY_TERMS]]
+
+    def search(self, query: str, limit: int = MAX_RESULTS) -> List[Tuple[int, float]]:
+        """
+        Positions of the universities matching every query word, best first
+
+        Returns:
+            [(position in self.universities, score)], at most `limit`
+        """
+        words = list(dict.fromkeys(tokenize(query)))
+        if not words:
+            return []
+
+        scores: Optional[Dict[int, float]] = None
+        # Rarest word first, so the candidate set shrinks fastest
+        expanded = sorted((self._expand(word) for word in words), key=lambda terms: sum(len(self.postings[t]) for t, _ in terms))
+        for terms in expanded:
+            word_scores: Dict[int, float] = {}
+            for term, factor in terms:
+                idf = self.idf[term]
+                postings = self.postings[term]
+                if scores is not None and len(scores) < len(postings):
+                    # Walk the (smaller) candidate set instead of a common word's postings
+                    postings = {position: postings[position] for position in scores if position in postings}
+                for position, weight in postings.items():
+                    if scores is not None and position not in scores:
+                        continue
+                    score = weight * factor * idf
+                    if score > word_scores.get(position, 0.0):
+                        word_scores[position] = score
+            if scores is None:
+                scores = word_scores
+            else:
+                scores = {position: scores[position] + score for position, score in word_scores.items()}
+            if not scores:
+                return []
+
+        phrase = normalize(query).strip()
+        if phrase:
+            for position in scores:
+                if phrase in self.names[position]:
+                    scores[position] += NAME_MATCH_BONUS
+
+        tie_break = self._tie_break
+        return heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], tie_break[item[0]]))
@@ -1,710 +1,226 @@
 """
 University database seeding script
-Populates the universities table with realistic data including scholarships
+Bulk-upserts universities from a JSON, NDJSON or CSV file on the natural
+(name, country) key, so re-running it updates rows instead of duplicating them.
+
+Every upsert statement bumps catalog_meta.version through the
+universities_bump_catalog_version trigger, so cached catalog reads
+invalidate on their own.
+
+Usage:
+    python -m app.seed_universities                                  # data/universities.json
+    python -m app.seed_universities --file universities.ndjson --batch-size 1000
+    python -m app.seed_universities --synthetic 100000               # app.synthetic rows
 """
+import argparse
+import csv
+import gzip
+import json
 import os
-from supabase import create_client, Client
+import time
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Optional
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-# Initialize Supabase client directly
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-
-if not SUPABASE_URL or not SUPABASE_KEY:
-    raise ValueError("SUPABASE_URL and SUPABASE_KEY must be set in .env file")
-
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-
-# Realistic university data with scholarships
-UNIVERSITIES = [
-    # USA - Top Universities
-    {
-        "name": "Massachusetts Institute of Technology (MIT)",
-        "country": "USA",
-        "city": "Cambridge, MA",
-        "ranking": 1,
-        "programs_offered": ["Computer Science", "Engineering", "Data Science", "AI/ML", "Business Analytics", "Mathematics", "Physics"],
-        "min_gpa": 3.8,
-        "min_ielts": 7.5,
-        "min_toefl": 110,
-        "requires_gre": True,
-        "requires_gmat": False,
-        "tuition_min": 53000,
-        "tuition_max": 55000,
-        "living_cost_yearly": 20000,
-        "has_scholarships": True,
-        "scholarship_types": ["Merit-based", "Need-based", "Research Assistantship"],
-        "scholarship_amount_min": 10000,
-        "scholarship_amount_max": 75000,
-        "scholarship_deadline": "December 15",
-        "acceptance_rate": 3.9,
-        "description": "Leading technology research university known for innovation and cutting-edge research in STEM fields."
-    },
-    {
-        "name": "Stanford University",
-        "country": "USA",
-        "city": "Stanford, CA",
-        "ranking": 2,
-        "programs_offered": ["Computer Science", "Engineering", "Business", "Data Science", "AI/ML", "Design", "Medicine"],
-        "min_gpa": 3.7,
-        "min_ielts": 7.0,
-        "min_toefl": 105,
-        "requires_gre": True,
-        "requires_gmat": False,
-        "tuition_min": 52000,
-        "tuition_max": 55000,
-        "living_cost_yearly": 22000,
-        "has_scholarships": True,
-        "scholarship_types": ["Merit-based", "Need-based", "Knight-Hennessy Scholars"],
-        "scholarship_amount_min": 15000,
-        "scholarship_amount_max": 77000,
-        "scholarship_deadline": "December 1",
-        "acceptance_rate": 3.7,
-        "description": "Premier private research university in Silicon Valley, fostering entrepreneurship and innovation."
-    },
-    {
-        "name": "Harvard University",
-        "country": "USA",
-        "city": "Cambridge, MA",
-        "ranking": 3,
-        "programs_offered": ["Business", "Law", "Engineering", "Medicine", "Data Science", "Public Policy", "Economics"],
-        "min_gpa": 3.8,
-        "min_ielts": 7.5,
-        "min_toefl": 110,
-        "requires_gre": True,
-        "requires_gmat": True,
-        "tuition_min": 51000,
-        "tuition_max": 54000,
-        "living_cost_yearly": 21000,
-        "has_scholarships": True,
-        "scholarship_types": ["Need-based", "Merit-based", "Fellowship"],
-        "scholarship_amount_min": 12000,
-        "scholarship_amount_max": 75000,
-        "scholarship_deadline": "December 15",
-        "acceptance_rate": 3.4,
-        "description": "Oldest and one of the most prestigious universities in the United States with a global reputation."
-    },
-    {
-        "name": "University of California, Berkeley",
-        "country": "USA",
-        "city": "Berkeley, CA",
-        "ranking": 10,
-        "programs_offered": ["Computer Science", "Engineering", "Data Science", "Business", "Environmental Science", "Public Health"],
-        "min_gpa": 3.5,
-        "min_ielts": 6.5,
-        "min_toefl": 90,
-        "requires_gre": True,
-        "requires_gmat": False,
-        "tuition_min": 28000,
-        "tuition_max": 30000,
-        "living_cost_yearly": 18000,
-        "has_scholarships": True,
-        "scholarship_types": ["Merit-based", "Teaching Assistantship", "Research Assistantship"],
-        "scholarship_amount_min": 8000,
-        "scholarship_amount_max": 48000,
-        "scholarship_deadline": "January 15",
-        "acceptance_rate": 14.3,
-        "description": "Top public research university known for academic excellence and social activism."
-    },
-    {
-        "name": "Carnegie Mellon University",
-        "country": "USA",
-        "city": "Pittsburgh, PA",
-        "ranking": 15,
-        "programs_offered": ["Computer Science", "AI/ML", "Robotics", "Engineering", "Data Science", "Information Systems"],
-        "min_gpa": 3.6,
-        "min_ielts": 7.0,
-        "min_toefl": 100,
-        "requires_gre": True,
-        "requires_gmat": False,
-        "tuition_min": 48000,
-        "tuition_max": 52000,
-        "living_cost_yearly": 17000,
-        "has_scholarships": True,
-        "scholarship_types": ["Merit-based", "Research Assistantship", "Industry Sponsored"],
-        "scholarship_amount_min": 10000,
-        "scholarship_amount_max": 52000,
-        "scholarship_deadline": "January 5",
-        "acceptance_rate": 15.4,
-        "description": "World leader in computer science, AI, and robotics education and research."
-    },
-    {
-        "name": "University of Michigan - Ann Arbor",
-        "country": "USA",
-        "city": "Ann Arbor, MI",
-        "ranking": 18,
-        "programs_offered": ["Engineering", "Business", "Computer Science", "Data Science", "Public Health", "Law"],
-        "min_gpa": 3.4,
-        "min_ielts": 6.5,
-        "min_toefl": 90,
-        "requires_gre": True,
-        "requires_gmat": False,
-        "tuition_min": 25000,
-        "tuition_max": 28000,
-        "living_cost_yearly": 16000,
-        "has_scholarships": True,
-        "scholarship_types": ["Merit-based", "Need-based", "Graduate Assistantship"],
-        "scholarship_amount_min": 7000,
-        "scholarship_amount_max": 44000,
-        "scholarship_deadline": "January 31",
-        "acceptance_rate": 20.2,
-        "description": "Leading public research university with strong programs across all disciplines."
-    },
-    {
-        "name": "New York University (NYU)",
-        "country": "USA",
-        "city": "New York, NY",
-        "ranking": 25,
-        "programs_offered": ["Business", "Finance", "Data Science", "Computer Science", "Arts", "Law", "Medicine"],
-        "min_gpa": 3.3,
-        "min_ielts": 7.0,
-        "min_toefl": 95,
-        "requires_gre": True,
-        "requires_gmat": True,
-        "tuition_min": 45000,
-        "tuition_max": 50000,
-        "living_cost_yearly": 25000,
-        "has_scholarships": True,
-        "scholarship_types": ["Merit-based", "International Student Scholarship"],
-        "scholarship_amount_min": 8000,
-        "scholarship_amount_max": 40000,
-        "scholarship_deadline": "January 15",
-        "acceptance_rate": 12.8,
-        "description": "Major private university in the heart of New York City with global campuses."
-    },
-    {
-        "name": "University of Southern California (USC)",
-        "country": "USA",
-        "city": "Los Angeles, CA",
-        "ranking": 27,
-        "programs_offered": ["Computer Science", "Engineering", "Business", "Film", "Data Science", "Gaming"],
-        "min_gpa": 3.3,
-        "min_ielts": 6.5,
-        "min_toefl": 90,
-        "requires_gre": True,
-        "requires_gmat": False,
-        "tuition_min": 43000,
-        "tuition_max": 47000,
-        "living_cost_yearly": 20000,
-        "has_scholarships": True,
-        "scholarship_types": ["Merit-based", "Trustee Scholarship", "Presidential Scholarship"],
-        "scholarship_amount_min": 10000,
-        "scholarship_amount_max": 47000,
-        "scholarship_deadline": "December 1",
-        "acceptance_rate": 11.4,
-        "description": "Leading private research university with strong industry connections in Southern California."
-    },
-    
-    # UK - Top Universities
-    {
-        "name": "University of Oxford",
-        "country": "UK",
-        "city": "Oxford",
-        "ranking": 4,
-        "programs_offered": ["Engineering", "Computer Science", "Business", "Law", "Medicine", "Mathematics", "Philosophy"],
-        "min_gpa": 3.7,
-        "min_ielts": 7.5,
-        "min_toefl": 110,
-        "requires_gre": False,
-        "requires_gmat": False,
-        "tuition_min": 28000,
-        "tuition_max": 35000,
-        "living_cost_yearly": 15000,
-        "has_scholarships": True,
-        "scholarship_types": ["Rhodes Scholarship", "Clarendon Fund", "Merit-based"],
-        "scholarship_amount_min": 15000,
-        "scholarship_amount_max": 50000,
-        "scholarship_deadline": "January 20",
-        "acceptance_rate": 17.5,
-        "description": "Oldest university in the English-speaking world, renowned for academic excellence and research."
-    },
-    {
-        "name": "University of Cambridge",
-        "country": "UK",
-        "city": "Cambridge",
-        "ranking": 5,
-        "programs_offered": ["Engineering", "Computer Science", "Mathematics", "Physics", "Medicine", "Economics"],
-        "min_gpa": 3.7,
-        "min_ielts": 7.5,
-        "min_toefl": 110,
-        "requires_gre": False,
-        "requires_gmat": False,
-        "tuition_min": 27000,
-        "tuition_max": 34000,
-        "living_cost_yearly": 14000,
-        "has_scholarships": True,
-        "scholarship_types": ["Gates Cambridge", "Cambridge Trust", "College Scholarships"],
-        "scholarship_amount_min": 12000,
-        "scholarship_amount_max": 48000,
-        "scholarship_deadline": "December 2",
-        "acceptance_rate": 19.6,
-        "description": "One of the world's oldest and most prestigious universities with a strong research focus."
-    },
-    {
-        "name": "Imperial College London",
-        "country": "UK",
-        "city": "London",
-        "ranking": 7,
-        "programs_offered": ["Engineering", "Computer Science", "Medicine", "Business", "Data Science", "AI/ML"],
-        "min_gpa": 3.5,
-        "min_ielts": 7.0,
-        "min_toefl": 100,
-        "requires_gre": False,
-        "requires_gmat": False,
-        "tuition_min": 32000,
-        "tuition_max": 38000,
-        "living_cost_yearly": 16000,
-        "has_scholarships": True,
-        "scholarship_types": ["President's Scholarship", "ICL Excellence Award"],
-        "scholarship_amount_min": 10000,
-        "scholarship_amount_max": 38000,
-        "scholarship_deadline": "January 10",
-        "acceptance_rate": 14.3,
-        "description": "Leading science and technology university in London with strong industry partnerships."
-    },
-    {
-        "name": "University College London (UCL)",
-        "country": "UK",
-        "city": "London",
-        "ranking": 9,
-        "programs_offered": ["Engineering", "Computer Science", "Architecture", "Medicine", "Economics", "Law"],
-        "min_gpa": 3.4,
-        "min_ielts": 7.0,
-        "min_toefl": 100,
-        "requires_gre": False,
-        "requires_gmat": False,
-        "tuition_min": 26000,
-        "tuition_max": 32000,
-        "living_cost_yearly": 16000,
-        "has_scholarships": True,
-        "scholarship_types": ["Global Excellence Scholarship", "Graduate Research Scholarship"],
-        "scholarship_amount_min": 8000,
-        "scholarship_amount_max": 32000,
-        "scholarship_deadline": "January 31",
-        "acceptance_rate": 48.0,
-        "description": "London's leading multidisciplinary university with a global reputation for research."
-    },
-    {
-        "name": "University of Edinburgh",
-        "country": "UK",
-        "city": "Edinburgh",
-        "ranking": 16,
-        "programs_offered": ["Computer Science", "Engineering", "Data Science", "AI/ML", "Medicine", "Business"],
-        "min_gpa": 3.3,
-        "min_ielts": 6.5,
-        "min_toefl": 92,
-        "requires_gre": False,
-        "requires_gmat": False,
-        "tuition_min": 24000,
-        "tuition_max": 30000,
-        "living_cost_yearly": 12000,
-        "has_scholarships": True,
-        "scholarship_types": ["Edinburgh Global Scholarship", "School-specific Awards"],
-        "scholarship_amount_min": 5000,
-        "scholarship_amount_max": 25000,
-        "scholarship_deadline": "February 1",
-        "acceptance_rate": 40.0,
-        "description": "Historic Scottish university with strong research programs and international student community."
-    },
-    {
-        "name": "King's College London",
-        "country": "UK",
-        "city": "London",
-        "ranking": 33,
-        "programs_offered": ["Law", "Medicine", "Data Science", "Business", "Computer Science", "Public Policy"],
-        "min_gpa": 3.2,
-        "min_ielts": 6.5,
-        "min_toefl": 90,
-        "requires_gre": False,
-        "requires_gmat": False,
-        "tuition_min": 22000,
-        "tuition_max": 28000,
-        "living_cost_yearly": 16000,
-        "has_scholarships": True,
-        "scholarship_types": ["International Scholarship", "Faculty Scholarship"],
-        "scholarship_amount_min": 6000,
-        "scholarship_amount_max": 28000,
-        "scholarship_deadline": "March 1",
-        "acceptance_rate": 13.0,
-        "description": "One of England's oldest universities with a strong reputation in law and medicine."
-    },
-    
-    # Canada - Top Universities
-    {
-        "name": "University of Toronto",
-        "country": "Canada",
-        "city": "Toronto",
-        "ranking": 21,
-        "programs_offered": ["Computer Science", "Engineering", "Business", "Data Science", "Medicine", "AI/ML"],
-        "min_gpa": 3.5,
-        "min_ielts": 7.0,
-        "min_toefl": 100,
-        "requires_gre": True,
-        "requires_gmat": False,
-        "tuition_min": 30000,
-        "tuition_max": 45000,
-        "living_cost_yearly": 15000,
-        "has_scholarships": True,
-        "scholarship_types": ["Lester B. Pearson Scholarship", "Graduate Excellence Award"],
-        "scholarship_amount_min": 10000,
-        "scholarship_amount_max": 65000,
-        "scholarship_deadline": "January 15",
-        "acceptance_rate": 43.0,
-        "description": "Canada's leading university with world-class research facilities and diverse programs."
-    },
-    {
-        "name": "University of British Columbia (UBC)",
-        "country": "Canada",
-        "city": "Vancouver",
-        "ranking": 34,
-        "programs_offered": ["Computer Science", "Engineering", "Business", "Data Science", "Environmental Science"],
-        "min_gpa": 3.3,
-        "min_ielts": 6.5,
-        "min_toefl": 90,
-        "requires_gre": True,
-        "requires_gmat": False,
-        "tuition_min": 28000,
-        "tuition_max": 40000,
-        "living_cost_yearly": 15000,
-        "has_scholarships": True,
-        "scholarship_types": ["International Leader of Tomorrow Award", "Graduate Support Initiative"],
-        "scholarship_amount_min": 8000,
-        "scholarship_amount_max": 55000,
-        "scholarship_deadline": "December 1",
-        "acceptance_rate": 52.0,
-        "description": "Beautiful campus in Vancouver with strong research programs and international focus."
-    },
-    {
-        "name": "McGill University",
-        "country": "Canada",
-        "city": "Montreal",
-        "ranking": 30,
-        "programs_offered": ["Engineering", "Medicine", "Business", "Computer Science", "Law", "Life Sciences"],
-        "min_gpa": 3.3,
-        "min_ielts": 6.5,
-        "min_toefl": 90,
-        "requires_gre": False,
-        "requires_gmat": False,
-        "tuition_min": 20000,
-        "tuition_max": 35000,
-        "living_cost_yearly": 12000,
-        "has_scholarships": True,
-        "scholarship_types": ["McGill Entrance Scholarship", "Graduate Excellence Fellowship"],
-        "scholarship_amount_min": 7000,
-        "scholarship_amount_max": 35000,
-        "scholarship_deadline": "January 15",
-        "acceptance_rate": 46.3,
-        "description": "Top Canadian university with a strong international reputation and bilingual environment."
-    },
-    {
-        "name": "University of Waterloo",
-        "country": "Canada",
-        "city": "Waterloo",
-        "ranking": 149,
-        "programs_offered": ["Computer Science", "Engineering", "Mathematics", "Data Science", "AI/ML", "Mechatronics"],
-        "min_gpa": 3.2,
-        "min_ielts": 6.5,
-        "min_toefl": 90,
-        "requires_gre": False,
-        "requires_gmat": False,
-        "tuition_min": 25000,
-        "tuition_max": 35000,
-        "living_cost_yearly": 12000,
-        "has_scholarships": True,
-        "scholarship_types": ["President's Graduate Scholarship", "Co-op Innovation Award"],
-        "scholarship_amount_min": 5000,
-        "scholarship_amount_max": 30000,
-        "scholarship_deadline": "February 1",
-        "acceptance_rate": 53.0,
-        "description": "Known for co-op programs and strong connections with tech industry, especially in computer science."
-    },
-    
-    # Australia - Top Universities
-    {
-        "name": "University of Melbourne",
-        "country": "Australia",
-        "city": "Melbourne",
-        "ranking": 14,
-        "programs_offered": ["Engineering", "Computer Science", "Business", "Medicine", "Law", "Data Science"],
-        "min_gpa": 3.5,
-        "min_ielts": 6.5,
-        "min_toefl": 94,
-        "requires_gre": False,
-        "requires_gmat": False,
-        "tuition_min": 35000,
-        "tuition_max": 45000,
-        "living_cost_yearly": 18000,
-        "has_scholarships": True,
-        "scholarship_types": ["Melbourne Graduate Scholarship", "International Research Scholarship"],
-        "scholarship_amount_min": 10000,
-        "scholarship_amount_max": 45000,
-        "scholarship_deadline": "October 31",
-        "acceptance_rate": 70.0,
-        "description": "Australia's leading university with comprehensive programs and strong research output."
-    },
-    {
-        "name": "Australian National University (ANU)",
-        "country": "Australia",
-        "city": "Canberra",
-        "ranking": 30,
-        "programs_offered": ["Computer Science", "Engineering", "Economics", "Public Policy", "Data Science"],
-        "min_gpa": 3.3,
-        "min_ielts": 6.5,
-        "min_toefl": 90,
-        "requires_gre": False,
-        "requires_gmat": False,
-        "tuition_min": 32000,
-        "tuition_max": 42000,
-        "living_cost_yearly": 16000,
-        "has_scholarships": True,
-        "scholarship_types": ["ANU Chancellor's International Scholarship", "Research Training Program"],
-        "scholarship_amount_min": 15000,
-        "scholarship_amount_max": 42000,
-        "scholarship_deadline": "November 15",
-        "acceptance_rate": 35.0,
-        "description": "National research university with strong government and policy connections."
-    },
-    {
-        "name": "University of Sydney",
-        "country": "Australia",
-        "city": "Sydney",
-        "ranking": 19,
-        "programs_offered": ["Engineering", "Business", "Computer Science", "Medicine", "Architecture", "Law"],
-        "min_gpa": 3.3,
-        "min_ielts": 6.5,
-        "min_toefl": 90,
-        "requires_gre": False,
-        "requires_gmat": False,
-        "tuition_min": 35000,
-        "tuition_max": 45000,
-        "living_cost_yearly": 18000,
-        "has_scholarships": True,
-        "scholarship_types": ["Sydney Scholars Award", "Vice-Chancellor's International Scholarship"],
-        "scholarship_amount_min": 8000,
-        "scholarship_amount_max": 40000,
-        "scholarship_deadline": "November 30",
-        "acceptance_rate": 30.0,
-        "description": "Historic university in Sydney with beautiful campus and strong academic programs."
-    },
-    {
-        "name": "University of Queensland",
-        "country": "Australia",
-        "city": "Brisbane",
-        "ranking": 43,
-        "programs_offered": ["Engineering", "Business", "Data Science", "Medicine", "Environmental Science"],
-        "min_gpa": 3.2,
-        "min_ielts": 6.5,
-        "min_toefl": 87,
-        "requires_gre": False,
-        "requires_gmat": False,
-        "tuition_min": 30000,
-        "tuition_max": 40000,
-        "living_cost_yearly": 15000,
-        "has_scholarships": True,
-        "scholarship_types": ["UQ Excellence Scholarship", "International Scholarship"],
-        "scholarship_amount_min": 6000,
-        "scholarship_amount_max": 38000,
-        "scholarship_deadline": "November 30",
-        "acceptance_rate": 54.0,
-        "description": "Leading Queensland university with strong research focus and international partnerships."
-    },
-    
-    # Germany - Top Universities
-    {
-        "name": "Technical University of Munich (TUM)",
-        "country": "Germany",
-        "city": "Munich",
-        "ranking": 49,
-        "programs_offered": ["Computer Science", "Engineering", "Data Science", "AI/ML", "Robotics", "Physics"],
-        "min_gpa": 3.0,
-        "min_ielts": 6.5,
-        "min_toefl": 88,
-        "requires_gre": False,
-        "requires_gmat": False,
-        "tuition_min": 0,
-        "tuition_max": 500,
-        "living_cost_yearly": 12000,
-        "has_scholarships": True,
-        "scholarship_types": ["DAAD Scholarship", "TUM Scholarship"],
-        "scholarship_amount_min": 5000,
-        "scholarship_amount_max": 15000,
-        "scholarship_deadline": "November 30",
-        "acceptance_rate": 8.0,
-        "description": "Top German technical university with tuition-free education and excellent research facilities."
-    },
-    {
-        "name": "Ludwig Maximilian University of Munich (LMU)",
-        "country": "Germany",
-        "city": "Munich",
-        "ranking": 59,
-        "programs_offered": ["Computer Science", "Business", "Law", "Medicine", "Economics", "Physics"],
-        "min_gpa": 3.0,
-        "min_ielts": 6.5,
-        "min_toefl": 80,
-        "requires_gre": False,
-        "requires_gmat": False,
-        "tuition_min": 0,
-        "tuition_max": 300,
-        "living_cost_yearly": 12000,
-        "has_scholarships": True,
-        "scholarship_types": ["DAAD Scholarship", "Bavarian State Scholarship"],
-        "scholarship_amount_min": 4000,
-        "scholarship_amount_max": 12000,
-        "scholarship_deadline": "December 15",
-        "acceptance_rate": 12.0,
-        "description": "Historic German university offering tuition-free education with excellent academic programs."
-    },
-    
-    # Netherlands - Top Universities
-    {
-        "name": "Delft University of Technology",
-        "country": "Netherlands",
-        "city": "Delft",
-        "ranking": 47,
-        "programs_offered": ["Engineering", "Computer Science", "Data Science", "Architecture", "Aerospace"],
-        "min_gpa": 3.2,
-        "min_ielts": 6.5,
-        "min_toefl": 90,
-        "requires_gre": False,
-        "requires_gmat": False,
-        "tuition_min": 18000,
-        "tuition_max": 20000,
-        "living_cost_yearly": 12000,
-        "has_scholarships": True,
-        "scholarship_types": ["Justus & Louise van Effen Excellence Scholarship", "TU Delft Scholarship"],
-        "scholarship_amount_min": 5000,
-        "scholarship_amount_max": 20000,
-        "scholarship_deadline": "December 1",
-        "acceptance_rate": 14.0,
-        "description": "Leading technical university in the Netherlands with strong engineering programs."
-    },
-    {
-        "name": "University of Amsterdam",
-        "country": "Netherlands",
-        "city": "Amsterdam",
-        "ranking": 53,
-        "programs_offered": ["Computer Science", "Business", "Data Science", "Economics", "AI/ML", "Psychology"],
-        "min_gpa": 3.0,
-        "min_ielts": 6.5,
-        "min_toefl": 92,
-        "requires_gre": False,
-        "requires_gmat": False,
-        "tuition_min": 15000,
-        "tuition_max": 18000,
-        "living_cost_yearly": 13000,
-        "has_scholarships": True,
-        "scholarship_types": ["Amsterdam Excellence Scholarship", "Holland Scholarship"],
-        "scholarship_amount_min": 6000,
-        "scholarship_amount_max": 18000,
-        "scholarship_deadline": "January 15",
-        "acceptance_rate": 31.0,
-        "description": "Top Dutch university in the heart of Amsterdam with diverse international programs."
-    },
-    
-    # Singapore
-    {
-        "name": "National University of Singapore (NUS)",
-        "country": "Singapore",
-        "city": "Singapore",
-        "ranking": 11,
-        "programs_offered": ["Computer Science", "Engineering", "Business", "Data Science", "AI/ML", "Medicine"],
-        "min_gpa": 3.5,
-        "min_ielts": 6.5,
-        "min_toefl": 92,
-        "requires_gre": True,
-        "requires_gmat": False,
-        "tuition_min": 25000,
-        "tuition_max": 35000,
-        "living_cost_yearly": 12000,
-        "has_scholarships": True,
-        "scholarship_types": ["NUS Graduate Scholarship", "President's Graduate Fellowship"],
-        "scholarship_amount_min": 12000,
-        "scholarship_amount_max": 35000,
-        "scholarship_deadline": "November 15",
-        "acceptance_rate": 5.0,
-        "description": "Asia's leading university with world-class research and strong industry connections."
-    },
-    {
-        "name": "Nanyang Technological University (NTU)",
-        "country": "Singapore",
-        "city": "Singapore",
-        "ranking": 26,
-        "programs_offered": ["Engineering", "Computer Science", "Business", "Data Science", "AI/ML"],
-        "min_gpa": 3.3,
-        "min_ielts": 6.5,
-        "min_toefl": 90,
-        "requires_gre": True,
-        "requires_gmat": False,
-        "tuition_min": 22000,
-        "tuition_max": 30000,
-        "living_cost_yearly": 12000,
-        "has_scholarships": True,
-        "scholarship_types": ["NTU Research Scholarship", "ASEAN Scholarship"],
-        "scholarship_amount_min": 10000,
-        "scholarship_amount_max": 30000,
-        "scholarship_deadline": "November 30",
-        "acceptance_rate": 25.0,
-        "description": "Young and innovative university in Singapore with strong focus on technology and innovation."
-    },
-    
-    # Ireland
-    {
-        "name": "Trinity College Dublin",
-        "country": "Ireland",
-        "city": "Dublin",
-        "ranking": 98,
-        "programs_offered": ["Computer Science", "Engineering", "Business", "Data Science", "Medicine", "Law"],
-        "min_gpa": 3.2,
-        "min_ielts": 6.5,
-        "min_toefl": 90,
-        "requires_gre": False,
-        "requires_gmat": False,
-        "tuition_min": 18000,
-        "tuition_max": 25000,
-        "living_cost_yearly": 12000,
-        "has_scholarships": True,
-        "scholarship_types": ["Trinity International Scholarship", "Postgraduate Award"],
-        "scholarship_amount_min": 5000,
-        "scholarship_amount_max": 25000,
-        "scholarship_deadline": "March 1",
-        "acceptance_rate": 35.0,
-        "description": "Ireland's oldest and most prestigious university with strong European connections."
-    },
-]
-
-
-def seed_universities():
+DEFAULT_DATA_FILE = Path(__file__).resolve().parent.parent / "data" / "universities.json"
+DEFAULT_BATCH_SIZE = 500
+CONFLICT_KEY = "name,country"
+
+# Columns that are not plain text, for typing CSV values
+INTEGER_COLUMNS = {"id", "ranking"}
+NUMERIC_COLUMNS = {
+    "min_gpa", "min_ielts", "min_toefl", "tuition_min", "tuition_max",
+    "living_cost_yearly", "scholarship_amount_min", "scholarship_amount_max", "acceptance_rate"
+}
+BOOLEAN_COLUMNS = {"requires_gre", "requires_gmat", "has_scholarships"}
+ARRAY_COLUMNS = {"programs_offered", "scholarship_types"}
+# Assigned by the database in each environment
+SKIPPED_COLUMNS = {"id", "created_at"}
+
+_client = None
+
+
+def get_client():
+    """Supabase client, created on first use"""
+    global _client
+    if _client is None:
+        from supabase import create_client
+
+        supabase_url = os.getenv("SUPABASE_URL")
+        supabase_key = os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_KEY")
+        if not supabase_url or not supabase_key:
+            raise ValueError("SUPABASE_URL and SUPABASE_KEY must be set in .env file")
+        _client = create_client(supabase_url, supabase_key)
+    return _client
+
+
+def _parse_array(value: str) -> List[str]:
+    """Array cell: JSON list, Postgres literal {"a","b"} or semicolon-separated"""
+    value = value.strip()
+    if not value:
+        return []
+    if value.startswith("["):
+        return json.loads(value)
+    if value.startswith("{") and value.endswith("}"):
+        reader = csv.reader([value[1:-1]], escapechar="\\")
+        return [item for item in next(reader) if item]
+    return [item.strip() for item in value.split(";") if item.strip()]
+
+
+def typed_csv_row(row: Dict[str, str]) -> Dict[str, Any]:
+    typed = {}
+    for column, value in row.items():
+        if value is None:
+            continue
+        if column in ARRAY_COLUMNS:
+            typed[column] = _parse_array(value)
+        elif value == "":
+            typed[column] = None
+        elif column in INTEGER_COLUMNS:
+            typed[column] = int(float(value))
+        elif column in NUMERIC_COLUMNS:
+            typed[column] = float(value)
+        elif column in BOOLEAN_COLUMNS:
+            typed[column] = value.strip().lower() in ("true", "t", "1", "yes")
+        else:
+            typed[column] = value
+    return typed
+
+
+def iter_rows(f: IO[str], fmt: str) -> Iterator[Dict[str, Any]]:
+    """Stream university rows from an open text file in "json", "ndjson" or "csv" format"""
+    if fmt == "json":
+        yield from json.load(f)
+    elif fmt == "ndjson":
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+    elif fmt == "csv":
+        for row in csv.DictReader(f):
+            yield typed_csv_row(row)
+    else:
+        raise ValueError(f"Unsupported format: {fmt} (expected json, ndjson or csv)")
+
+
+def file_format(path: str) -> str:
+    """Input format from a file name (.json, .ndjson/.jsonl, .csv, optionally .gz)"""
+    suffixes = [s.lower() for s in Path(path).suffixes]
+    if suffixes and suffixes[-1] == ".gz":
+        suffixes.pop()
+    suffix = suffixes[-1] if suffixes else ""
+    formats = {".json": "json", ".ndjson": "ndjson", ".jsonl": "ndjson", ".csv": "csv"}
+    if suffix not in formats:
+        raise ValueError(f"Unsupported file type: {path} (expected .json, .ndjson or .csv)")
+    return formats[suffix]
+
+
+def read_rows(path: str) -> Iterator[Dict[str, Any]]:
+    """Stream university rows from a .json, .ndjson/.jsonl or .csv file (optionally gzipped)"""
+    fmt = file_format(path)
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", newline="" if fmt == "csv" else None) as f:
+        yield from iter_rows(f, fmt)
+
+
+def batched(rows: Iterable[Dict[str, Any]], batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Group rows into upsert batches keyed by (name, country)
+
+    A repeated key inside one batch would make Postgres reject the whole
+    statement, so the last occurrence wins
+    """
+    batch: Dict[tuple, Dict[str, Any]] = {}
+    for row in rows:
+        clean = {k: v for k, v in row.items() if k not in SKIPPED_COLUMNS}
+        batch[(clean["name"], clean["country"])] = clean
+        if len(batch) >= batch_size:
+            yield list(batch.values())
+            batch = {}
+    if batch:
+        yield list(batch.values())
+
+
+def upsert_universities(
+    rows: Iterable[Dict[str, Any]],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    client=None,
+    progress: Optional[Callable[[int, float], None]] = None
+) -> Dict[str, Any]:
+    """
+    Upsert rows in batches on (name, country)
+
+    Returns {"rows", "batches", "seconds", "countries"}; progress is called
+    with (rows so far, elapsed seconds) after each batch
+    """
+    client = client or get_client()
+    total = 0
+    batches = 0
+    countries: Dict[str, int] = {}
+    started = time.perf_counter()
+    for batch in batched(rows, batch_size):
+        client.table("universities").upsert(batch, on_conflict=CONFLICT_KEY).execute()
+        total += len(batch)
+        batches += 1
+        for row in batch:
+            countries[row["country"]] = countries.get(row["country"], 0) + 1
+        if progress:
+            progress(total, time.perf_counter() - started)
+    return {
+        "rows": total,
+        "batches": batches,
+        "seconds": time.perf_counter() - started,
+        "countries": countries
+    }
+
+
+def seed_universities(
+    path: Optional[str] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    rows: Optional[Iterable[Dict[str, Any]]] = None
+):
     """Seed universities table with data"""
+    source = "provided rows" if rows is not None else (path or str(DEFAULT_DATA_FILE))
     print("Starting university database seeding...")
-    print(f"Using Supabase URL: {SUPABASE_URL}")
-    
+    print(f"Source: {source} (batches of {batch_size})")
+
+    def report(count: int, elapsed: float):
+        print(f"  {count} rows ({count / max(elapsed, 1e-9):.0f} rows/sec)")
+
     try:
-        # Insert universities
-        inserted_count = 0
-        for university in UNIVERSITIES:
-            try:
-                result = supabase.table("universities").insert(university).execute()
-                print(f"✓ Inserted: {university['name']}")
-                inserted_count += 1
-            except Exception as e:
-                print(f"✗ Error inserting {university['name']}: {str(e)}")
-        
-        print(f"\n✅ Successfully seeded {inserted_count} out of {len(UNIVERSITIES)} universities!")
+        summary = upsert_universities(
+            rows if rows is not None else read_rows(path or str(DEFAULT_DATA_FILE)),
+            batch_size=batch_size,
+            progress=report
+        )
+        rate = summary["rows"] / max(summary["seconds"], 1e-9)
+        print(f"\n✅ Upserted {summary['rows']} universities in {summary['seconds']:.1f}s ({rate:.0f} rows/sec, {summary['batches']} batches)")
         print("\nUniversities by country:")
-        countries = {}
-        for uni in UNIVERSITIES:
-            country = uni["country"]
-            countries[country] = countries.get(country, 0) + 1
-        
-        for country, count in sorted(countries.items()):
+        for country, count in sorted(summary["countries"].items()):
             print(f"  {country}: {count} universities")
-            
+        return summary
+
     except Exception as e:
         print(f"❌ Error during seeding: {str(e)}")
+        raise
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--file", help=f"JSON, NDJSON or CSV file (default: {DEFAULT_DATA_FILE})")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Rows per upsert request")
+    parser.add_argument("--synthetic", type=int, metavar="N", help="Seed N generated universities instead of a file")
+    parser.add_argument("--seed", type=int, default=0, help="Generator seed for --synthetic")
+    args = parser.parse_args()
+
+    rows = None
+    if args.synthetic:
+        from app.synthetic import generate_universities
+        rows = generate_universities(args.synthetic, args.seed)
+    seed_universities(args.file, args.batch_size, rows)
 
 
 if __name__ == "__main__":
-    seed_universities()
+    main()
@@ -0,0 +1,121 @@
+"""
+Production server: several worker processes behind one port
+
+    python -m app.serve                     # one worker per CPU core
+    python -m app.serve --workers 4 --port 8000
+    WEB_CONCURRENCY=2 python -m app.serve
+
+Uses gunicorn with uvicorn workers (worker restarts, graceful reloads) and
+falls back to uvicorn's own process manager where gunicorn is unavailable
+(e.g. Windows). With more than one worker it also:
+
+- switches the default in-process cache to the shared backend, so version
+  tokens and invalidations agree across workers (see app.cache)
+- points prometheus_client at a multiprocess directory, so /metrics
+  aggregates every worker
+"""
+import argparse
+import os
+import shutil
+import tempfile
+from app.config import get_settings
+
+
+def default_workers() -> int:
+    """settings.web_concurrency, else one per CPU core available to this process"""
+    configured = get_settings().web_concurrency
+    if configured > 0:
+        return configured
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # Not available on macOS / Windows
+        return os.cpu_count() or 1
+
+
+def prepare_environment(workers: int) -> None:
+    """Environment the workers inherit; must run before they import the app"""
+    if workers > 1:
+        if get_settings().cache_backend == "memory" and "CACHE_BACKEND" not in os.environ:
+            os.environ["CACHE_BACKEND"] = "shared"
+        if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+            os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="ai-counsellor-metrics-")
+        else:
+            # Samples left by a previous run would be added to this one's
+            metrics_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+            shutil.rmtree(metrics_dir, ignore_errors=True)
+            os.makedirs(metrics_dir, exist_ok=True)
+    get_settings.cache_clear()
+
+
+def _child_exit(server, worker) -> None:
+    """gunicorn hook: drop a dead worker's live gauges from /metrics"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
+
+
+def run_gunicorn(app: str, host: str, port: int, workers: int) -> None:
+    from gunicorn.app.base import BaseApplication
+    from gunicorn.util import import_app
+
+    class Application(BaseApplication):
+        def __init__(self, options):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return import_app(app)
+
+    Application({
+        "bind": f"{host}:{port}",
+        "workers": workers,
+        "worker_class": "uvicorn.workers.UvicornWorker",
+        "keepalive": 5,
+        "timeout": 120,  # Gemini calls can take tens of seconds
+        "graceful_timeout": 30,
+        # Recycle workers now and then so slow leaks cannot build up
+        "max_requests": 10000,
+        "max_requests_jitter": 1000,
+        "child_exit": _child_exit,
+        "accesslog": None,
+    }).run()
+
+
+def run_uvicorn(app: str, host: str, port: int, workers: int) -> None:
+    import uvicorn
+    uvicorn.run(app, host=host, port=port, workers=workers, proxy_headers=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the API with several worker processes")
+    parser.add_argument("--app", default="app.main:app", help="ASGI application (module:attribute)")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", 8000)))
+    parser.add_argument("--workers", type=int, default=None, help="Default: WEB_CONCURRENCY or one per CPU core")
+    parser.add_argument("--server", choices=("auto", "gunicorn", "uvicorn"), default="auto")
+    args = parser.parse_args()
+
+    workers = args.workers or default_workers()
+    prepare_environment(workers)
+
+    server = args.server
+    if server == "auto":
+        try:
+            import gunicorn  # noqa: F401
+            server = "gunicorn"
+        except ImportError:
+            server = "uvicorn"
+
+    print(f"Starting {workers} {server} worker(s) on {args.host}:{args.port} (cache: {get_settings().cache_backend})")
+    if server == "gunicorn":
+        run_gunicorn(args.app, args.host, args.port, workers)
+    else:
+        run_uvicorn(args.app, args.host, args.port, workers)
+
+
+if __name__ == "__main__":
+    main()
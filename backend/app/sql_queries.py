@@ -0,0 +1,152 @@
+"""
+Joined queries for the hot routes over the direct asyncpg pool
+Used when settings.data_backend = "sql". Each function replaces several
+PostgREST round trips with one statement: related rows are joined and
+aggregated into JSON by Postgres, so the results have exactly the shape
+(and the JSON encoding of dates and numbers) the routers already get
+from PostgREST .data.
+
+    dashboard_data       profile, stage, shortlist counts, tasks, locked cards   6 requests -> 1
+    shortlist_data       shortlist rows with embedded universities, stage       2 requests -> 1
+    recommendation_data  profile and shortlist state                            2 requests -> 1
+
+Writes still go through PostgREST.
+"""
+import time
+from functools import lru_cache
+from typing import Any, Dict, Optional, Sequence
+from sqlalchemy import bindparam, func, literal_column, select, true
+from sqlalchemy.dialects.postgresql import JSONB, aggregate_order_by
+from app.database import get_engine
+from app.metrics import record_query
+from app.models import Profile, Shortlist, Task, University, UserStage
+from app.projections import UNIVERSITY_COLUMNS, UNIVERSITY_PROJECTIONS
+from app.tracing import start_span
+
+profiles = Profile.__table__
+user_stages = UserStage.__table__
+shortlists = Shortlist.__table__
+tasks = Task.__table__
+universities = University.__table__
+
+USER_ID = bindparam("user_id", type_=Profile.user_id.type)
+EMPTY_ARRAY = literal_column("'[]'::jsonb", JSONB)
+
+
+def _row_json(table):
+    """to_jsonb(table): the whole row with every column, like select("*")"""
+    return func.to_jsonb(literal_column(table.name), type_=JSONB)
+
+
+def _json_object(columns: Sequence[str], table) -> Any:
+    """jsonb_build_object('col', table.col, ...) for whitelisted column names"""
+    args = []
+    for name in columns:
+        args += [literal_column(f"'{name}'"), table.c[name]]
+    return func.jsonb_build_object(*args, type_=JSONB)
+
+
+def _json_array(value, *order_by) -> Any:
+    aggregated = func.jsonb_agg(aggregate_order_by(value, *order_by) if order_by else value)
+    return func.coalesce(aggregated, EMPTY_ARRAY, type_=JSONB)
+
+
+def _profile():
+    return select(_row_json(profiles)).where(profiles.c.user_id == USER_ID).limit(1).scalar_subquery()
+
+
+def _stage():
+    return select(user_stages.c.current_stage).where(user_stages.c.user_id == USER_ID).limit(1).scalar_subquery()
+
+
+DASHBOARD = select(
+    _profile().label("profile"),
+    _stage().label("stage"),
+    select(func.count()).select_from(shortlists)
+        .where(shortlists.c.user_id == USER_ID).scalar_subquery().label("shortlisted"),
+    select(func.count()).select_from(shortlists)
+        .where(shortlists.c.user_id == USER_ID, shortlists.c.is_locked == true()).scalar_subquery().label("locked"),
+    select(_json_array(_row_json(tasks), tasks.c.created_at.desc()))
+        .where(tasks.c.user_id == USER_ID).scalar_subquery().label("tasks"),
+    select(_json_array(func.jsonb_build_object(
+        literal_column("'id'"), shortlists.c.id,
+        literal_column("'bucket'"), shortlists.c.bucket,
+        literal_column("'universities'"), _json_object(UNIVERSITY_PROJECTIONS["card"], universities),
+        type_=JSONB
+    ), shortlists.c.id))
+        .select_from(shortlists.join(universities, universities.c.id == shortlists.c.university_id))
+        .where(shortlists.c.user_id == USER_ID, shortlists.c.is_locked == true())
+        .scalar_subquery().label("locked_universities"),
+)
+
+RECOMMENDATIONS = select(
+    _profile().label("profile"),
+    select(_json_array(_json_object(("university_id", "bucket", "is_locked"), shortlists), shortlists.c.id))
+        .where(shortlists.c.user_id == USER_ID).scalar_subquery().label("shortlist"),
+)
+
+
+@lru_cache(maxsize=32)
+def _shortlist_statement(columns: tuple):
+    """Shortlist rows embedding the given university columns (cached per projection)"""
+    item = func.jsonb_build_object(
+        *[arg for name in ("id", "university_id", "bucket", "is_locked", "why_fits", "risks", "created_at")
+          for arg in (literal_column(f"'{name}'"), shortlists.c[name])],
+        literal_column("'universities'"), _json_object(columns, universities),
+        type_=JSONB
+    )
+    return select(
+        select(_json_array(item, shortlists.c.id))
+            .select_from(shortlists.join(universities, universities.c.id == shortlists.c.university_id))
+            .where(shortlists.c.user_id == USER_ID)
+            .scalar_subquery().label("items"),
+        _stage().label("stage"),
+    )
+
+
+async def _fetch(name: str, statement, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one statement, counted and traced like a PostgREST query"""
+    attributes = {"db.system": "postgresql", "db.sql.table": name, "db.operation": "select"}
+    with start_span(f"sql.select {name}", attributes, "CLIENT"):
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            async with get_engine().connect() as conn:
+                row = (await conn.execute(statement, params)).mappings().one()
+            outcome = "ok"
+            return dict(row)
+        finally:
+            record_query(f"sql:{name}", "select", time.perf_counter() - started, outcome, ["eq(user_id)"])
+
+
+async def dashboard_data(user_id: str) -> Dict[str, Any]:
+    """
+    Everything GET /dashboard/ reads, in one round trip
+
+    Returns:
+        {profile (dict or None), stage, shortlisted, locked, tasks, locked_universities}
+    """
+    return await _fetch("dashboard", DASHBOARD, {"user_id": user_id})
+
+
+async def shortlist_data(user_id: str, columns: tuple) -> Dict[str, Any]:
+    """
+    Shortlist rows with their universities (only `columns`) and the user's stage
+
+    Returns:
+        {items (list of shortlist rows), stage (str or None)}
+    """
+    unknown = [name for name in columns if name not in UNIVERSITY_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown university columns: {unknown}")
+    return await _fetch("shortlist", _shortlist_statement(columns), {"user_id": user_id})
+
+
+async def recommendation_data(user_id: str) -> Dict[str, Optional[Any]]:
+    """
+    Profile and shortlist state for GET /universities/recommendations
+
+    Returns:
+        {profile (dict or None), shortlist (list of {university_id, bucket, is_locked})}
+    """
+    return await _fetch("recommendations", RECOMMENDATIONS, {"user_id": user_id})
@@ -0,0 +1,317 @@
+"""
+Deterministic synthetic universities and user profiles for scale testing
+Every row is derived from (seed, index) alone, so any slice of a catalog can
+be regenerated or streamed without building the rows before it.
+
+Usage:
+    python -m app.synthetic universities --count 100000 --output universities.ndjson
+    python -m app.synthetic profiles --count 10000 --format csv --output profiles.csv
+    python -m app.synthetic universities --count 1000000 --dsn postgresql://localhost/counsellor
+"""
+import argparse
+import csv
+import io
+import itertools
+import json
+import random
+import sys
+import time
+import uuid
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+# country -> (weight, cities, tuition range, living cost range, share requiring GRE, share with scholarships)
+COUNTRIES = {
+    "USA": (30, ["Boston", "New York", "Chicago", "Austin", "Seattle", "Atlanta", "Denver", "Pittsburgh"],
+            (25000, 60000), (14000, 25000), 0.55, 0.85),
+    "UK": (15, ["London", "Manchester", "Edinburgh", "Bristol", "Leeds", "Glasgow", "Birmingham"],
+           (18000, 45000), (12000, 20000), 0.05, 0.7),
+    "Canada": (12, ["Toronto", "Vancouver", "Montreal", "Ottawa", "Calgary", "Waterloo"],
+               (15000, 45000), (12000, 18000), 0.2, 0.75),
+    "Australia": (10, ["Sydney", "Melbourne", "Brisbane", "Perth", "Adelaide", "Canberra"],
+                  (25000, 48000), (15000, 22000), 0.05, 0.7),
+    "Germany": (10, ["Munich", "Berlin", "Hamburg", "Aachen", "Heidelberg", "Stuttgart"],
+                (0, 3000), (10000, 14000), 0.1, 0.6),
+    "Netherlands": (6, ["Amsterdam", "Delft", "Utrecht", "Rotterdam", "Leiden", "Eindhoven"],
+                    (12000, 22000), (11000, 16000), 0.05, 0.6),
+    "Singapore": (4, ["Singapore"], (25000, 40000), (12000, 18000), 0.3, 0.8),
+    "Ireland": (5, ["Dublin", "Cork", "Galway", "Limerick"], (15000, 30000), (12000, 18000), 0.05, 0.6),
+}
+
+# program -> weight (how often universities offer it)
+PROGRAMS = {
+    "Computer Science": 10, "Engineering": 9, "Business": 8, "Data Science": 7, "Mathematics": 6,
+    "Economics": 6, "Physics": 5, "Medicine": 4, "Law": 4, "AI/ML": 5, "Business Analytics": 4,
+    "Finance": 4, "Psychology": 4, "Life Sciences": 4, "Architecture": 2, "Design": 2, "Arts": 3,
+    "Public Health": 3, "Public Policy": 2, "Information Systems": 3, "Environmental Science": 3,
+    "Robotics": 2, "Aerospace": 1, "Philosophy": 2,
+}
+
+SCHOLARSHIP_TYPES = ["Merit-based", "Need-based", "Research Assistantship", "Teaching Assistantship",
+                     "International Scholarship", "Fellowship", "Graduate Excellence Award"]
+DEADLINES = ["November 15", "December 1", "December 15", "January 5", "January 15", "February 1", "March 1"]
+NAME_TEMPLATES = ["University of {city}", "{city} Institute of Technology", "{city} State University",
+                  "{city} Metropolitan University", "Royal {city} College", "{city} University of Applied Sciences"]
+
+EDUCATION_LEVELS = ["Bachelors", "Bachelors", "Bachelors", "Masters", "High School"]
+INTENDED_DEGREES = ["Masters", "Masters", "Masters", "PhD", "Bachelors"]
+EXAM_STATUSES = ["Not Started", "Scheduled", "Completed"]
+SOP_STATUSES = ["Not Started", "Draft", "Ready"]
+FUNDING_TYPES = ["self", "loan", "scholarship", "mixed"]
+
+MAX_RANKING = 1500
+
+UNIVERSITY_FIELDS = (
+    "id", "name", "country", "city", "ranking", "programs_offered",
+    "min_gpa", "min_ielts", "min_toefl", "requires_gre", "requires_gmat",
+    "tuition_min", "tuition_max", "living_cost_yearly",
+    "has_scholarships", "scholarship_types", "scholarship_amount_min",
+    "scholarship_amount_max", "scholarship_deadline",
+    "acceptance_rate", "description",
+)
+
+PROFILE_FIELDS = (
+    "user_id", "education_level", "degree", "major", "graduation_year", "gpa",
+    "intended_degree", "field_of_study", "target_intake_year", "preferred_countries",
+    "budget_min", "budget_max", "funding_type",
+    "ielts_toefl_status", "ielts_toefl_score", "gre_gmat_status", "gre_gmat_score",
+    "sop_status", "is_complete",
+)
+
+_COUNTRY_NAMES = list(COUNTRIES)
+_COUNTRY_WEIGHTS = list(itertools.accumulate(COUNTRIES[c][0] for c in _COUNTRY_NAMES))
+_PROGRAM_NAMES = list(PROGRAMS)
+_PROGRAM_WEIGHTS = list(itertools.accumulate(PROGRAMS.values()))
+_TOEFL_FOR_IELTS = {6.0: 80, 6.5: 90, 7.0: 100, 7.5: 110}
+
+
+def _rng(kind: int, seed: int, index: int) -> random.Random:
+    # Independent stream per (kind, seed, index)
+    return random.Random((seed * 4 + kind) * 1_000_000_007 + index)
+
+
+def _clamp(value: float, low: float, high: float) -> float:
+    return max(low, min(high, value))
+
+
+def _weighted_sample(rng: random.Random, names: Sequence[str], cum_weights: Sequence[int], k: int) -> List[str]:
+    """k distinct names, more common ones more likely"""
+    chosen: List[str] = []
+    while len(chosen) < k:
+        name = rng.choices(names, cum_weights=cum_weights)[0]
+        if name not in chosen:
+            chosen.append(name)
+    return chosen
+
+
+def make_university(index: int, seed: int = 0) -> Dict[str, Any]:
+    """
+    University number index (id index + 1)
+
+    Selectivity follows ranking: better-ranked universities have lower
+    acceptance rates and higher GPA / English requirements.
+    """
+    rng = _rng(0, seed, index)
+    country = rng.choices(_COUNTRY_NAMES, cum_weights=_COUNTRY_WEIGHTS)[0]
+    _, cities, tuition_range, living_range, gre_share, scholarship_share = COUNTRIES[country]
+    city = rng.choice(cities)
+
+    ranking = rng.randint(1, MAX_RANKING) if rng.random() < 0.85 else None
+    # 0 = top of the table, 1 = bottom / unranked
+    tier = (ranking / MAX_RANKING) ** 0.5 if ranking else 1.0
+
+    acceptance_rate = round(_clamp(4 + 70 * tier + rng.gauss(0, 6), 2, 95), 1)
+    min_gpa = round(_clamp(3.9 - 1.2 * tier + rng.gauss(0, 0.15), 2.5, 4.0), 1)
+    min_ielts = _clamp(round((7.5 - 1.5 * tier + rng.gauss(0, 0.3)) * 2) / 2, 6.0, 7.5)
+
+    tuition_low, tuition_high = tuition_range
+    tuition_max = int(round(rng.uniform(tuition_low, tuition_high) * (1.2 - 0.3 * tier), -2))
+    tuition_min = int(round(tuition_max * rng.uniform(0.8, 1.0), -2))
+    living_cost = int(round(rng.uniform(*living_range), -2))
+
+    has_scholarships = rng.random() < scholarship_share
+    scholarship_min = int(round(rng.uniform(2000, 10000), -3)) if has_scholarships else None
+
+    return {
+        "id": index + 1,
+        "name": f"{rng.choice(NAME_TEMPLATES).format(city=city)} {index + 1}",
+        "country": country,
+        "city": city,
+        "ranking": ranking,
+        "programs_offered": _weighted_sample(rng, _PROGRAM_NAMES, _PROGRAM_WEIGHTS, rng.randint(3, 10)),
+        "min_gpa": min_gpa,
+        "min_ielts": min_ielts,
+        "min_toefl": _TOEFL_FOR_IELTS[min_ielts],
+        "requires_gre": rng.random() < gre_share,
+        "requires_gmat": rng.random() < 0.1,
+        "tuition_min": tuition_min,
+        "tuition_max": tuition_max,
+        "living_cost_yearly": living_cost,
+        "has_scholarships": has_scholarships,
+        "scholarship_types": rng.sample(SCHOLARSHIP_TYPES, rng.randint(1, 3)) if has_scholarships else [],
+        "scholarship_amount_min": scholarship_min,
+        "scholarship_amount_max": int(round(scholarship_min + rng.uniform(5000, 50000), -3)) if has_scholarships else None,
+        "scholarship_deadline": rng.choice(DEADLINES) if has_scholarships else None,
+        "acceptance_rate": acceptance_rate,
+        "description": f"Synthetic university in {city}, {country}.",
+    }
+
+
+def make_profile(index: int, seed: int = 0) -> Dict[str, Any]:
+    """Onboarded user profile number index"""
+    rng = _rng(1, seed, index)
+    field = rng.choices(_PROGRAM_NAMES, cum_weights=_PROGRAM_WEIGHTS)[0]
+    budget_max = int(round(_clamp(rng.lognormvariate(10.7, 0.4), 10000, 150000), -3))
+    ielts_status = rng.choices(EXAM_STATUSES, [3, 2, 5])[0]
+    gre_status = rng.choices(EXAM_STATUSES, [4, 2, 4])[0]
+    return {
+        "user_id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+        "education_level": rng.choice(EDUCATION_LEVELS),
+        "degree": "Bachelors",
+        "major": field,
+        "graduation_year": rng.randint(2018, 2026),
+        "gpa": round(_clamp(rng.gauss(3.3, 0.4), 2.0, 4.0), 2),
+        "intended_degree": rng.choice(INTENDED_DEGREES),
+        "field_of_study": field,
+        "target_intake_year": rng.randint(2026, 2028),
+        "preferred_countries": _weighted_sample(rng, _COUNTRY_NAMES, _COUNTRY_WEIGHTS, rng.randint(1, 3)),
+        "budget_min": int(round(budget_max * 0.6, -3)),
+        "budget_max": budget_max,
+        "funding_type": rng.choice(FUNDING_TYPES),
+        "ielts_toefl_status": ielts_status,
+        "ielts_toefl_score": rng.choice([6.0, 6.5, 7.0, 7.5, 8.0]) if ielts_status == "Completed" else None,
+        "gre_gmat_status": gre_status,
+        "gre_gmat_score": rng.randint(300, 335) if gre_status == "Completed" else None,
+        "sop_status": rng.choice(SOP_STATUSES),
+        "is_complete": rng.random() < 0.9,
+    }
+
+
+def generate_universities(count: int, seed: int = 0, start: int = 0) -> Iterator[Dict[str, Any]]:
+    """Stream universities start .. start + count - 1"""
+    for index in range(start, start + count):
+        yield make_university(index, seed)
+
+
+def generate_profiles(count: int, seed: int = 0, start: int = 0) -> Iterator[Dict[str, Any]]:
+    """Stream profiles start .. start + count - 1"""
+    for index in range(start, start + count):
+        yield make_profile(index, seed)
+
+
+# ========== Output ==========
+
+def pg_array(values: List[str]) -> str:
+    """Postgres array literal for TEXT[] columns in CSV / COPY input"""
+    return "{" + ",".join('"' + v.replace("\\", "\\\\").replace('"', '\\"') + '"' for v in values) + "}"
+
+
+def csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return pg_array(value)
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return value
+
+
+def write_ndjson(rows: Iterable[Dict[str, Any]], out) -> int:
+    count = 0
+    for row in rows:
+        out.write(json.dumps(row) + "\n")
+        count += 1
+    return count
+
+
+def write_csv(rows: Iterable[Dict[str, Any]], out, columns: Sequence[str]) -> int:
+    """CSV with a header row; arrays are written as Postgres array literals"""
+    writer = csv.writer(out)
+    writer.writerow(columns)
+    count = 0
+    for row in rows:
+        writer.writerow([csv_value(row.get(c)) for c in columns])
+        count += 1
+    return count
+
+
+def copy_to_postgres(
+    dsn: str,
+    table: str,
+    rows: Iterable[Dict[str, Any]],
+    columns: Sequence[str],
+    chunk_rows: int = 50000,
+    progress: Optional[Callable[[int], None]] = None
+) -> int:
+    """Bulk-load rows with COPY ... FROM STDIN in chunks of chunk_rows"""
+    import psycopg2
+
+    statement = f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '')"
+    total = 0
+    conn = psycopg2.connect(dsn)
+    try:
+        with conn.cursor() as cur:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            pending = 0
+            for row in rows:
+                writer.writerow([csv_value(row.get(c)) for c in columns])
+                pending += 1
+                if pending == chunk_rows:
+                    buffer.seek(0)
+                    cur.copy_expert(statement, buffer)
+                    total += pending
+                    buffer, pending = io.StringIO(), 0
+                    writer = csv.writer(buffer)
+                    if progress:
+                        progress(total)
+            if pending:
+                buffer.seek(0)
+                cur.copy_expert(statement, buffer)
+                total += pending
+        conn.commit()
+    finally:
+        conn.close()
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("kind", choices=["universities", "profiles"])
+    parser.add_argument("--count", type=int, required=True)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--start", type=int, default=0, help="First index (to extend an existing set)")
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("--output", help="File to write (default: stdout)")
+    parser.add_argument("--dsn", help="Bulk-load into this Postgres database with COPY instead of writing a file")
+    parser.add_argument("--table", help="Target table for --dsn (default: public.<kind>)")
+    args = parser.parse_args()
+
+    if args.kind == "universities":
+        rows = generate_universities(args.count, args.seed, args.start)
+        columns = UNIVERSITY_FIELDS
+    else:
+        rows = generate_profiles(args.count, args.seed, args.start)
+        columns = PROFILE_FIELDS
+
+    started = time.perf_counter()
+    if args.dsn:
+        # Let the database assign serial ids
+        load_columns = [c for c in columns if c != "id"]
+        written = copy_to_postgres(
+            args.dsn, args.table or f"public.{args.kind}", rows, load_columns,
+            progress=lambda n: print(f"  {n} rows", file=sys.stderr)
+        )
+    else:
+        out = open(args.output, "w", newline="") if args.output else sys.stdout
+        try:
+            written = write_ndjson(rows, out) if args.format == "ndjson" else write_csv(rows, out, columns)
+        finally:
+            if args.output:
+                out.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"{written} {args.kind} in {elapsed:.1f}s ({written / max(elapsed, 1e-9):.0f} rows/sec)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
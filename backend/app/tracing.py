@@ -0,0 +1,270 @@
+"""
+Lightweight tracing and structured logging
+Spans follow the OpenTelemetry data model: W3C trace and span ids,
+parent links, nanosecond timestamps, semantic-convention attribute names,
+and OTLP/JSON field names when exported. The traceparent header is
+honoured on the way in and returned on the way out, so spans join a trace
+started by the frontend or a proxy.
+
+Exporters work offline: "console" writes one JSON span per line to
+stderr, "file" appends them to settings.tracing_file, "none" keeps ids
+for log correlation but exports nothing.
+
+Log records carry trace_id / span_id; with settings.log_format = "json"
+each record is one JSON object, so a slow chat request can be followed
+from the request span through its queries, Gemini call and actions.
+"""
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+from app.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "ai-counsellor-api"
+
+
+class Span:
+    """One timed operation in a trace"""
+
+    __slots__ = ("name", "kind", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "status", "status_message")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], kind: str = "INTERNAL", attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.status = "UNSET"
+        self.status_message = ""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if value is not None:
+            self.attributes[key] = value
+
+    def set_error(self, error: BaseException) -> None:
+        self.status = "ERROR"
+        self.status_message = f"{type(error).__name__}: {error}"
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """OTLP/JSON span fields, plus the service name for single-file exports"""
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": f"SPAN_KIND_{self.kind}",
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "durationMs": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "status": {"code": f"STATUS_CODE_{self.status}"},
+            "service": SERVICE_NAME,
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        return span
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+# Exporters
+
+class SpanExporter:
+    """Writes finished spans as JSON lines to a stream"""
+
+    def __init__(self, stream, owns_stream: bool = False):
+        self.stream = stream
+        self.owns_stream = owns_stream
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_otlp(), default=str)
+        with self._lock:
+            if self.stream.closed:
+                return
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self.owns_stream and not self.stream.closed:
+                self.stream.close()
+
+
+_exporter: Optional[SpanExporter] = None
+_exporter_ready = False
+
+
+def get_exporter() -> Optional[SpanExporter]:
+    """Exporter chosen by settings.tracing_exporter, created on first use"""
+    global _exporter, _exporter_ready
+    if not _exporter_ready:
+        if settings.tracing_exporter == "console":
+            _exporter = SpanExporter(sys.stderr)
+        elif settings.tracing_exporter == "file":
+            _exporter = SpanExporter(open(settings.tracing_file, "a", buffering=1), owns_stream=True)
+        elif settings.tracing_exporter != "none":
+            logger.warning("Unknown tracing exporter %r, spans are not exported", settings.tracing_exporter)
+        _exporter_ready = True
+    return _exporter
+
+
+def close_exporter() -> None:
+    """Close the exporter's file at shutdown; spans after this are not exported"""
+    global _exporter
+    if _exporter is not None:
+        _exporter.close()
+        _exporter = None
+
+
+# Span API
+
+@contextmanager
+def start_span(name: str, attributes: Optional[Dict[str, Any]] = None, kind: str = "INTERNAL",
+               trace_id: Optional[str] = None, parent_id: Optional[str] = None) -> Iterator[Span]:
+    """
+    Run the block inside a child of the current span (or a new trace)
+
+        with start_span("gemini.generate_content", {"gen_ai.request.model": name}) as span:
+            ...
+            span.set_attribute("gen_ai.usage.output_tokens", tokens)
+    """
+    parent = _current_span.get()
+    if parent is not None and trace_id is None:
+        trace_id, parent_id = parent.trace_id, parent.span_id
+    span = Span(name, trace_id or os.urandom(16).hex(), parent_id, kind, attributes)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.set_error(e)
+        raise
+    finally:
+        span.end_ns = time.time_ns()
+        _current_span.reset(token)
+        exporter = get_exporter()
+        if exporter is not None:
+            exporter.export(span)
+
+
+def parse_traceparent(value: str) -> tuple:
+    """(trace_id, parent span id) from a W3C traceparent header, or (None, None)"""
+    parts = value.strip().split("-")
+    if len(parts) == 4 and len(parts[1]) == 32 and len(parts[2]) == 16 and parts[1] != "0" * 32:
+        try:
+            int(parts[1], 16), int(parts[2], 16)
+            return parts[1], parts[2]
+        except ValueError:
+            pass
+    return None, None
+
+
+class TracingMiddleware:
+    """
+    One SERVER span per HTTP request, continuing an incoming traceparent
+
+    The response carries the request span in traceparent so a client can
+    find its trace in the exported spans
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace_id = parent_id = None
+        for name, value in scope.get("headers", []):
+            if name == b"traceparent":
+                trace_id, parent_id = parse_traceparent(value.decode("latin-1"))
+                break
+
+        attributes = {"http.request.method": scope["method"], "url.path": scope["path"]}
+        with start_span(f"{scope['method']} {scope['path']}", attributes, "SERVER", trace_id, parent_id) as span:
+
+            async def send_with_trace(message):
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.response.status_code", message["status"])
+                    if message["status"] >= 500:
+                        span.status = "ERROR"
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"traceparent", f"00-{span.trace_id}-{span.span_id}-01".encode())
+                    ]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_trace)
+            finally:
+                route = getattr(scope.get("route"), "path", None)
+                if route:
+                    span.name = f"{scope['method']} {route}"
+                    span.set_attribute("http.route", route)
+
+
+# Structured logging
+
+class TraceContextFilter(logging.Filter):
+    """Adds trace_id / span_id of the current span to every record"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        span = _current_span.get()
+        record.trace_id = span.trace_id if span else ""
+        record.span_id = span.span_id if span else ""
+        return True
+
+
+# LogRecord attributes that are not user-supplied extra fields
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "trace_id", "span_id"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record; extra={...} fields become top-level keys"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "trace_id": getattr(record, "trace_id", ""),
+            "span_id": getattr(record, "span_id", ""),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_logging() -> None:
+    """Route the app's loggers to stderr with trace ids, as text or JSON"""
+    handler = logging.StreamHandler()
+    handler.addFilter(TraceContextFilter())
+    if settings.log_format == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s [trace=%(trace_id)s] %(message)s"))
+    logger = logging.getLogger("app")
+    logger.handlers = [handler]
+    logger.setLevel(settings.log_level.upper())
+    logger.propagate = False
@@ -0,0 +1,67 @@
+"""
+Version tokens for cache validation
+Catalog version (shared, from the catalog_meta table) and per-user shortlist versions
+
+Counters live in the configured cache backend (app.cache), so every worker
+hands out the same tokens; with a per-process backend the tokens are
+prefixed with that process's epoch so a restart never reuses one.
+"""
+import time
+from app.cache import get_cache, on_invalidate
+from app.config import get_settings
+from app.database import supabase
+
+settings = get_settings()
+
+_catalog_state = {"db_version": None, "checked_at": 0.0}
+
+
+def _on_catalog_invalidated(key) -> None:
+    # Another worker wrote the catalog: re-read the database counter now
+    _catalog_state["checked_at"] = 0.0
+
+
+on_invalidate("catalog", _on_catalog_invalidated)
+
+
+def get_catalog_version() -> str:
+    """
+    Get the current catalog version token
+
+    The database counter is re-read at most every catalog_version_ttl_seconds,
+    so a burst of polls costs one tiny query instead of one catalog scan each
+    """
+    now = time.monotonic()
+    if _catalog_state["db_version"] is None or now - _catalog_state["checked_at"] >= settings.catalog_version_ttl_seconds:
+        try:
+            result = supabase.table("catalog_meta").select("version").eq("id", 1).execute()
+            if result.data:
+                _catalog_state["db_version"] = result.data[0]["version"]
+        except Exception as e:
+            # Without the table we still version by cache-backed bumps
+            print(f"Warning: Could not read catalog version: {e}")
+        _catalog_state["checked_at"] = now
+
+    cache = get_cache()
+    bumps = cache.counter("catalog_bumps")
+    # The shared database counter alone is stable across restarts and workers
+    if _catalog_state["db_version"] is not None and not bumps:
+        return str(_catalog_state["db_version"])
+    return f"{_catalog_state['db_version']}.{cache.epoch}.{bumps}"
+
+
+def bump_catalog_version() -> None:
+    """Invalidate catalog-derived caches in every worker after a catalog write"""
+    get_cache().incr("catalog_bumps")
+    get_cache().invalidate("catalog")
+
+
+def get_shortlist_version(user_id: str) -> str:
+    """Get the shortlist version token for a user"""
+    cache = get_cache()
+    return f"{cache.epoch}.{cache.counter(f'shortlist:{user_id}')}"
+
+
+def bump_shortlist_version(user_id: str) -> None:
+    """Invalidate a user's shortlist-derived caches after a shortlist write"""
+    get_cache().incr(f"shortlist:{user_id}")
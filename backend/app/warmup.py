@@ -0,0 +1,142 @@
+"""
+Startup warm-up and readiness
+Runs once per process from the FastAPI lifespan, after the server starts
+listening: loads the catalog snapshot (program vocabulary, name index,
+facet counts), scoring rules, and opens the pooled connections to Supabase
+(and Postgres, with data_backend = "sql") and Gemini. GET /ready answers 503 until the required steps have
+succeeded, so load balancers hold traffic while /health already reports
+the process alive.
+
+Required steps (the catalog) are retried until they succeed; optional
+ones (Gemini) are logged and skipped on failure.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from fastapi.concurrency import run_in_threadpool
+from app.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+RETRY_SECONDS = (1, 2, 5, 10, 30)
+
+
+class Readiness:
+    """Warm-up progress for /ready"""
+
+    def __init__(self):
+        self.ready = False
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.steps: Dict[str, Dict[str, Any]] = {}
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "status": "ready" if self.ready else "warming_up",
+            "seconds": round((self.finished_at or time.time()) - self.started_at, 3) if self.started_at else None,
+            "steps": self.steps
+        }
+
+
+readiness = Readiness()
+
+
+def _load_catalog() -> Dict[str, Any]:
+    from app.catalog import get_catalog
+    from app.facets import get_facet_service
+    from app.compact import programs
+
+    snapshot = get_catalog()  # Also opens the pooled Supabase connection
+    snapshot.build_indexes()
+    get_facet_service()
+    return {"universities": len(snapshot.universities), "programs": len(programs), "version": snapshot.version}
+
+
+def _load_rules() -> Dict[str, Any]:
+    from app.scoring_rules import get_rules
+
+    return {"fingerprint": get_rules().fingerprint}
+
+
+def _connect_gemini_sdk() -> Dict[str, Any]:
+    from app.ai_service import get_model
+
+    model = get_model()
+    # count_tokens is free and opens the SDK's channel to the API
+    model.count_tokens("warm-up")
+    return {"model": model.model_name}
+
+
+async def _connect_database() -> Dict[str, Any]:
+    from sqlalchemy import text
+    from app import sql_queries  # noqa: F401  (builds the hot-route statements)
+    from app.database import get_engine
+
+    engine = get_engine()
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+    return {"pool_size": engine.pool.size()}
+
+
+async def _connect_gemini_rest() -> Dict[str, Any]:
+    from app.ai_service import get_http_session
+
+    session = get_http_session()
+    url = f"https://generativelanguage.googleapis.com/v1beta/models?pageSize=1&key={settings.gemini_api_key_analysis}"
+    async with session.get(url) as resp:
+        await resp.read()
+        return {"status": resp.status}
+
+
+def warmup_steps() -> List[Tuple[str, Callable[[], Awaitable[Dict[str, Any]]], bool]]:
+    """(name, coroutine factory, required)"""
+    steps = [
+        ("catalog", lambda: run_in_threadpool(_load_catalog), True),
+        ("scoring_rules", lambda: run_in_threadpool(_load_rules), True),
+    ]
+    if settings.data_backend == "sql":
+        steps.append(("database", _connect_database, True))
+    if settings.warmup_gemini:
+        steps += [
+            ("gemini_sdk", lambda: run_in_threadpool(_connect_gemini_sdk), False),
+            ("gemini_rest", _connect_gemini_rest, False),
+        ]
+    return steps
+
+
+async def _run_step(name: str, step: Callable[[], Awaitable[Dict[str, Any]]], required: bool) -> None:
+    attempt = 0
+    while True:
+        started = time.perf_counter()
+        try:
+            detail = await step()
+            readiness.steps[name] = {"ok": True, "seconds": round(time.perf_counter() - started, 3), **(detail or {})}
+            return
+        except Exception as e:
+            readiness.steps[name] = {"ok": False, "seconds": round(time.perf_counter() - started, 3), "error": str(e)}
+            if not required:
+                logger.warning("Warm-up step failed, continuing without it", extra={"step": name, "error": str(e)})
+                return
+            delay = RETRY_SECONDS[min(attempt, len(RETRY_SECONDS) - 1)]
+            logger.warning("Warm-up step failed, retrying", extra={"step": name, "error": str(e), "retry_in": delay})
+            attempt += 1
+            await asyncio.sleep(delay)
+
+
+async def warm_up() -> None:
+    """Run every warm-up step concurrently, then mark the process ready"""
+    readiness.started_at = time.time()
+    await asyncio.gather(*(_run_step(name, step, required) for name, step, required in warmup_steps()))
+    readiness.finished_at = time.time()
+    readiness.ready = True
+    logger.info("Warm-up finished", extra={"seconds": round(readiness.finished_at - readiness.started_at, 3)})
+
+
+def start_warmup() -> Optional[asyncio.Task]:
+    """Start the warm-up in the background (or mark ready at once when disabled)"""
+    if not settings.warmup_enabled:
+        readiness.ready = True
+        return None
+    return asyncio.create_task(warm_up())
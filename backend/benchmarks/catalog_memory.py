@@ -0,0 +1,66 @@
+"""
+Memory per 100k universities: PostgREST JSON dicts vs compact University records
+
+Rows are round-tripped through JSON first so every string is a separate
+object, as in a decoded PostgREST response. Sizes are measured with
+tracemalloc after the other representation has been released.
+
+Usage:
+    python benchmarks/catalog_memory.py --universities 100000
+"""
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import orjson
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.compact import University
+from app.synthetic import generate_universities
+
+
+def traced(build) -> tuple:
+    """(result, bytes retained by it, seconds to build)"""
+    gc.collect()
+    before = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    return result, tracemalloc.get_traced_memory()[0] - before, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--universities", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    payload = orjson.dumps(list(generate_universities(args.universities, args.seed)))
+    per_100k = 100000 / args.universities
+
+    tracemalloc.start()
+    rows, dict_bytes, dict_seconds = traced(lambda: orjson.loads(payload))
+
+    # Build records from the decoded rows, then drop the rows so only what
+    # the records keep alive is counted
+    records, _, record_seconds = traced(lambda: [University(row) for row in rows])
+    del rows
+    gc.collect()
+    record_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print(f"{args.universities} universities ({len(payload) / 1e6:.1f} MB of JSON)")
+    print(f"{'representation':<22}{'MB / 100k':>12}{'bytes / row':>14}{'build s':>10}")
+    print(f"{'dicts (PostgREST)':<22}{dict_bytes * per_100k / 1e6:>12.1f}{dict_bytes / args.universities:>14.0f}{dict_seconds:>10.2f}")
+    print(f"{'University records':<22}{record_bytes * per_100k / 1e6:>12.1f}{record_bytes / args.universities:>14.0f}{record_seconds:>10.2f}")
+    print(f"Saved {1 - record_bytes / dict_bytes:.0%}")
+    assert len(records) == args.universities
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+In-memory stand-in for the supabase client used by the benchmarks
+
+Implements the slice of the PostgREST query builder the routers call
+(select / eq / gt / lte / ilike / order / range / limit / upsert / execute) over plain
+lists of rows, so endpoint code can be timed without a network round trip.
+Rows are returned as shallow copies, like freshly decoded JSON.
+
+install() must run before any app module is imported.
+"""
+import os
+import sys
+import types
+from typing import Any, Dict, List
+
+
+class FakeResult:
+    def __init__(self, data: List[Dict[str, Any]]):
+        self.data = data
+        self.count = len(data)
+
+
+class FakeQuery:
+    def __init__(self, rows: List[Dict[str, Any]]):
+        self._rows = rows
+        self._filters = []
+        self._order = None
+        self._range = None
+        self._write = False
+
+    def select(self, *columns, **kwargs):
+        return self
+
+    def eq(self, column, value):
+        self._filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def gt(self, column, value):
+        self._filters.append(lambda row: row.get(column) is not None and row[column] > value)
+        return self
+
+    def lte(self, column, value):
+        self._filters.append(lambda row: row.get(column) is not None and row[column] <= value)
+        return self
+
+    def ilike(self, column, pattern):
+        needle = pattern.strip("%").lower()
+        self._filters.append(lambda row: needle in (row.get(column) or "").lower())
+        return self
+
+    def order(self, column, desc=False):
+        self._order = (column, desc)
+        return self
+
+    def range(self, start, end):
+        self._range = (start, end)
+        return self
+
+    def limit(self, count):
+        self._range = (0, count - 1)
+        return self
+
+    def upsert(self, *args, **kwargs):
+        self._write = True
+        return self
+
+    def insert(self, *args, **kwargs):
+        self._write = True
+        return self
+
+    def execute(self) -> FakeResult:
+        if self._write:
+            return FakeResult([])
+        rows = [row for row in self._rows if all(f(row) for f in self._filters)]
+        if self._order:
+            column, desc = self._order
+            rows.sort(key=lambda row: row.get(column), reverse=desc)
+        if self._range:
+            rows = rows[self._range[0]:self._range[1] + 1]
+        return FakeResult([dict(row) for row in rows])
+
+
+class FakeSupabase:
+    """Tables are plain lists of dicts; unknown tables are empty"""
+
+    def __init__(self, tables: Dict[str, List[Dict[str, Any]]] = None):
+        self.tables = tables or {}
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self.tables.setdefault(name, []))
+
+    def rpc(self, name: str, params: Dict[str, Any] = None) -> FakeQuery:
+        return FakeQuery([])
+
+
+def install(client: FakeSupabase) -> FakeSupabase:
+    """Register client as app.database.supabase (and satisfy required settings)"""
+    for key in ("SUPABASE_URL", "SUPABASE_KEY", "SUPABASE_SERVICE_KEY", "GEMINI_API_KEY",
+                "GEMINI_API_KEY_CHAT", "GEMINI_API_KEY_ANALYSIS", "SECRET_KEY"):
+        os.environ.setdefault(key, "benchmark")
+    module = types.ModuleType("app.database")
+    module.supabase = client
+    module.get_supabase = lambda: client
+    module.sql_enabled = lambda: False
+
+    async def close_engine():
+        pass
+
+    module.close_engine = close_engine
+    sys.modules["app.database"] = module
+    return client
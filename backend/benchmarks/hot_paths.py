@@ -0,0 +1,196 @@
+"""
+Benchmark suite for the recommendation and search hot paths
+
+Times the engine functions (calculate_match_score, categorize_university,
+generate_why_fits, identify_risks, extract_keywords) over a whole synthetic
+catalog, and the /universities/recommendations and /universities/ endpoints
+end to end against an in-memory data layer (fake_supabase). Each case runs
+at every catalog size and the results are written as JSON; --compare flags
+cases whose median regressed against a previous run.
+
+Usage:
+    python benchmarks/hot_paths.py --sizes 100,10000 --output bench.json
+    python benchmarks/hot_paths.py --sizes 100,10000 --compare bench.json --threshold 0.2
+    python benchmarks/hot_paths.py --cases search,recommendations_cold
+
+The default sizes include 1,000,000 universities, which needs several GB
+of memory.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fake_supabase import FakeSupabase, install
+
+fake = install(FakeSupabase())
+
+from app import catalog as catalog_module
+from app.catalog import CatalogSnapshot
+from app.recommendation_engine import (
+    calculate_match_score,
+    categorize_university,
+    extract_keywords,
+    generate_why_fits,
+    identify_risks
+)
+from app.recommendation_store import recommendation_store
+from app.routers.universities import get_recommendations, search_universities
+from app.synthetic import PROGRAMS, generate_universities, make_profile
+from app.versioning import get_catalog_version
+
+USER = SimpleNamespace(id="benchmark-user")
+
+
+def load_catalog(size: int, seed: int) -> tuple:
+    """Fill the fake tables and prime the in-memory catalog snapshot"""
+    universities = list(generate_universities(size, seed))
+    profile = {**make_profile(0, seed), "user_id": USER.id, "gpa": 3.4, "budget_max": 55000,
+               "field_of_study": "Computer Science", "gre_gmat_status": "Not Started"}
+    fake.tables.clear()
+    fake.tables["universities"] = universities
+    fake.tables["profiles"] = [profile]
+    fake.tables["catalog_meta"] = [{"id": 1, "version": size}]
+    fake.tables["shortlists"] = [
+        {"user_id": USER.id, "university_id": uni["id"], "bucket": "Target", "is_locked": False}
+        for uni in universities[:10]
+    ]
+    catalog_module._snapshot = CatalogSnapshot(get_catalog_version(), universities)
+    # The engine cases score the same compact records the endpoints use
+    return catalog_module._snapshot.universities, profile
+
+
+def build_cases(universities: list, profile: dict) -> dict:
+    """case name -> (callable, optional per-run setup)"""
+    scores = [calculate_match_score(profile, uni) for uni in universities]
+    programs = list(PROGRAMS)
+    fields = [programs[i % len(programs)] for i in range(len(universities))]
+
+    def clear_recommendations():
+        recommendation_store._memory.clear()
+
+    return {
+        "calculate_match_score": (lambda: [calculate_match_score(profile, uni) for uni in universities], None),
+        "categorize_university": (lambda: [
+            categorize_university(score, uni.get("acceptance_rate", 50), uni.get("ranking"))
+            for score, uni in zip(scores, universities)
+        ], None),
+        "generate_why_fits": (lambda: [generate_why_fits(profile, uni, 0) for uni in universities], None),
+        "identify_risks": (lambda: [identify_risks(profile, uni) for uni in universities], None),
+        "extract_keywords": (lambda: [extract_keywords(field) for field in fields], None),
+        "recommendations_cold": (
+            lambda: asyncio.run(get_recommendations(current_user=USER, limit=20, lean=False)),
+            clear_recommendations
+        ),
+        "recommendations_warm": (lambda: asyncio.run(get_recommendations(current_user=USER, limit=20, lean=False)), None),
+        "recommendations_lean": (lambda: asyncio.run(get_recommendations(current_user=USER, limit=20, lean=True)), None),
+        "search": (lambda: asyncio.run(search_universities(
+            country="USA", min_budget=None, max_budget=60000, field="Computer",
+            has_scholarships=None, min_gpa=None, search=None, page=1, limit=20,
+            current_user=USER
+        )), None),
+    }
+
+
+def measure(fn, setup=None, min_time: float = 0.5, max_runs: int = 30) -> list:
+    """Run fn until min_time has elapsed (at least 3 runs) and return per-run seconds"""
+    if setup:
+        setup()
+    fn()  # warm-up
+    times = []
+    started = time.perf_counter()
+    while len(times) < max_runs and (len(times) < 3 or time.perf_counter() - started < min_time):
+        if setup:
+            setup()
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return times
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def compare(results: list, baseline_path: str, threshold: float) -> list:
+    """Cases whose median is more than threshold slower than the baseline run"""
+    baseline = {
+        (r["case"], r["size"]): r for r in json.loads(Path(baseline_path).read_text())["results"]
+    }
+    regressions = []
+    for result in results:
+        old = baseline.get((result["case"], result["size"]))
+        if old and result["median_ms"] > old["median_ms"] * (1 + threshold):
+            regressions.append({**result, "baseline_median_ms": old["median_ms"]})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100,10000,1000000", help="Comma-separated catalog sizes")
+    parser.add_argument("--cases", default="", help="Comma-separated case names (default: all)")
+    parser.add_argument("--min-time", type=float, default=0.5, help="Seconds to keep repeating each case")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="Write results JSON here (default: stdout)")
+    parser.add_argument("--compare", help="Baseline results JSON to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed median slowdown vs baseline")
+    args = parser.parse_args()
+
+    selected = set(filter(None, args.cases.split(",")))
+    results = []
+    for size in (int(s) for s in args.sizes.split(",")):
+        universities, profile = load_catalog(size, args.seed)
+        for name, (fn, setup) in build_cases(universities, profile).items():
+            if selected and name not in selected:
+                continue
+            times = measure(fn, setup, args.min_time)
+            median = statistics.median(times)
+            results.append({
+                "case": name,
+                "size": size,
+                "runs": len(times),
+                "min_ms": round(min(times) * 1000, 3),
+                "median_ms": round(median * 1000, 3),
+                "mean_ms": round(statistics.mean(times) * 1000, 3),
+                "ops_per_sec": round(1 / median, 2) if median else None,
+            })
+            print(f"{name:<24}{size:>10}{median * 1000:>14.3f} ms", file=sys.stderr)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(payload)
+    else:
+        print(payload)
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        for r in regressions:
+            print(f"REGRESSION {r['case']} @ {r['size']}: {r['baseline_median_ms']} -> {r['median_ms']} ms", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
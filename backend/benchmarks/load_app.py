@@ -0,0 +1,28 @@
+"""
+ASGI entry point for the load test: app.main over the in-memory data layer
+
+Each worker fills fake_supabase with the same synthetic catalog
+(LOAD_TEST_UNIVERSITIES rows, default 2000) before the app is imported,
+so requests are CPU-bound in the app itself rather than waiting on Supabase.
+
+    python -m app.serve --app load_app:app   (run from backend/ with benchmarks/ on PYTHONPATH)
+"""
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fake_supabase import FakeSupabase, install
+
+os.environ.setdefault("WARMUP_GEMINI", "false")
+os.environ.setdefault("QUERY_DEBUG", "false")
+fake = install(FakeSupabase())
+
+from app.synthetic import generate_universities
+
+SIZE = int(os.environ.get("LOAD_TEST_UNIVERSITIES", 2000))
+fake.tables["universities"] = list(generate_universities(SIZE, seed=7))
+fake.tables["catalog_meta"] = [{"id": 1, "version": SIZE}]
+
+from app.main import app  # noqa: E402
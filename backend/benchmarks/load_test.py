@@ -0,0 +1,190 @@
+"""
+Multi-worker load test: throughput at 1, 2, 4 ... workers
+
+Starts `python -m app.serve --app load_app:app` (app.main over the
+in-memory data layer, see load_app.py) once per worker count, waits for
+/ready, then drives it for --duration seconds from --clients client
+processes, each holding --connections keep-alive connections. Requests
+rotate over /universities/facets and /universities/{id}, both served from
+the catalog snapshot. Prints requests per second, p50/p99 latency and
+scaling efficiency (rps / (workers x single-worker rps)); --min-efficiency
+makes it exit 1 when scaling falls short, so it can gate CI.
+
+Give the clients their own cores: on a machine with C cores, test up to
+about C/2 workers. Use --cache to compare backends (memory is per-process
+and only valid for one worker).
+
+Usage:
+    python benchmarks/load_test.py --workers 1,2,4 --duration 10
+    python benchmarks/load_test.py --workers 1,2 --cache redis --server uvicorn
+    python benchmarks/load_test.py --workers 1,2,4 --min-efficiency 0.8
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port: int, workers: int, cache: str, server: str, timeout: float = 60.0) -> subprocess.Popen:
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([str(BENCHMARKS_DIR), str(BACKEND_DIR)]),
+           "CACHE_BACKEND": cache, "LOG_LEVEL": "WARNING"}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "app.serve", "--app", "load_app:app", "--host", "127.0.0.1",
+         "--port", str(port), "--workers", str(workers), "--server", server],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+    )
+    # Every worker warms up on its own; poll until /ready has answered 200 a few times in a row
+    deadline = time.monotonic() + timeout
+    ready_in_a_row = 0
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"Server exited:\n{process.stderr.read().decode()[-2000:]}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/ready", timeout=2) as response:
+                ready_in_a_row = ready_in_a_row + 1 if response.status == 200 else 0
+        except (urllib.error.URLError, ConnectionError):
+            ready_in_a_row = 0
+        if ready_in_a_row >= workers * 3:
+            return process
+        time.sleep(0.05)
+    stop_server(process)
+    raise SystemExit(f"Server with {workers} worker(s) not ready within {timeout:.0f}s")
+
+
+def stop_server(process: subprocess.Popen) -> None:
+    process.terminate()
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+async def _connection(port: int, paths: list, offset: int, stop_at: float, latencies: list, errors: list) -> None:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    index = offset
+    try:
+        while time.perf_counter() < stop_at:
+            path = paths[index % len(paths)]
+            index += 1
+            started = time.perf_counter()
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\nAccept: application/json\r\n\r\n".encode())
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in head.split(b"\r\n"):
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+            await reader.readexactly(length)
+            if not head.startswith(b"HTTP/1.1 200"):
+                errors.append(head.split(b"\r\n", 1)[0].decode())
+            latencies.append(time.perf_counter() - started)
+    finally:
+        writer.close()
+
+
+def _client(port: int, paths: list, connections: int, seed: int, start_at: float, duration: float, results) -> None:
+    """One client process: `connections` keep-alive loops until the deadline"""
+    latencies, errors = [], []
+
+    async def run():
+        await asyncio.sleep(max(0.0, start_at - time.time()))
+        stop_at = time.perf_counter() + duration
+        await asyncio.gather(*(
+            _connection(port, paths, seed * 7919 + i * 104729, stop_at, latencies, errors)
+            for i in range(connections)
+        ))
+
+    asyncio.run(run())
+    results.put((latencies, errors[:5], len(errors)))
+
+
+def drive(port: int, paths: list, clients: int, connections: int, duration: float) -> dict:
+    results = multiprocessing.Queue()
+    start_at = time.time() + 0.5  # All clients start together
+    processes = [
+        multiprocessing.Process(target=_client, args=(port, paths, connections, i, start_at, duration, results))
+        for i in range(clients)
+    ]
+    for process in processes:
+        process.start()
+    latencies, samples, error_count = [], [], 0
+    for _ in processes:
+        client_latencies, client_samples, client_errors = results.get()
+        latencies += client_latencies
+        samples += client_samples
+        error_count += client_errors
+    for process in processes:
+        process.join()
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "rps": len(latencies) / duration,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000 if latencies else 0.0,
+        "errors": error_count,
+        "error_samples": samples[:5],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated worker counts")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per worker count")
+    parser.add_argument("--clients", type=int, default=None, help="Client processes (default: max workers)")
+    parser.add_argument("--connections", type=int, default=16, help="Keep-alive connections per client process")
+    parser.add_argument("--cache", choices=("shared", "redis", "memory", "none"), default="shared")
+    parser.add_argument("--server", choices=("auto", "gunicorn", "uvicorn"), default="auto")
+    parser.add_argument("--universities", type=int, default=2000, help="Synthetic catalog size")
+    parser.add_argument("--min-efficiency", type=float, default=None, help="Exit 1 below this scaling efficiency")
+    args = parser.parse_args()
+
+    worker_counts = [int(n) for n in args.workers.split(",")]
+    clients = args.clients or max(worker_counts)
+    os.environ["LOAD_TEST_UNIVERSITIES"] = str(args.universities)
+    paths = ["/universities/facets"] + [f"/universities/{i}" for i in range(1, min(args.universities, 200) + 1)]
+    print(f"{os.cpu_count()} CPU cores, {clients} client processes x {args.connections} connections, "
+          f"{args.duration:.0f}s per run, cache={args.cache}\n")
+    print(f"{'workers':>8}{'requests':>10}{'rps':>10}{'p50 ms':>9}{'p99 ms':>9}{'errors':>8}{'efficiency':>12}")
+
+    baseline = None
+    worst = None
+    for workers in worker_counts:
+        port = _free_port()
+        server = start_server(port, workers, args.cache, args.server)
+        try:
+            result = drive(port, paths, clients, args.connections, args.duration)
+        finally:
+            stop_server(server)
+        if baseline is None:
+            baseline = result["rps"] / worker_counts[0]
+        efficiency = result["rps"] / (workers * baseline) if baseline else 0.0
+        if workers > worker_counts[0]:
+            worst = efficiency if worst is None else min(worst, efficiency)
+        print(f"{workers:>8}{result['requests']:>10}{result['rps']:>10.0f}{result['p50_ms']:>9.1f}"
+              f"{result['p99_ms']:>9.1f}{result['errors']:>8}{efficiency:>11.0%}")
+        for sample in result["error_samples"]:
+            print(f"{'':>8}error: {sample}")
+
+    if args.min_efficiency is not None and worst is not None and worst < args.min_efficiency:
+        print(f"\nScaling efficiency {worst:.0%} is below {args.min_efficiency:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
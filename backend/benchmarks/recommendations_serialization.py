@@ -0,0 +1,97 @@
+"""
+Serialization time and bytes on the wire for GET /universities/recommendations
+
+Compares FastAPI's default path (jsonable_encoder + stdlib json) against
+orjson, and reports gzip / brotli sizes at the configured levels.
+
+Usage:
+    python benchmarks/recommendations_serialization.py --limit 50
+"""
+import argparse
+import gzip
+import json
+import sys
+import time
+from pathlib import Path
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.recommendation_engine import (
+    calculate_match_score,
+    categorize_university,
+    generate_why_fits,
+    identify_risks
+)
+from app.synthetic import generate_universities
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+PROFILE = {
+    "gpa": 3.4,
+    "budget_max": 55000,
+    "preferred_countries": ["USA", "Canada"],
+    "field_of_study": "Computer Science",
+    "ielts_toefl_status": "Completed",
+    "ielts_toefl_score": 7.0,
+    "gre_gmat_status": "Not Started",
+}
+
+
+def build_payload(limit: int) -> dict:
+    """Same shape as get_recommendations returns"""
+    recommendations = []
+    for uni in generate_universities(limit, seed=7):
+        score = calculate_match_score(PROFILE, uni)
+        recommendations.append({
+            **uni,
+            "match_score": score,
+            "category": categorize_university(score, uni.get("acceptance_rate", 50), uni.get("ranking")),
+            "why_fits": generate_why_fits(PROFILE, uni, score),
+            "risks": identify_risks(PROFILE, uni),
+            "total_annual_cost": uni["tuition_max"] + uni["living_cost_yearly"],
+            "shortlist_info": None,
+        })
+    return {"recommendations": recommendations, "total": limit, "user_profile_summary": PROFILE}
+
+
+def timed(fn, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+
+    payload = build_payload(args.limit)
+
+    default_ms = timed(lambda: json.dumps(jsonable_encoder(payload)).encode(), args.repeat)
+    orjson_ms = timed(lambda: orjson.dumps(payload), args.repeat)
+    body = orjson.dumps(payload)
+
+    print(f"Recommendations payload, limit={args.limit}")
+    print(f"  jsonable_encoder + json : {default_ms:8.3f} ms")
+    print(f"  orjson (direct response): {orjson_ms:8.3f} ms  ({default_ms / orjson_ms:.1f}x faster)")
+    print()
+    print(f"  identity : {len(body):>8} bytes")
+    gzip_ms = timed(lambda: gzip.compress(body, compresslevel=6), 50)
+    print(f"  gzip -6  : {len(gzip.compress(body, compresslevel=6)):>8} bytes  ({gzip_ms:.3f} ms)")
+    if brotli is not None:
+        br_ms = timed(lambda: brotli.compress(body, quality=4), 50)
+        print(f"  brotli q4: {len(brotli.compress(body, quality=4)):>8} bytes  ({br_ms:.3f} ms)")
+    else:
+        print("  brotli   : not installed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Parity check and benchmark for score_matrix.score_matrix
+
+The parity check compares every cell of a small matrix against
+calculate_match_score / categorize_university; the benchmark times the
+full M x N matrix (10k x 10k by default).
+
+Usage:
+    python benchmarks/score_matrix.py --check-only
+    python benchmarks/score_matrix.py --profiles 10000 --universities 10000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.recommendation_engine import calculate_match_score, categorize_university
+from app.score_matrix import CATEGORY_LABELS, score_matrix
+from app.synthetic import generate_profiles, generate_universities
+
+def check_parity(profiles: list, catalog: list) -> int:
+    scores, categories = score_matrix(profiles, catalog, chunk_size=7)
+    mismatches = 0
+    for i, profile in enumerate(profiles):
+        for j, uni in enumerate(catalog):
+            expected = calculate_match_score(profile, uni)
+            expected_category = categorize_university(expected, uni.get("acceptance_rate", 50), uni.get("ranking"))
+            if scores[i, j] != expected or CATEGORY_LABELS[categories[i, j]] != expected_category:
+                mismatches += 1
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", type=int, default=10000)
+    parser.add_argument("--universities", type=int, default=10000)
+    parser.add_argument("--chunk-size", type=int, default=256)
+    parser.add_argument("--check-only", action="store_true")
+    args = parser.parse_args()
+
+    # Parity on a small sample covering the null / boundary cases
+    sample_unis = list(generate_universities(200, seed=11))
+    for uni in sample_unis[::5]:
+        uni["min_gpa"] = None
+        uni["tuition_max"] = 0
+    for uni in sample_unis[1::7]:
+        uni["min_ielts"] = None
+        uni["programs_offered"] = []
+    sample_profiles = list(generate_profiles(200, seed=11))
+    for profile in sample_profiles[::6]:
+        profile["gpa"] = None
+        profile["budget_max"] = 0
+        profile["ielts_toefl_score"] = None
+    mismatches = check_parity(sample_profiles, sample_unis)
+    print(f"Parity: {len(sample_profiles) * len(sample_unis)} pairs, {mismatches} mismatches")
+    if mismatches:
+        sys.exit(1)
+    if args.check_only:
+        return
+
+    catalog = list(generate_universities(args.universities, seed=12))
+    profiles = list(generate_profiles(args.profiles, seed=12))
+
+    started = time.perf_counter()
+    scores, _ = score_matrix(profiles, catalog, chunk_size=args.chunk_size)
+    elapsed = time.perf_counter() - started
+    pairs = scores.size
+    print(f"score_matrix {args.profiles} x {args.universities}: {elapsed:.2f}s ({pairs / elapsed / 1e6:.1f}M pairs/sec)")
+
+    loop_sample = profiles[:20]
+    started = time.perf_counter()
+    for profile in loop_sample:
+        for uni in catalog:
+            calculate_match_score(profile, uni)
+    loop_rate = len(loop_sample) * len(catalog) / (time.perf_counter() - started)
+    print(f"calculate_match_score loop: {loop_rate / 1e6:.2f}M pairs/sec (score_matrix is {pairs / elapsed / loop_rate:.0f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
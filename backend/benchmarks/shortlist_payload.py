@@ -0,0 +1,68 @@
+"""
+Payload size and serialization time for GET /shortlist/ by projection
+
+Builds a synthetic 50-item shortlist shaped like the PostgREST response and
+compares the old universities(*) embedding against each named projection.
+
+Usage:
+    python benchmarks/shortlist_payload.py --items 50
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.projections import UNIVERSITY_PROJECTIONS, UNIVERSITY_COLUMNS
+from app.synthetic import generate_universities
+
+
+def build_response(rows: list[dict], columns) -> dict:
+    """Mirror the grouped structure returned by get_user_shortlist"""
+    items = []
+    for i, uni in enumerate(rows):
+        items.append({
+            "shortlist_id": i + 1,
+            "university_id": uni["id"],
+            "university": uni if columns is None else {c: uni[c] for c in columns},
+            "bucket": ("Dream", "Target", "Safe")[i % 3],
+            "is_locked": i < 4,
+            "why_fits": "Your GPA exceeds the minimum requirement. Offers scholarships.",
+            "risks": "No major risks identified. Good fit overall.",
+            "added_at": "2026-01-01T00:00:00+00:00",
+        })
+    return {"shortlist": {"items": items}, "counts": {"total": len(items)}, "is_locked": False}
+
+
+def measure(payload: dict, repeat: int) -> tuple[int, float]:
+    body = json.dumps(payload).encode()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        json.dumps(payload).encode()
+    per_call_ms = (time.perf_counter() - started) / repeat * 1000
+    return len(body), per_call_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    rows = list(generate_universities(args.items, seed=42))
+
+    variants = {"universities(*)": None, **UNIVERSITY_PROJECTIONS}
+    baseline_bytes, baseline_ms = measure(build_response(rows, variants.pop("universities(*)")), args.repeat)
+
+    print(f"{args.items}-item shortlist ({len(UNIVERSITY_COLUMNS)} university columns available)")
+    print(f"{'variant':<18}{'bytes':>10}{'ms/serialize':>15}{'bytes saved':>14}")
+    print(f"{'universities(*)':<18}{baseline_bytes:>10}{baseline_ms:>15.3f}{'-':>14}")
+    for name, columns in variants.items():
+        size, ms = measure(build_response(rows, columns), args.repeat)
+        print(f"{name:<18}{size:>10}{ms:>15.3f}{(1 - size / baseline_bytes):>13.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Cold-start benchmark: import time of app.main and time to first request
+
+Import time comes from `python -X importtime -c "import app.main"` in a
+fresh interpreter (median of --runs), with the slowest modules listed.
+Time to first request starts uvicorn in a subprocess and polls /health
+(or /ready with --endpoint /ready, to include the warm-up) until it
+answers 200. Both are checked against targets and the script
+exits 1 when either is missed, so it can gate CI.
+
+Needs the normal backend environment (.env or SUPABASE_* / GEMINI_* /
+SECRET_KEY variables); no request reaches Supabase or Gemini.
+
+Usage:
+    python benchmarks/startup.py
+    python benchmarks/startup.py --runs 5 --import-target-ms 600 --first-request-target-ms 1500
+    python benchmarks/startup.py --top 30 --skip-server
+    python benchmarks/startup.py --endpoint /ready --first-request-target-ms 5000
+"""
+import argparse
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Targets with the Supabase client and Gemini model built on first use and
+# numpy / SQLAlchemy kept off the import path
+IMPORT_TARGET_MS = 800
+FIRST_REQUEST_TARGET_MS = 2000
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+# Modules that should no longer load when the app starts
+DEFERRED_MODULES = ("google.generativeai", "supabase", "sqlalchemy", "numpy", "aiohttp")
+
+
+def measure_imports(module: str) -> dict:
+    """Parse one -X importtime run: total microseconds and per-module timings"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"import {module} failed:\n{result.stderr[-2000:]}")
+    modules = {}
+    total_us = 0
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = int(match[1]), int(match[2]), match[3], match[4]
+        modules[name] = (self_us, cumulative_us)
+        if len(indent) == 1:  # Top-level imports add up to the total
+            total_us += cumulative_us
+    return {"total_us": total_us, "modules": modules}
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure_first_request(endpoint: str = "/health", timeout: float = 30.0) -> float:
+    """Seconds from spawning uvicorn until GET endpoint answers 200"""
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}{endpoint}"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if server.poll() is not None:
+                raise SystemExit(f"uvicorn exited:\n{server.stderr.read().decode()[-2000:]}")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.005)
+        raise SystemExit(f"No answer from {url} within {timeout:.0f}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15, help="Slowest modules to list")
+    parser.add_argument("--import-target-ms", type=float, default=IMPORT_TARGET_MS)
+    parser.add_argument("--first-request-target-ms", type=float, default=FIRST_REQUEST_TARGET_MS)
+    parser.add_argument("--endpoint", default="/health", help="Polled until 200 (/ready includes the warm-up)")
+    parser.add_argument("--skip-server", action="store_true", help="Only measure import time")
+    args = parser.parse_args()
+
+    runs = [measure_imports(args.module) for _ in range(args.runs)]
+    import_ms = statistics.median(run["total_us"] for run in runs) / 1000
+    modules = runs[-1]["modules"]
+
+    print(f"import {args.module}: {import_ms:.0f} ms (median of {args.runs}, target {args.import_target_ms:.0f} ms)")
+    print(f"\n{'module':<50}{'self ms':>10}{'cumulative ms':>15}")
+    for name, (self_us, cumulative_us) in sorted(modules.items(), key=lambda item: -item[1][1])[:args.top]:
+        print(f"{name:<50}{self_us / 1000:>10.1f}{cumulative_us / 1000:>15.1f}")
+
+    loaded = [name for name in DEFERRED_MODULES if name in modules]
+    if loaded:
+        print(f"\nLoaded at startup but expected to be deferred: {', '.join(loaded)}")
+
+    failed = import_ms > args.import_target_ms
+    if not args.skip_server:
+        first_ms = statistics.median(measure_first_request(args.endpoint) for _ in range(args.runs)) * 1000
+        print(f"\ntime to first {args.endpoint} 200: {first_ms:.0f} ms (median of {args.runs}, target {args.first_request_target_ms:.0f} ms)")
+        failed = failed or first_ms > args.first_request_target_ms
+
+    if failed:
+        print("\nStartup target missed")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
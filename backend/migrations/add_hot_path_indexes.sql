@@ -0,0 +1,59 @@
+-- Indexes for the query shapes the routers issue
+-- Every per-user read filters on user_id (often with a sort), and the
+-- university search filters on country, name substrings and programs.
+-- Without these each of them is a sequential scan that grows with the table.
+-- Check the plans with: python benchmarks/explain_queries.py
+-- Run this in Supabase SQL Editor
+--
+-- On a large live table, run a statement on its own as CREATE INDEX
+-- CONCURRENTLY (outside a transaction) to avoid blocking writes while it builds.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Shortlists
+-- Dashboard / shortlist / lock: WHERE user_id = ? [AND is_locked = true]
+CREATE INDEX IF NOT EXISTS idx_shortlists_user_locked
+ON public.shortlists (user_id, is_locked);
+
+-- Add / remove / AI actions: WHERE user_id = ? AND university_id = ?
+-- (same name as the constraint in fix_shortlists_table.sql, so this is a no-op where it exists)
+CREATE UNIQUE INDEX IF NOT EXISTS shortlists_user_uni_unique
+ON public.shortlists (user_id, university_id);
+
+-- Joins from universities and ON DELETE CASCADE when a university is removed
+CREATE INDEX IF NOT EXISTS idx_shortlists_university_id
+ON public.shortlists (university_id);
+
+-- Chat: WHERE user_id = ? [AND timestamp >= ?] ORDER BY timestamp DESC LIMIT n
+CREATE INDEX IF NOT EXISTS idx_chat_history_user_timestamp
+ON public.chat_history (user_id, "timestamp" DESC);
+
+-- Tasks: WHERE user_id = ? ORDER BY created_at DESC
+CREATE INDEX IF NOT EXISTS idx_tasks_user_created
+ON public.tasks (user_id, created_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_custom_tasks_user_created
+ON public.custom_tasks (user_id, created_at DESC);
+
+-- Covered by the index above (user_id is its leading column)
+DROP INDEX IF EXISTS public.idx_custom_tasks_user_id;
+
+-- Universities
+-- Search filter: WHERE country = ? (already in create_universities_table.sql)
+CREATE INDEX IF NOT EXISTS idx_universities_country
+ON public.universities (country);
+
+-- Search: name ILIKE '%term%' can use a trigram index; a btree cannot
+CREATE INDEX IF NOT EXISTS idx_universities_name_trgm
+ON public.universities USING GIN (name gin_trgm_ops);
+
+-- Program filters: programs_offered @> ARRAY['Computer Science'] / && ARRAY[...]
+CREATE INDEX IF NOT EXISTS idx_universities_programs
+ON public.universities USING GIN (programs_offered);
+
+-- Refresh planner statistics so the new indexes are considered right away
+ANALYZE public.shortlists;
+ANALYZE public.chat_history;
+ANALYZE public.tasks;
+ANALYZE public.custom_tasks;
+ANALYZE public.universities;
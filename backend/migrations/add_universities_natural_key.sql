@@ -0,0 +1,43 @@
+-- Natural key for universities so seeding and imports can upsert idempotently
+-- Merges existing duplicate (name, country) rows into the oldest one first,
+-- moving shortlist entries across (locked entries win on collision)
+-- Run this in Supabase SQL Editor
+
+BEGIN;
+
+CREATE TEMP TABLE university_duplicates ON COMMIT DROP AS
+SELECT id, keep_id
+FROM (
+    SELECT id, MIN(id) OVER (PARTITION BY name, country) AS keep_id
+    FROM public.universities
+) grouped
+WHERE id <> keep_id;
+
+-- One shortlist row per user and surviving university
+DELETE FROM public.shortlists
+WHERE id IN (
+    SELECT id FROM (
+        SELECT s.id,
+               ROW_NUMBER() OVER (
+                   PARTITION BY s.user_id, COALESCE(d.keep_id, s.university_id)
+                   ORDER BY s.is_locked DESC, (d.id IS NULL) DESC, s.id
+               ) AS rn
+        FROM public.shortlists s
+        LEFT JOIN university_duplicates d ON d.id = s.university_id
+    ) ranked
+    WHERE rn > 1
+);
+
+UPDATE public.shortlists s
+SET university_id = d.keep_id
+FROM university_duplicates d
+WHERE s.university_id = d.id;
+
+DELETE FROM public.universities u
+USING university_duplicates d
+WHERE u.id = d.id;
+
+ALTER TABLE public.universities DROP CONSTRAINT IF EXISTS universities_name_country_key;
+ALTER TABLE public.universities ADD CONSTRAINT universities_name_country_key UNIQUE (name, country);
+
+COMMIT;
@@ -0,0 +1,116 @@
+-- Ranked full-text university search
+-- search_universities used name ILIKE '%term%': a sequential scan that only
+-- looked at the name. This adds a weighted tsvector over name, city,
+-- country, programs and description (GIN-indexed), trigram matching on the
+-- name for typos, and an RPC that returns one page of the matches, most
+-- relevant first, with their total.
+-- The API calls the RPC when search_backend = "database"; by default it
+-- searches its in-memory index (app.search) with the same weights, and it
+-- falls back to that index while the RPC is missing.
+-- Run this in Supabase SQL Editor
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- The search document for one university
+-- An expression index rather than a stored generated column: the routers and
+-- the catalog loader read universities with select("*"), and a tsvector
+-- column would be returned (and cached) with every row.
+-- IMMUTABLE so it can be indexed; the text search configuration is fixed.
+CREATE OR REPLACE FUNCTION public.university_search_vector(
+    p_name TEXT,
+    p_city TEXT,
+    p_country TEXT,
+    p_programs TEXT[],
+    p_description TEXT
+)
+RETURNS tsvector
+LANGUAGE sql
+IMMUTABLE PARALLEL SAFE
+AS $$
+    SELECT setweight(to_tsvector('english'::regconfig, coalesce(p_name, '')), 'A')
+        || setweight(to_tsvector('english'::regconfig, coalesce(p_city, '')), 'B')
+        || setweight(to_tsvector('english'::regconfig, coalesce(p_country, '')), 'B')
+        || setweight(to_tsvector('english'::regconfig, coalesce(array_to_string(p_programs, ' '), '')), 'B')
+        || setweight(to_tsvector('english'::regconfig, coalesce(p_description, '')), 'D');
+$$;
+
+CREATE INDEX IF NOT EXISTS idx_universities_search
+ON public.universities USING GIN (
+    public.university_search_vector(name, city, country, programs_offered, description)
+);
+
+-- Typo-tolerant name matching (also in add_hot_path_indexes.sql)
+CREATE INDEX IF NOT EXISTS idx_universities_name_trgm
+ON public.universities USING GIN (name gin_trgm_ops);
+
+-- One page of the universities matching the query, most relevant first
+-- Full-text match on any field, or a close trigram match on the name
+-- ("stanfrod", "stanf"), with every filter search_universities offers
+-- (budget is tuition_max + living_cost_yearly; field matches any offered
+-- program containing it, case-insensitively). Returns
+-- {"total": <all matches>, "universities": [<the page>]}, so the API reads
+-- one page however many universities match.
+-- The first version returned SETOF universities capped at p_limit rows.
+DROP FUNCTION IF EXISTS public.search_universities_ranked(TEXT, TEXT, BOOLEAN, NUMERIC, INTEGER);
+
+CREATE OR REPLACE FUNCTION public.search_universities_ranked(
+    p_query TEXT,
+    p_country TEXT DEFAULT NULL,
+    p_has_scholarships BOOLEAN DEFAULT NULL,
+    p_min_gpa NUMERIC DEFAULT NULL,
+    p_min_budget NUMERIC DEFAULT NULL,
+    p_max_budget NUMERIC DEFAULT NULL,
+    p_field TEXT DEFAULT NULL,
+    p_limit INTEGER DEFAULT 20,
+    p_offset INTEGER DEFAULT 0
+)
+RETURNS jsonb
+LANGUAGE sql
+STABLE
+SET search_path = public, extensions
+AS $$
+    WITH matches AS (
+        SELECT u AS university,
+               u.id,
+               u.ranking,
+               ts_rank_cd(public.university_search_vector(u.name, u.city, u.country, u.programs_offered, u.description), q)
+                   + word_similarity(p_query, u.name) AS relevance,
+               count(*) OVER () AS total
+        FROM public.universities u,
+             websearch_to_tsquery('english'::regconfig, p_query) AS q
+        WHERE (
+                public.university_search_vector(u.name, u.city, u.country, u.programs_offered, u.description) @@ q
+                OR p_query <% u.name
+              )
+          AND (p_country IS NULL OR u.country = p_country)
+          AND (p_has_scholarships IS NULL OR u.has_scholarships = p_has_scholarships)
+          AND (p_min_gpa IS NULL OR u.min_gpa <= p_min_gpa)
+          AND (NULLIF(p_min_budget, 0) IS NULL
+               OR coalesce(u.tuition_max, 0) + coalesce(u.living_cost_yearly, 0) >= p_min_budget)
+          AND (NULLIF(p_max_budget, 0) IS NULL
+               OR coalesce(u.tuition_max, 0) + coalesce(u.living_cost_yearly, 0) <= p_max_budget)
+          AND (NULLIF(p_field, '') IS NULL OR EXISTS (
+                SELECT 1 FROM unnest(u.programs_offered) AS program
+                WHERE strpos(lower(program), lower(p_field)) > 0
+              ))
+    ),
+    page AS (
+        SELECT * FROM matches
+        ORDER BY relevance DESC, ranking NULLS LAST, id
+        LIMIT p_limit OFFSET p_offset
+    )
+    SELECT jsonb_build_object(
+        -- count(*) OVER () rides on the page rows; past the last page there
+        -- are none, so count the matches directly
+        'total', coalesce((SELECT max(total) FROM page), (SELECT count(*) FROM matches)),
+        'universities', coalesce(
+            (SELECT jsonb_agg(to_jsonb(university) ORDER BY relevance DESC, ranking NULLS LAST, id) FROM page),
+            '[]'::jsonb
+        )
+    );
+$$;
+
+GRANT EXECUTE ON FUNCTION public.search_universities_ranked(TEXT, TEXT, BOOLEAN, NUMERIC, NUMERIC, NUMERIC, TEXT, INTEGER, INTEGER)
+TO service_role;
+
+ANALYZE public.universities;
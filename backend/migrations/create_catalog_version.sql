@@ -0,0 +1,42 @@
+-- Catalog version counter for cache validation (ETags, in-memory catalog)
+-- Any write to universities bumps the version, so seeding and manual edits
+-- invalidate cached catalog reads automatically
+-- Run this in Supabase SQL Editor
+
+CREATE TABLE IF NOT EXISTS public.catalog_meta (
+    id SMALLINT PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+    version BIGINT NOT NULL DEFAULT 1,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+INSERT INTO public.catalog_meta (id, version)
+VALUES (1, 1)
+ON CONFLICT (id) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION public.bump_catalog_version()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    UPDATE public.catalog_meta
+    SET version = version + 1, updated_at = NOW()
+    WHERE id = 1;
+    RETURN NULL;
+END;
+$$;
+
+-- Statement-level so a bulk load bumps the version once, not per row
+DROP TRIGGER IF EXISTS universities_bump_catalog_version ON public.universities;
+CREATE TRIGGER universities_bump_catalog_version
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.universities
+FOR EACH STATEMENT
+EXECUTE FUNCTION public.bump_catalog_version();
+
+-- Everyone may read the version, only the backend writes it
+ALTER TABLE public.catalog_meta ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Allow public read access to catalog_meta" ON public.catalog_meta;
+CREATE POLICY "Allow public read access to catalog_meta"
+ON public.catalog_meta FOR SELECT
+TO public
+USING (true);
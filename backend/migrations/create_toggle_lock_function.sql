@@ -0,0 +1,71 @@
+-- Atomic shortlist lock toggle
+-- Checks the lock limit, flips is_locked and inserts the guidance tasks in a
+-- single transaction so the backend needs one round trip (supabase.rpc).
+-- Run this in Supabase SQL Editor
+
+CREATE OR REPLACE FUNCTION toggle_shortlist_lock(
+    p_shortlist_id INTEGER,
+    p_user_id UUID,
+    p_max_locked INTEGER DEFAULT 4
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_is_locked BOOLEAN;
+    v_uni_name TEXT;
+    v_locked_count INTEGER;
+BEGIN
+    -- Serialize lock changes per user so concurrent requests cannot both
+    -- pass the limit check before either update is visible
+    PERFORM pg_advisory_xact_lock(hashtext('shortlist_lock:' || p_user_id::text));
+
+    SELECT s.is_locked, COALESCE(u.name, 'University')
+    INTO v_is_locked, v_uni_name
+    FROM shortlists s
+    LEFT JOIN universities u ON u.id = s.university_id
+    WHERE s.id = p_shortlist_id AND s.user_id = p_user_id
+    FOR UPDATE OF s;
+
+    IF NOT FOUND THEN
+        RETURN jsonb_build_object('status', 'not_found');
+    END IF;
+
+    -- Unlocking never hits the limit
+    IF COALESCE(v_is_locked, FALSE) THEN
+        UPDATE shortlists SET is_locked = FALSE WHERE id = p_shortlist_id;
+        RETURN jsonb_build_object('status', 'ok', 'is_locked', FALSE);
+    END IF;
+
+    SELECT COUNT(*) INTO v_locked_count
+    FROM shortlists
+    WHERE user_id = p_user_id AND is_locked = TRUE;
+
+    IF v_locked_count >= p_max_locked THEN
+        RETURN jsonb_build_object('status', 'limit_reached', 'locked_count', v_locked_count);
+    END IF;
+
+    UPDATE shortlists SET is_locked = TRUE WHERE id = p_shortlist_id;
+
+    -- Guidance tasks for the newly locked university
+    INSERT INTO custom_tasks (user_id, title, description, category, is_complete)
+    VALUES
+        (p_user_id,
+         'Submit Application to ' || v_uni_name,
+         'Complete and submit the online application form for ' || v_uni_name || '. Check deadline!',
+         'application', FALSE),
+        (p_user_id,
+         'Customize SOP for ' || v_uni_name,
+         'Tailor your Statement of Purpose to highlight why you fit ' || v_uni_name || ' specifically.',
+         'document', FALSE),
+        (p_user_id,
+         'Check Scholarship Deadlines (' || v_uni_name || ')',
+         'Research and note down external funding or scholarship deadlines.',
+         'financial', FALSE);
+
+    RETURN jsonb_build_object('status', 'ok', 'is_locked', TRUE, 'locked_count', v_locked_count + 1);
+END;
+$$;
+
+-- Backend calls this with the service role key
+GRANT EXECUTE ON FUNCTION toggle_shortlist_lock(INTEGER, UUID, INTEGER) TO service_role;
@@ -0,0 +1,24 @@
+-- Materialized per-user recommendation results
+-- Each row holds a user's ranked top-N stamped with the inputs it was computed from
+-- Run this in Supabase SQL Editor
+
+CREATE TABLE IF NOT EXISTS public.user_recommendations (
+    user_id UUID PRIMARY KEY REFERENCES auth.users(id) ON DELETE CASCADE,
+    profile_hash TEXT NOT NULL,
+    catalog_version TEXT NOT NULL,
+    total INTEGER NOT NULL DEFAULT 0,
+    -- [[university_id, match_score, category], ...] ordered by rank
+    results JSONB NOT NULL DEFAULT '[]'::jsonb,
+    computed_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+COMMENT ON TABLE public.user_recommendations IS 'Ranked recommendation results per user, recomputed when the profile or catalog changes';
+
+-- Backend reads and writes with the service role; users may read their own row
+ALTER TABLE public.user_recommendations ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Users can view their own recommendations" ON public.user_recommendations;
+CREATE POLICY "Users can view their own recommendations"
+ON public.user_recommendations FOR SELECT
+TO authenticated
+USING (auth.uid() = user_id);
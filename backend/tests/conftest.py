@@ -0,0 +1,12 @@
+"""
+Shared test setup
+Settings are read when app modules are imported, so the required ones get
+placeholder values first; no test talks to Supabase or Gemini.
+"""
+import os
+
+for key in ("SUPABASE_URL", "SUPABASE_KEY", "SUPABASE_SERVICE_KEY", "GEMINI_API_KEY",
+            "GEMINI_API_KEY_CHAT", "GEMINI_API_KEY_ANALYSIS", "SECRET_KEY"):
+    os.environ.setdefault(key, "test")
+
+pytest_plugins = ["pytester", "app.pytest_query_budget"]
@@ -0,0 +1,29 @@
+"""app.cache backends"""
+import pytest
+
+from app.cache import MemoryCache, SharedFileCache
+
+
+@pytest.fixture(params=["memory", "shared"])
+def cache(request, tmp_path):
+    backend = MemoryCache(10) if request.param == "memory" else SharedFileCache(str(tmp_path / "cache.sqlite3"), 10)
+    yield backend
+    backend.close()
+
+
+def test_epoch_survives_eviction(cache):
+    epoch = cache.epoch
+    for i in range(600):
+        cache.set(f"key{i}", i)
+    assert cache.get("key0") is None
+    assert cache.epoch == epoch
+
+
+def test_shared_epoch_is_the_same_for_every_worker(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    first, second = SharedFileCache(path, 10), SharedFileCache(path, 10)
+    try:
+        assert first.epoch == second.epoch
+    finally:
+        first.close()
+        second.close()
@@ -0,0 +1,150 @@
+"""
+app.pytest_query_budget: ini budgets, the query_budget marker and query_log
+Each test runs a small pytest session against an app whose route
+/items/{count} records `count` queries.
+"""
+import pytest
+
+APP = '''
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.metrics import MetricsMiddleware, record_query
+
+pytest_plugins = ["app.pytest_query_budget"]
+
+app = FastAPI()
+app.add_middleware(MetricsMiddleware)
+
+
+@app.get("/items/{count}")
+def items(count: int):
+    for _ in range(count):
+        record_query("items", "select", 0.0, filters=["eq(id)"])
+    return {"count": count}
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+'''
+
+
+@pytest.fixture
+def session(pytester):
+    pytester.makeconftest(APP)
+    return pytester
+
+
+def test_ini_budget(session):
+    session.makeini("""
+        [pytest]
+        query_budgets =
+            GET /items/{count} = 2
+    """)
+    session.makepyfile("""
+        def test_within(client):
+            client.get("/items/2")
+
+        def test_over(client):
+            client.get("/items/3")
+    """)
+    result = session.runpytest()
+    result.assert_outcomes(passed=1, failed=1)
+    result.stdout.fnmatch_lines([
+        "*Query budget exceeded:*",
+        "*GET /items/{count}: 3 queries (budget 2) - 3x select items [[]eq(id)[]]*",
+    ])
+
+
+def test_routes_without_budget_are_not_checked(session):
+    session.makeini("""
+        [pytest]
+        query_budgets =
+            GET /other = 1
+    """)
+    session.makepyfile("""
+        def test_unbudgeted(client):
+            client.get("/items/5")
+    """)
+    session.runpytest().assert_outcomes(passed=1)
+
+
+def test_marker_overrides_ini(session):
+    session.makeini("""
+        [pytest]
+        query_budgets =
+            GET /items/{count} = 2
+    """)
+    session.makepyfile("""
+        import pytest
+
+        @pytest.mark.query_budget(5)
+        def test_raised(client):
+            client.get("/items/4")
+
+        @pytest.mark.query_budget(1, route="GET  /items/{count}")
+        def test_lowered_for_route(client):
+            client.get("/items/2")
+
+        @pytest.mark.query_budget(10, route="GET /other")
+        def test_other_route_falls_back_to_ini(client):
+            client.get("/items/3")
+    """)
+    result = session.runpytest()
+    result.assert_outcomes(passed=1, failed=2)
+    result.stdout.fnmatch_lines([
+        "*test_lowered_for_route*",
+        "*GET /items/{count}: 2 queries (budget 1)*",
+    ])
+
+
+def test_marker_without_ini(session):
+    session.makepyfile("""
+        import pytest
+
+        @pytest.mark.query_budget(0)
+        def test_no_queries(client):
+            client.get("/items/1")
+    """)
+    result = session.runpytest()
+    result.assert_outcomes(failed=1)
+    result.stdout.fnmatch_lines(["*GET /items/{count}: 1 queries (budget 0)*"])
+
+
+def test_query_log_fixture(session):
+    session.makepyfile("""
+        def test_log(client, query_log):
+            client.get("/items/1")
+            client.get("/items/3")
+            assert [stats.queries for stats in query_log.for_route("GET /items/{count}")] == [1, 3]
+            assert query_log.requests[1][1].shapes == {("items", "select", "eq(id)"): 3}
+    """)
+    session.runpytest().assert_outcomes(passed=1)
+
+
+def test_failing_test_is_not_reported_twice(session):
+    session.makepyfile("""
+        import pytest
+
+        @pytest.mark.query_budget(0)
+        def test_fails_first(client):
+            client.get("/items/2")
+            assert False, "own failure"
+    """)
+    result = session.runpytest()
+    result.assert_outcomes(failed=1)
+    result.stdout.fnmatch_lines(["*own failure*"])
+    result.stdout.no_fnmatch_line("*Query budget exceeded*")
+
+
+def test_malformed_budget_line(session):
+    session.makeini("""
+        [pytest]
+        query_budgets =
+            GET /items/{count}
+    """)
+    session.makepyfile("def test_nothing(): pass")
+    result = session.runpytest()
+    assert result.ret == pytest.ExitCode.USAGE_ERROR
+    result.stderr.fnmatch_lines(["*query_budgets: expected 'METHOD route = max'*"])